@@ -0,0 +1,143 @@
+# administration.py – Vaccination System
+"""
+Administering a prescribed vaccine: the prescription is marked administered, one dose is taken
+from a center's stock and the administration is logged, in a single BEGIN IMMEDIATE transaction.
+
+The dose is allocated with one conditional INSERT ... SELECT ... RETURNING (queries.ALLOCATE_STOCK)
+that checks the prescription is pending, picks the center and appends an 'administration' movement
+to the stock ledger (stock_ledger.py; its trigger decrements CenterStock) while holding the write
+lock, instead of reading the stock first and decrementing it later. Concurrent nurses
+therefore can never take the last dose twice, drive the stock negative or administer the same
+prescription twice, and an administration is three statements under one acquisition of the
+write lock.
+"""
+import sqlite3
+from collections import namedtuple
+
+import queries
+
+# Outcomes of administer()
+ADMINISTERED = "administered"
+OUT_OF_STOCK = "out_of_stock" # No center has the vaccine in stock; nothing was changed
+NOT_PENDING = "not_pending" # Already administered (e.g. by another nurse) or cancelled; nothing was changed
+FAILED = "failed" # Batch only: a database error on this item; `error` says which
+
+# center_id and stock_left are None unless the status is ADMINISTERED
+AdministrationResult = namedtuple("AdministrationResult", ["status", "center_id", "stock_left", "error"],
+                                  defaults=(None,))
+
+# Administrations committed together by administer_batch()
+BATCH_GROUP_SIZE = 100
+
+
+def record_administration(cursor, prescription_id, vaccine_id, nurse_id):
+    """
+    The statements of one administration, for use inside a write transaction (see administer()).
+    Nothing is changed unless a dose could be allocated for a pending prescription, so a failed
+    administration never needs to be rolled back.
+    Returns:
+        AdministrationResult
+    """
+    allocation = cursor.execute(queries.ALLOCATE_STOCK, {"vaccine": vaccine_id, "prescription": prescription_id},
+                                label="administration.allocate_stock").fetchone()
+    if allocation is None:
+        return _not_allocated(cursor, prescription_id)
+    center_id, stock_left = allocation
+
+    # Cannot miss: the prescription was pending in this same transaction
+    cursor.execute(queries.MARK_PRESCRIPTION_ADMINISTERED, (prescription_id,), label="administration.prescription")
+    cursor.execute(queries.LOG_ADMINISTRATION, (prescription_id, nurse_id, center_id), label="administration.log")
+    return AdministrationResult(ADMINISTERED, center_id, stock_left)
+
+
+def _not_allocated(cursor, prescription_id):
+    """The result for a prescription ALLOCATE_STOCK took nothing for."""
+    status = cursor.execute(queries.PRESCRIPTION_STATUS, (prescription_id,), label="administration.status").fetchone()
+    if status is None or status[0] != 'pending':
+        return AdministrationResult(NOT_PENDING, None, None)
+    return AdministrationResult(OUT_OF_STOCK, None, None)
+
+
+def administer(pool, prescription_id, vaccine_id, nurse_id):
+    """
+    Administers a pending prescription from whichever center has the most stock of the vaccine.
+    Args:
+        pool (data_access.ConnectionPool)
+        prescription_id (int): Prescription.id_prescription.
+        vaccine_id (int): Medicine.id of the prescribed vaccine.
+        nurse_id (int): Nurse.idnurse of the administering nurse.
+    Returns:
+        AdministrationResult: Nothing was changed unless the status is ADMINISTERED.
+    Raises:
+        sqlite3.Error: The transaction has already been rolled back.
+    """
+    return pool.write(lambda cursor: record_administration(cursor, prescription_id, vaccine_id, nurse_id),
+                      label="administration.administer")
+
+
+def _record_group(cursor, items, nurse_id):
+    """
+    One batch transaction: a dose is allocated per item as in record_administration(), then the
+    prescriptions and log entries of all allocated items are written with one executemany each.
+    The items must have distinct prescriptions.
+    """
+    results = []
+    allocated = [] # (prescription_id, center_id)
+    for prescription_id, vaccine_id in items:
+        allocation = cursor.execute(queries.ALLOCATE_STOCK, {"vaccine": vaccine_id, "prescription": prescription_id},
+                                    label="administration.batch.allocate_stock").fetchone()
+        if allocation is None:
+            results.append(_not_allocated(cursor, prescription_id))
+            continue
+        allocated.append((prescription_id, allocation[0]))
+        results.append(AdministrationResult(ADMINISTERED, allocation[0], allocation[1]))
+
+    cursor.executemany(queries.MARK_PRESCRIPTION_ADMINISTERED, [(prescription_id,) for prescription_id, _ in allocated],
+                       label="administration.batch.prescriptions")
+    cursor.executemany(queries.LOG_ADMINISTRATION, [(prescription_id, nurse_id, center_id) for prescription_id, center_id in allocated],
+                       label="administration.batch.log")
+    return results
+
+
+def administer_batch(pool, items, nurse_id, group_size=BATCH_GROUP_SIZE, progress=None):
+    """
+    Administers many prescriptions (a mass-vaccination queue), committing them in groups of
+    `group_size` instead of one transaction each. A failing item does not stop the batch: if a
+    group hits a database error, that group is rolled back and redone item by item, so only the
+    items that fail themselves are reported as FAILED.
+    Args:
+        items (list): (prescription_id, vaccine_id) pairs.
+        progress (callable): Called with (items done, total) after each group.
+    Returns:
+        list: One AdministrationResult per item, in the same order. A prescription queued twice
+              is administered once; the second entry is NOT_PENDING.
+    """
+    results = [None] * len(items)
+    seen = set()
+    todo = [] # Indexes of the items to administer
+    for index, (prescription_id, _) in enumerate(items):
+        if prescription_id in seen:
+            results[index] = AdministrationResult(NOT_PENDING, None, None)
+        else:
+            seen.add(prescription_id)
+            todo.append(index)
+
+    for start in range(0, len(todo), group_size):
+        group = todo[start:start + group_size]
+        group_items = [items[index] for index in group]
+        try:
+            group_results = pool.write(lambda cursor: _record_group(cursor, group_items, nurse_id),
+                                       label="administration.batch")
+        except sqlite3.Error:
+            # The group was rolled back; redo it one item at a time to isolate the failing ones
+            group_results = []
+            for prescription_id, vaccine_id in group_items:
+                try:
+                    group_results.append(administer(pool, prescription_id, vaccine_id, nurse_id))
+                except sqlite3.Error as error:
+                    group_results.append(AdministrationResult(FAILED, None, None, str(error)))
+        for index, result in zip(group, group_results):
+            results[index] = result
+        if progress:
+            progress(min(start + group_size, len(todo)), len(todo))
+    return results
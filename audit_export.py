@@ -0,0 +1,236 @@
+# audit_export.py – Vaccination System
+"""
+Administration extracts for auditors: every AdministrationLog row joined with its patient, nurse,
+center, vaccine and prescription, written as CSV or JSON Lines.
+
+The extract is streamed, in constant memory whatever its size. Rows are read in (administered_at,
+id) order, one query per batch of EXPORT_BATCH_SIZE rows, each continuing after the last row
+written (keyset, served by the migration 9 indexes, also for one center). Within a batch the
+cursor is read FETCH_SIZE rows at a time with fetchmany() and each row is written as it comes.
+Every batch is a short read, so the export never holds a read transaction open for its whole run.
+
+After every batch the output is flushed to disk and a checkpoint (<output>.checkpoint.json) records
+the last row written, the row count and the file size. An interrupted export is resumed with
+--resume: the file is cut back to the checkpoint and the export continues after its last row.
+The end of the range is fixed when the export starts (now, by default), so a resumed export
+yields the same rows as an uninterrupted one. Administrations without a timestamp are not exported.
+
+Usage:
+    python audit_export.py administrations.csv
+    python audit_export.py administrations.jsonl --from 2024-01-01 --to 2024-12-31 --center 3
+    python audit_export.py administrations.csv --resume   # Continue an interrupted export
+"""
+import argparse
+import csv
+import datetime
+import io
+import json
+import os
+import sqlite3
+import sys
+import time
+from collections import namedtuple
+
+import data_access
+import queries
+
+EXPORT_BATCH_SIZE = 10000 # Rows per query, and between two checkpoints
+FETCH_SIZE = 1000 # Rows held in memory at a time
+FORMATS = ("csv", "jsonl")
+
+# The columns of queries.AUDIT_EXPORT, as written to the extract
+COLUMNS = ("administration_id", "administered_at", "center_id", "center_name", "nurse_id", "nurse_firstname",
+           "nurse_familyname", "patient_id", "patient_firstname", "patient_familyname", "patient_dateofbirth",
+           "vaccine_id", "vaccine_name", "quantity", "prescription_id", "prescription_date")
+
+# rows: rows in the extract; resumed_rows: of those, written before the export was resumed;
+# seconds: time spent by this run
+ExportResult = namedtuple("ExportResult", ["path", "rows", "resumed_rows", "seconds"])
+
+
+def default_checkpoint_path(output_path):
+    return output_path + ".checkpoint.json"
+
+def format_for_path(path):
+    """Format implied by the output file's extension: JSON Lines for .jsonl / .ndjson, else CSV."""
+    return "jsonl" if os.path.splitext(path)[1].lower() in (".jsonl", ".ndjson") else "csv"
+
+def utc_now():
+    """The current time in AdministrationLog.administered_at's format (datetime('now'), UTC)."""
+    return datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def iter_administrations(pool, start="", end=None, center_id=None, after=None, batch_size=EXPORT_BATCH_SIZE):
+    """
+    Yields the extract rows (COLUMNS) administered from `start` (included) to `end` (excluded),
+    oldest first, holding at most FETCH_SIZE rows in memory.
+    Args:
+        start, end (str): Timestamps or days ('YYYY-MM-DD'); end defaults to now.
+        center_id (int): Only this center's administrations.
+        after (tuple): (administered_at, id) of the last row already exported, to continue after it.
+    """
+    end = end or utc_now()
+    after_at, after_id = after or (start, 0) # Every id is positive: from `start` included
+    sql = queries.AUDIT_EXPORT if center_id is None else queries.AUDIT_EXPORT_FOR_CENTER
+    while True:
+        params = {"after_at": after_at, "after_id": after_id, "end": end, "center": center_id, "batch": batch_size}
+        count = 0
+        with pool.cursor() as cursor:
+            cursor.execute(sql, params, label="audit_export.batch")
+            while True:
+                rows = cursor.fetchmany(FETCH_SIZE)
+                if not rows:
+                    break
+                yield from rows
+                count += len(rows)
+                after_id, after_at = rows[-1][0], rows[-1][1]
+        if count < batch_size: # The last batch
+            return
+
+
+def read_checkpoint(path):
+    """
+    Returns:
+        dict: The checkpoint saved by export().
+    Raises:
+        ValueError: No checkpoint, or not a checkpoint of this exporter.
+    """
+    try:
+        with open(path, encoding="utf-8") as source:
+            checkpoint = json.load(source)
+    except FileNotFoundError:
+        raise ValueError(f"No checkpoint '{path}' to resume from.") from None
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Unreadable checkpoint '{path}': {e}") from None
+    if checkpoint.get("columns") != list(COLUMNS):
+        raise ValueError(f"Checkpoint '{path}' was written for other columns; restart the export.")
+    return checkpoint
+
+def _write_checkpoint(path, checkpoint):
+    # Replaced in one step, so a crash leaves either the previous checkpoint or this one
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "w", encoding="utf-8") as target:
+        json.dump(checkpoint, target, indent=1)
+        target.flush()
+        os.fsync(target.fileno())
+    os.replace(temporary_path, path)
+
+
+def export(pool, path, fmt=None, start="", end=None, center_id=None, resume=False, checkpoint_path=None,
+           checkpoint_every=EXPORT_BATCH_SIZE, progress=None):
+    """
+    Writes the administration extract to `path`, or continues an interrupted one (resume=True: the
+    format and filters are those of the checkpoint).
+    Args:
+        fmt (str): "csv" or "jsonl" (default: from the file extension).
+        start, end (str): Range of administered_at, start included, end excluded (default: up to now).
+        progress (callable): Called with (rows, rows per second) after each checkpoint.
+    Returns:
+        ExportResult
+    Raises:
+        ValueError: Unknown format; resume without a checkpoint; a fresh export over an unfinished one.
+        OSError: The output or the checkpoint cannot be written.
+        sqlite3.Error: The export stopped; the checkpoint stays, so it can be resumed.
+    """
+    checkpoint_path = checkpoint_path or default_checkpoint_path(path)
+    if resume:
+        checkpoint = read_checkpoint(checkpoint_path)
+        fmt, start, end, center_id = checkpoint["format"], checkpoint["start"], checkpoint["end"], checkpoint["center_id"]
+        after = tuple(checkpoint["after"]) if checkpoint["after"] else None
+        rows = resumed_rows = checkpoint["rows"]
+        raw = open(path, "r+b")
+        raw.truncate(checkpoint["offset"]) # Rows written after the checkpoint are exported again
+        raw.seek(checkpoint["offset"])
+    else:
+        if os.path.exists(checkpoint_path):
+            raise ValueError(f"'{path}' is an unfinished export: resume it, or delete '{checkpoint_path}' to start over.")
+        fmt = fmt or format_for_path(path)
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown format '{fmt}' (expected one of {', '.join(FORMATS)}).")
+        end = end or utc_now()
+        after = None
+        rows = resumed_rows = 0
+        raw = open(path, "wb")
+
+    text = io.TextIOWrapper(raw, encoding="utf-8", newline="")
+    if fmt == "csv":
+        write_row = csv.writer(text).writerow
+    else:
+        def write_row(row):
+            text.write(json.dumps(dict(zip(COLUMNS, row)), ensure_ascii=False) + "\n")
+
+    def save_checkpoint():
+        text.flush()
+        raw.flush()
+        os.fsync(raw.fileno()) # The rows the checkpoint counts are on disk before it is saved
+        _write_checkpoint(checkpoint_path, {"columns": list(COLUMNS), "format": fmt, "start": start, "end": end,
+                                            "center_id": center_id, "after": after, "rows": rows,
+                                            "offset": raw.tell()})
+
+    started = time.perf_counter()
+    try:
+        if not resume:
+            if fmt == "csv":
+                write_row(COLUMNS)
+            save_checkpoint()
+        for row in iter_administrations(pool, start, end, center_id, after=after, batch_size=checkpoint_every):
+            write_row(row)
+            rows += 1
+            after = (row[1], row[0])
+            if (rows - resumed_rows) % checkpoint_every == 0:
+                save_checkpoint()
+                if progress:
+                    progress(rows, (rows - resumed_rows) / max(time.perf_counter() - started, 1e-9))
+        text.flush()
+        os.fsync(raw.fileno())
+    finally:
+        text.close()
+    os.remove(checkpoint_path) # Complete: nothing to resume
+    return ExportResult(path, rows, resumed_rows, time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the administration log, joined with patients, nurses, centers "
+                                                 "and vaccines, as CSV or JSON Lines.")
+    parser.add_argument("output", help="File to write (.csv, or .jsonl for JSON Lines)")
+    parser.add_argument("--db", default=data_access.DB_PATH, help="Database file (default: %(default)s)")
+    parser.add_argument("--format", choices=FORMATS, help="Output format (default: from the file extension)")
+    parser.add_argument("--from", dest="start", type=datetime.date.fromisoformat, metavar="YYYY-MM-DD",
+                        help="First day (default: the first administration)")
+    parser.add_argument("--to", dest="end", type=datetime.date.fromisoformat, metavar="YYYY-MM-DD",
+                        help="Last day, included (default: up to now)")
+    parser.add_argument("--center", type=int, help="Only this center (VaccinationCenter.idcenter)")
+    parser.add_argument("--resume", action="store_true", help="Continue an interrupted export of OUTPUT from its checkpoint")
+    parser.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE, help="Rows per query and checkpoint (default: %(default)s)")
+    args = parser.parse_args()
+    if args.resume and (args.format or args.start or args.end or args.center is not None):
+        parser.error("--resume continues with the checkpoint's format and filters; do not give them again.")
+
+    if not os.path.exists(args.db):
+        parser.error(f"Database file '{args.db}' not found. Run database.py first.")
+    pool = data_access.configure_pool(db_path=args.db)
+    try:
+        def show_progress(rows, rate):
+            print(f"\r  {rows:,} rows, {rate:,.0f} rows/s", end="", flush=True)
+        try:
+            result = export(pool, args.output, fmt=args.format,
+                            start=args.start.isoformat() if args.start else "",
+                            end=(args.end + datetime.timedelta(days=1)).isoformat() if args.end else None,
+                            center_id=args.center, resume=args.resume, checkpoint_every=args.batch_size,
+                            progress=show_progress)
+        except (OSError, ValueError) as e:
+            print(f"\n❌ Cannot export to '{args.output}': {e}")
+            sys.exit(1)
+        except (sqlite3.Error, KeyboardInterrupt) as e:
+            print(f"\n❌ Export interrupted ({e or 'by the user'}); continue it with --resume.")
+            sys.exit(1)
+        exported = result.rows - result.resumed_rows
+        print(f"\n✅ {result.rows:,} administration(s) in '{result.path}'"
+              + (f" ({result.resumed_rows:,} from before the resume)" if result.resumed_rows else "")
+              + f", {exported:,} written in {result.seconds:.1f} s ({exported / max(result.seconds, 1e-9):,.0f} rows/s).")
+    finally:
+        pool.close_all()
+
+
+if __name__ == "__main__":
+    main()
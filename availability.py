@@ -0,0 +1,57 @@
+# availability.py – Vaccination System
+"""
+Cached vaccine availability: which centers have a vaccine in stock, and how much.
+
+The whole availability map (vaccine -> centers with stock) is read with one set-based query and
+kept in memory. Before it is used, the CenterStock and VaccinationCenter change counters
+(TableVersion, bumped by triggers) are read; the map is only re-read when one of them moved.
+Checking availability for a patient therefore costs the same two small queries whether one or
+twenty vaccines are pending.
+"""
+import threading
+
+import data_access
+import queries
+
+# Tables the availability map is built from
+SOURCE_TABLES = ("CenterStock", "VaccinationCenter")
+
+
+class VaccineAvailability:
+    """Thread-safe, version-checked cache of the availability map."""
+    def __init__(self, pool):
+        self.pool = pool
+        self._lock = threading.Lock()
+        self._version = None
+        self._centers_by_vaccine = {}
+
+    def _refresh(self):
+        """Re-reads the map if the stock changed since it was loaded. Called with the lock held."""
+        version = data_access.read_table_versions(self.pool, SOURCE_TABLES)
+        if version == self._version and None not in version:
+            return
+        centers_by_vaccine = {}
+        for vaccine_id, center_name, quantity in self.pool.fetchall(queries.VACCINE_AVAILABILITY, label="availability.load"):
+            centers_by_vaccine.setdefault(vaccine_id, []).append((center_name, quantity))
+        # The version read before the load: a change made during the load triggers another one next time
+        self._centers_by_vaccine = centers_by_vaccine
+        self._version = version
+
+    def centers_for(self, vaccine_ids):
+        """
+        Returns:
+            dict: vaccine_id -> list of (center_name, quantity) with quantity > 0, sorted by center name.
+                  Vaccines that are nowhere in stock map to an empty list.
+        """
+        with self._lock:
+            self._refresh()
+            return {vaccine_id: list(self._centers_by_vaccine.get(vaccine_id, ())) for vaccine_id in vaccine_ids}
+
+    def invalidate(self):
+        with self._lock:
+            self._version = None
+
+
+def get_availability(pool=None):
+    """Returns the process-wide VaccineAvailability for the given pool (default: the shared pool)."""
+    return (pool or data_access.get_pool()).shared("availability", VaccineAvailability)
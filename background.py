@@ -0,0 +1,158 @@
+# background.py – Vaccination System
+"""
+Runs database work off the Tk main thread.
+
+Tkinter is not thread-safe, so workers never touch widgets: a task's function runs on a small
+thread pool and its result is put on a queue, which the Tk thread drains with root.after() and
+hands to the task's on_success/on_error callbacks. Tasks can be given a key (e.g. "patient_file");
+submitting a new task with the same key cancels the previous one, so a slow load for the patient
+that was selected before can never overwrite the one selected now.
+"""
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Task:
+    """Handle of one submitted function. Only the Tk thread reads `cancelled`."""
+    def __init__(self, key, busy_text, on_success, on_error):
+        self.key = key
+        self.busy_text = busy_text
+        self.on_success = on_success
+        self.on_error = on_error
+        self.cancelled = False
+        self.future = None
+        self.thread_id = None # Worker thread while the function is running, otherwise None
+
+
+class BackgroundExecutor:
+    """
+    Thread pool whose results are delivered on the Tk thread.
+    Args:
+        root (tk.Misc): Widget whose after() is used to poll for results.
+        pool (data_access.ConnectionPool): Used to interrupt the query of a cancelled task.
+        on_busy_change (callable): Called on the Tk thread with the busy text of the most recent
+                                   running task, or None once nothing is running.
+    """
+    def __init__(self, root, pool=None, max_workers=2, poll_interval_ms=25, on_busy_change=None):
+        self.root = root
+        self.pool = pool
+        self.poll_interval_ms = poll_interval_ms
+        self.on_busy_change = on_busy_change
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="vaccine-db")
+        self._results = queue.Queue()
+        self._state_lock = threading.Lock() # Guards Task.thread_id between worker and Tk thread
+        self._active = [] # Tasks not yet delivered, in submission order
+        self._by_key = {}
+        self._poll_id = None
+        self._closed = False
+
+    def submit(self, function, *args, on_success=None, on_error=None, key=None, busy_text="Loading..."):
+        """
+        Runs function(*args) on a worker thread. on_success(result) or on_error(exception) is then
+        called on the Tk thread, unless the task was cancelled in the meantime.
+        Returns:
+            Task: Can be passed to cancel().
+        """
+        if self._closed:
+            raise RuntimeError("The background executor has been shut down.")
+        if key is not None and key in self._by_key:
+            self._cancel(self._by_key[key]) # Superseded; the busy indicator is updated below
+
+        task = Task(key, busy_text, on_success, on_error)
+        if key is not None:
+            self._by_key[key] = task
+        self._active.append(task)
+        task.future = self._executor.submit(self._run, task, function, args)
+        self._notify_busy()
+        self._schedule_poll()
+        return task
+
+    def _run(self, task, function, args):
+        """Worker thread: runs the function and queues the outcome for the Tk thread."""
+        with self._state_lock:
+            if task.cancelled:
+                return
+            task.thread_id = threading.get_ident()
+        try:
+            outcome = (True, function(*args))
+        except Exception as error: # Delivered to on_error on the Tk thread
+            outcome = (False, error)
+        finally:
+            with self._state_lock:
+                task.thread_id = None
+        self._results.put((task, outcome))
+
+    def cancel(self, key_or_task):
+        """
+        Cancels a task (or the current task with the given key). A task that has not started is
+        dropped; a running one has its SQL statement interrupted and its result discarded.
+        """
+        task = self._by_key.get(key_or_task) if not isinstance(key_or_task, Task) else key_or_task
+        if task is not None and not task.cancelled:
+            self._cancel(task)
+            self._notify_busy()
+
+    def _cancel(self, task):
+        task.cancelled = True
+        task.future.cancel()
+        with self._state_lock:
+            if task.thread_id is not None and self.pool is not None:
+                self.pool.interrupt(task.thread_id)
+        self._forget(task)
+
+    def cancel_all(self):
+        for task in list(self._active):
+            self._cancel(task)
+        self._notify_busy()
+
+    def _forget(self, task):
+        if task in self._active:
+            self._active.remove(task)
+        if task.key is not None and self._by_key.get(task.key) is task:
+            del self._by_key[task.key]
+
+    def _schedule_poll(self):
+        if self._poll_id is None and not self._closed:
+            self._poll_id = self.root.after(self.poll_interval_ms, self._poll)
+
+    def _poll(self):
+        """Tk thread: delivers finished tasks, then polls again while tasks are outstanding."""
+        self._poll_id = None
+        while True:
+            try:
+                task, (succeeded, value) = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if task.cancelled: # Superseded or cancelled while running
+                continue
+            self._forget(task)
+            self._notify_busy()
+            callback = task.on_success if succeeded else task.on_error
+            if callback is not None:
+                callback(value)
+            elif not succeeded: # No handler: report it like any other exception in a Tk callback
+                self.root.report_callback_exception(type(value), value, value.__traceback__)
+        if self._active:
+            self._schedule_poll()
+
+    def _notify_busy(self):
+        if self.on_busy_change is not None and not self._closed:
+            self.on_busy_change(self._active[-1].busy_text if self._active else None)
+
+    def is_busy(self):
+        return bool(self._active)
+
+    def shutdown(self):
+        """Cancels everything and stops polling. Call before the root window is destroyed."""
+        if self._closed:
+            return
+        self.cancel_all()
+        self._closed = True
+        if self._poll_id is not None:
+            try:
+                self.root.after_cancel(self._poll_id)
+            except Exception: # The window may already be gone
+                pass
+            self._poll_id = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
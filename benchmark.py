@@ -0,0 +1,593 @@
+# benchmark.py – Vaccination System
+"""
+Headless benchmark of the data paths behind every dashboard.
+
+Each scenario runs the same SQL (from queries.py) through the same connection pool as the page
+method it is named after, with parameters sampled from the database under test. Writes
+(administer_vaccine, prescribe_cohort, _modify_stock, receive_delivery) run inside a transaction
+that is rolled back, so the database is left unchanged and every iteration sees the same data.
+
+Results (p50/p95/p99 latency and throughput per scenario) are printed and can be stored as
+JSON. With --baseline, the run fails (exit code 1) when a scenario's p95 is slower than the
+stored one by more than the tolerance.
+
+With --contention, several processes administer the same vaccine at once on scratch copies of
+the database instead, comparing the atomic administration (administration.py) with the old
+read-then-decrement one, and checking that no dose is sold twice.
+
+Usage:
+    python benchmark.py --size medium --output results.json
+    python benchmark.py --db bench.db --baseline results.json --tolerance 0.25
+    python benchmark.py --db bench.db --contention 8
+"""
+import argparse
+import datetime
+import json
+import math
+import os
+import platform
+import random
+import sqlite3
+import sys
+import time
+
+import data_access
+import queries
+from patient_search import PatientSearch, MIN_QUERY_LENGTH
+from availability import get_availability
+from patient_file import PatientFileService, history_pager, prescription_pager
+from session import load_session
+import administration
+import cohort
+import reporting
+import stock_intake
+import stock_ledger
+from vaccine_catalogue import Vaccine
+
+# Database sizes that --size builds with synthetic_data.py when the file does not exist yet
+SIZES = {
+    "small": dict(patients=10000, doctors=100, nurses=60, centers=20, prescriptions=100000),
+    "medium": dict(patients=100000, doctors=500, nurses=300, centers=100, prescriptions=1000000),
+    "large": dict(patients=1000000, doctors=5000, nurses=2000, centers=400, prescriptions=10000000),
+}
+
+SAMPLE_SIZE = 200 # Distinct parameter sets drawn per entity type
+
+
+class _Rollback(Exception):
+    """Raised at the end of a write scenario so its transaction is rolled back."""
+
+
+class Samples:
+    """Parameters for the scenarios, drawn once from the database under test."""
+    def __init__(self, pool, rng):
+        self.rng = rng
+        self.logins = self._draw(pool, "SELECT email, password FROM Credentials")
+        self.doctors = self._draw(pool, "SELECT iddoctor FROM Doctor")
+        self.patients = self._draw(pool, "SELECT idpatient, idperson FROM Patient")
+        self.centers = self._draw(pool, "SELECT idcenter FROM VaccinationCenter")
+        self.vaccines = self._draw(pool, "SELECT id FROM Medicine")
+        self.nurses = self._draw(pool, "SELECT idnurse FROM Nurse")
+        self.family_names = self._draw(pool, "SELECT familyname FROM Person")
+        # Pending prescriptions are few and served by a partial index, so they are read directly
+        pending = pool.fetchall("SELECT id_prescription, id_medicine, idpatient FROM Prescription WHERE status = 'pending' LIMIT 10000")
+        pending = rng.sample(pending, min(SAMPLE_SIZE, len(pending)))
+        self.pending = [(prescription_id, vaccine_id) for prescription_id, vaccine_id, _ in pending]
+        self.patients_with_pending = sorted({(idpatient,) for _, _, idpatient in pending})
+
+    def _draw(self, pool, sql):
+        # Random rowids instead of ORDER BY random(), which would sort a whole table of millions
+        with pool.cursor() as cursor:
+            table = sql.split(" FROM ")[1].split()[0]
+            max_rowid = cursor.execute(f"SELECT max(rowid) FROM {table}").fetchone()[0]
+            if max_rowid is None:
+                return []
+            rows = []
+            for _ in range(SAMPLE_SIZE):
+                row = cursor.execute(f"{sql} WHERE rowid >= ? LIMIT 1", (self.rng.randint(1, max_rowid),)).fetchone()
+                if row:
+                    rows.append(tuple(row))
+            return rows
+
+    def pick(self, name):
+        return self.rng.choice(getattr(self, name))
+
+
+# --- Scenarios --------------------------------------------------------------------
+# Each receives (pool, samples) and mirrors the database work of one page method.
+
+def authenticate_user(pool, samples):
+    """LoginPortal.authenticate_user: credentials and the whole session in one query"""
+    email, password = samples.pick("logins")
+    load_session(email, password, pool=pool)
+
+def populate_patients_list(pool, samples):
+    """DoctorMainPage: the doctor's patients shown before anything is typed"""
+    doctor_id, = samples.pick("doctors")
+    PatientSearch(pool, cache_size=0).search("", doctor_id)
+
+def _type_name(pool, samples, doctor_id):
+    # One search per keystroke of a family name, as the debounced search box would run them at worst
+    family_name, = samples.pick("family_names")
+    search = PatientSearch(pool, cache_size=0) # Every keystroke goes to the database
+    for length in range(MIN_QUERY_LENGTH, len(family_name) + 1):
+        search.search(family_name[:length], doctor_id)
+
+def search_patients(pool, samples):
+    """NurseMainPage patient search box (all patients), typing a family name"""
+    _type_name(pool, samples, None)
+
+def search_doctor_patients(pool, samples):
+    """DoctorMainPage patient search box (own patients), typing a family name"""
+    doctor_id, = samples.pick("doctors")
+    _type_name(pool, samples, doctor_id)
+
+def view_patient_file(pool, samples):
+    """DoctorMainPage.view_patient_file and NurseMainPage.view_patient_file_nurse, not cached"""
+    patient_id, _ = samples.pick("patients")
+    PatientFileService(pool, cache_size=0).get(patient_id)
+
+def scroll_patient_file(pool, samples):
+    """PatientFileView scrolled past its first page: the next page of both lists (keyset, 10 rows a page)"""
+    patient_id, _ = samples.pick("patients")
+    for pager in (prescription_pager(pool, patient_id), history_pager(pool, patient_id)):
+        rows, more = pager.fetch(limit=10)
+        if more:
+            pager.fetch(after=pager.key(rows[-1]), limit=10)
+
+def fetch_vaccine_availability(pool, samples):
+    """PatientMainPage._fetch_vaccine_availability, for patients that have pending prescriptions"""
+    patient_id, = samples.pick("patients_with_pending")
+    with pool.cursor() as cursor:
+        cursor.execute(queries.PENDING_VACCINES_FOR_PATIENT, (patient_id,), label="patient.availability.pending_vaccines")
+        get_availability(pool).centers_for([vaccine_id for vaccine_id, _ in cursor.fetchall()])
+
+def administer_vaccine(pool, samples):
+    """NurseMainPage.administer_vaccine (rolled back)"""
+    prescription_id, vaccine_id = samples.pick("pending")
+    nurse_id, = samples.pick("nurses")
+    try:
+        with pool.transaction(immediate=True): # administer() joins it, so it can be rolled back
+            administration.administer(pool, prescription_id, vaccine_id, nurse_id)
+            raise _Rollback()
+    except _Rollback:
+        pass
+
+def administer_batch(pool, samples):
+    """NurseMainPage.administer_batch with 50 queued prescriptions (rolled back)"""
+    items = [samples.pick("pending") for _ in range(50)]
+    nurse_id, = samples.pick("nurses")
+    try:
+        with pool.transaction(immediate=True):
+            administration.administer_batch(pool, items, nurse_id)
+            raise _Rollback()
+    except _Rollback:
+        pass
+
+def _flu_season_cohort():
+    # Seasonal flu campaign: patients aged 65 or more with no dose since the season started
+    return cohort.CohortFilter(min_age=65, not_vaccinated_since=cohort.season_start())
+
+def preview_cohort(pool, samples):
+    """DoctorMainPage.preview_cohort (patients 65+ not vaccinated this season)"""
+    doctor_id, = samples.pick("doctors")
+    vaccine_id, = samples.pick("vaccines")
+    cohort.preview(pool, doctor_id, vaccine_id, _flu_season_cohort())
+
+def prescribe_cohort(pool, samples):
+    """DoctorMainPage.prescribe_cohort (patients 65+ not vaccinated this season, rolled back)"""
+    doctor_id, = samples.pick("doctors")
+    vaccine_id, = samples.pick("vaccines")
+    try:
+        with pool.transaction(immediate=True): # prescribe() joins it, so it can be rolled back
+            cohort.prescribe(pool, doctor_id, vaccine_id, _flu_season_cohort())
+            raise _Rollback()
+    except _Rollback:
+        pass
+
+def modify_stock(pool, samples):
+    """CenterAdminMainPage._modify_stock, adding one dose (rolled back)"""
+    center_id, = samples.pick("centers")
+    vaccine_id, = samples.pick("vaccines")
+    try:
+        with pool.transaction(immediate=True) as cursor:
+            stock_ledger.record_movement(cursor, center_id, vaccine_id, 1, stock_ledger.INTAKE)
+            raise _Rollback()
+    except _Rollback:
+        pass
+
+def receive_delivery(pool, samples):
+    """CenterAdminMainPage.receive_delivery, a 30-line manifest (rolled back)"""
+    center_id, = samples.pick("centers")
+    lines = [stock_intake.ManifestLine(number, Vaccine(*samples.pick("vaccines"), None), 10) for number in range(30)]
+    try:
+        with pool.transaction(immediate=True): # receive() joins it, so it can be rolled back
+            stock_intake.receive(pool, center_id, lines)
+            raise _Rollback()
+    except _Rollback:
+        pass
+
+def load_center_stock_overview(pool, samples):
+    """CenterAdminMainPage.load_center_stock_overview"""
+    center_id, = samples.pick("centers")
+    pool.fetchall(queries.CENTER_STOCK_OVERVIEW, {"center": center_id, "limit": 51}, label="center_admin.stock_overview")
+
+def report_center_totals(pool, samples):
+    """ReportWindow: doses per center over ten years (monthly and daily rollups)"""
+    reporting.run_report(pool, reporting.ReportRequest("center", datetime.date(2015, 1, 3), datetime.date(2024, 12, 30)))
+
+def report_center_days(pool, samples):
+    """ReportWindow: one center's doses per day over a year"""
+    center_id, = samples.pick("centers")
+    reporting.run_report(pool, reporting.ReportRequest("day", datetime.date(2024, 1, 1), datetime.date(2024, 12, 31), center_id))
+
+
+SCENARIOS = {
+    "authenticate_user": authenticate_user,
+    "populate_patients_list": populate_patients_list,
+    "search_patients": search_patients,
+    "search_doctor_patients": search_doctor_patients,
+    "view_patient_file": view_patient_file,
+    "scroll_patient_file": scroll_patient_file,
+    "fetch_vaccine_availability": fetch_vaccine_availability,
+    "administer_vaccine": administer_vaccine,
+    "administer_batch": administer_batch,
+    "preview_cohort": preview_cohort,
+    "prescribe_cohort": prescribe_cohort,
+    "modify_stock": modify_stock,
+    "receive_delivery": receive_delivery,
+    "load_center_stock_overview": load_center_stock_overview,
+    "report_center_totals": report_center_totals,
+    "report_center_days": report_center_days,
+}
+
+
+# --- Measurement ------------------------------------------------------------------
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def run_scenario(scenario, pool, samples, iterations, warmup, max_seconds):
+    """
+    Runs one scenario `warmup` times unmeasured, then up to `iterations` times (or until
+    `max_seconds` have passed, but at least 5 times).
+    Returns:
+        dict: iterations, p50/p95/p99/mean/max in milliseconds and ops_per_s.
+    """
+    for _ in range(warmup):
+        scenario(pool, samples)
+
+    latencies = []
+    started = time.perf_counter()
+    while len(latencies) < iterations:
+        before = time.perf_counter()
+        scenario(pool, samples)
+        latencies.append(time.perf_counter() - before)
+        if len(latencies) >= 5 and time.perf_counter() - started > max_seconds:
+            break
+    total = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "iterations": len(latencies),
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "mean_ms": sum(latencies) / len(latencies) * 1000,
+        "max_ms": latencies[-1] * 1000,
+        "ops_per_s": len(latencies) / total if total else 0.0,
+    }
+
+def database_info(pool):
+    """Row counts of the main tables, stored with the results so runs can be compared fairly."""
+    info = {}
+    with pool.cursor() as cursor:
+        for table in ("Person", "Patient", "Doctor", "DoctorPatient", "VaccinationCenter", "CenterStock",
+                      "Prescription", "AdministrationLog"):
+            info[table] = cursor.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+    return info
+
+def compare_to_baseline(results, baseline, tolerance, min_delta_ms):
+    """
+    Returns:
+        list: (scenario, baseline p95, current p95) for every scenario that regressed, i.e. whose
+              p95 grew by more than `tolerance` (a fraction) and by more than `min_delta_ms`.
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None:
+            continue
+        allowed = previous["p95_ms"] * (1 + tolerance)
+        if current["p95_ms"] > allowed and current["p95_ms"] - previous["p95_ms"] > min_delta_ms:
+            regressions.append((name, previous["p95_ms"], current["p95_ms"]))
+    return regressions
+
+def format_results(results):
+    lines = [f"{'scenario':<28} {'runs':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'ops/s':>10}"]
+    for name, entry in results.items():
+        lines.append(f"{name:<28} {entry['iterations']:>6} {entry['p50_ms']:>9.3f} {entry['p95_ms']:>9.3f} "
+                     f"{entry['p99_ms']:>9.3f} {entry['ops_per_s']:>10.1f}")
+    return "\n".join(lines)
+
+
+# --- Administration under contention -------------------------------------------
+# Several processes (nurses at different workstations) administer the same vaccine while its stock
+# runs out. The administration path of administration.py is compared with the one it replaced,
+# which read the stock outside the transaction and then decremented it blindly.
+
+LEGACY_FIND_STOCK = """
+    SELECT id, center_id FROM CenterStock
+    WHERE vaccine_id = ? AND quantity > 0
+    ORDER BY quantity DESC
+    LIMIT 1
+"""
+
+def _administer_legacy(pool, prescription_id, vaccine_id, nurse_id):
+    """NurseMainPage.administer_vaccine before administration.py, kept for comparison only."""
+    stock = pool.fetchone(LEGACY_FIND_STOCK, (vaccine_id,), label="legacy.find_stock")
+    if not stock:
+        return administration.OUT_OF_STOCK
+    stock_id, center_id = stock
+
+    def record(cursor):
+        cursor.execute("UPDATE Prescription SET status = 'administered' WHERE id_prescription = ?", (prescription_id,))
+        cursor.execute("UPDATE CenterStock SET quantity = quantity - 1 WHERE id = ?", (stock_id,))
+        cursor.execute(queries.LOG_ADMINISTRATION, (prescription_id, nurse_id, center_id))
+    pool.write(record, label="legacy.administer")
+    return administration.ADMINISTERED
+
+def _administer_atomic(pool, prescription_id, vaccine_id, nurse_id):
+    return administration.administer(pool, prescription_id, vaccine_id, nurse_id).status
+
+CONTENTION_STRATEGIES = {"legacy": _administer_legacy, "atomic": _administer_atomic}
+
+def _contention_worker(db_path, strategy, prescription_ids, vaccine_id, nurse_id, start_at):
+    """Runs in its own process. Returns (outcome counts, seconds spent)."""
+    administer = CONTENTION_STRATEGIES[strategy]
+    pool = data_access.ConnectionPool(db_path, max_connections=1)
+    counts = {}
+    try:
+        while time.time() < start_at: # All workers start together
+            time.sleep(0.001)
+        started = time.perf_counter()
+        for prescription_id in prescription_ids:
+            try:
+                outcome = administer(pool, prescription_id, vaccine_id, nurse_id)
+            except sqlite3.Error as error:
+                outcome = f"error: {error}"
+            counts[outcome] = counts.get(outcome, 0) + 1
+        return counts, time.perf_counter() - started
+    finally:
+        pool.close_all()
+
+def _prepare_contention_copy(source_path, target_path, attempts, stock=None, centers=5):
+    """
+    Copies the database, makes sure the vaccine with the most pending prescriptions has `attempts`
+    of them (prescribing it to more patients in the copy if needed) and gives it exactly `stock`
+    doses, spread over a few centers.
+    Args:
+        stock (int): Doses in stock (default: three quarters of the prescriptions, so stock runs out).
+    Returns:
+        tuple: (vaccine_id, pending prescription IDs of that vaccine (at most `attempts`), center IDs, stock)
+    """
+    source = sqlite3.connect(source_path)
+    target = sqlite3.connect(target_path)
+    try:
+        source.backup(target)
+    finally:
+        source.close()
+    try:
+        vaccine_id, = target.execute("""
+            SELECT id_medicine FROM Prescription WHERE status = 'pending'
+            GROUP BY id_medicine ORDER BY count(*) DESC LIMIT 1""").fetchone()
+        pending_sql = "SELECT id_prescription FROM Prescription WHERE status = 'pending' AND id_medicine = ? LIMIT ?"
+        prescription_ids = [row[0] for row in target.execute(pending_sql, (vaccine_id, attempts))]
+        missing = attempts - len(prescription_ids)
+        if missing > 0: # One dose each, to doctors' patients in turn (a patient may get several)
+            pairs = target.execute("SELECT iddoctor, idpatient FROM DoctorPatient LIMIT ?", (missing,)).fetchall()
+            if pairs:
+                with target:
+                    target.executemany("""INSERT INTO Prescription (idpatient, id_medicine, iddoctor, quantity, status, prescription_date)
+                                          VALUES (?, ?, ?, 1, 'pending', date('now'))""",
+                                       [(pairs[i % len(pairs)][1], vaccine_id, pairs[i % len(pairs)][0]) for i in range(missing)])
+                prescription_ids = [row[0] for row in target.execute(pending_sql, (vaccine_id, attempts))]
+        if stock is None:
+            stock = len(prescription_ids) * 3 // 4
+        center_ids = [row[0] for row in target.execute("SELECT idcenter FROM VaccinationCenter ORDER BY idcenter LIMIT ?", (centers,))]
+        with target:
+            # Through the ledger: every other center's stock is removed, the chosen ones get their share
+            shares = {center_id: stock // len(center_ids) + (1 if index < stock % len(center_ids) else 0)
+                      for index, center_id in enumerate(center_ids)}
+            balances = dict(target.execute("SELECT center_id, quantity FROM CenterStock WHERE vaccine_id = ?", (vaccine_id,)))
+            for center_id in sorted(set(balances) | set(shares)):
+                change = shares.get(center_id, 0) - balances.get(center_id, 0)
+                if change:
+                    target.execute(queries.RECORD_STOCK_MOVEMENT, {"center": center_id, "vaccine": vaccine_id, "change": change,
+                                                                   "kind": stock_ledger.INTAKE if change > 0 else stock_ledger.REMOVAL,
+                                                                   "reference": None})
+        return vaccine_id, prescription_ids, center_ids, stock
+    finally:
+        target.close()
+
+def run_contention(db_path, workers, attempts, stock=None):
+    """
+    Runs both strategies with `workers` processes of `attempts` administrations each, on scratch
+    copies of the database, and checks the stock accounting afterwards.
+    Args:
+        stock (int): Doses in stock at the start (default: three quarters of all attempts).
+    Returns:
+        int: Exit code, 1 if the atomic strategy sold more doses than there were or lost count,
+             or if the copy could not get a pending prescription for every attempt.
+    """
+    import multiprocessing
+    import shutil
+    import tempfile
+
+    context = multiprocessing.get_context("spawn") # Same behaviour on Windows clinic PCs
+    conn = sqlite3.connect(db_path)
+    try:
+        nurse_ids = [row[0] for row in conn.execute("SELECT idnurse FROM Nurse LIMIT ?", (workers,))] or [None]
+    finally:
+        conn.close()
+    scratch = tempfile.mkdtemp(prefix="vaccine-contention-")
+    failed = False
+    rows = []
+    try:
+        for strategy in CONTENTION_STRATEGIES:
+            copy_path = os.path.join(scratch, f"{strategy}.db")
+            print(f"Preparing '{strategy}' copy...", flush=True)
+            vaccine_id, prescription_ids, _, doses = _prepare_contention_copy(db_path, copy_path, workers * attempts, stock)
+            if len(prescription_ids) < workers * attempts:
+                print(f"❌ Only {len(prescription_ids)} pending prescriptions could be prepared for {workers * attempts} "
+                      f"attempts (the database needs doctors with patients).")
+                return 1
+            batches = [prescription_ids[i::workers] for i in range(workers)]
+            start_at = time.time() + 1.0 + workers * 0.2 # Time for the processes to spawn
+            with context.Pool(workers) as process_pool:
+                outcomes = process_pool.starmap(_contention_worker, [
+                    (copy_path, strategy, batch, vaccine_id, nurse_ids[i % len(nurse_ids)], start_at)
+                    for i, batch in enumerate(batches)])
+
+            counts = {}
+            for worker_counts, _ in outcomes:
+                for outcome, count in worker_counts.items():
+                    counts[outcome] = counts.get(outcome, 0) + count
+            seconds = max(elapsed for _, elapsed in outcomes)
+            check = sqlite3.connect(copy_path)
+            try:
+                stock_left, negative_rows = check.execute(
+                    "SELECT coalesce(sum(quantity), 0), coalesce(sum(quantity < 0), 0) FROM CenterStock WHERE vaccine_id = ?",
+                    (vaccine_id,)).fetchone()
+                logged, = check.execute(
+                    "SELECT count(*) FROM AdministrationLog a JOIN Prescription p ON p.id_prescription = a.prescription_id "
+                    "WHERE p.id_medicine = ?", (vaccine_id,)).fetchone()
+            finally:
+                check.close()
+
+            administered = counts.get(administration.ADMINISTERED, 0)
+            # Every dose taken must be logged once, and no more doses than were in stock
+            correct = (administered == doses - stock_left == logged - _logged_before(db_path, vaccine_id)
+                       and administered <= doses and not negative_rows)
+            if strategy == "atomic" and not correct:
+                failed = True
+            rows.append((strategy, len(prescription_ids), administered, stock_left, negative_rows,
+                         administered / seconds if seconds else 0.0, correct, counts))
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    print()
+    print(f"{workers} processes, {attempts} administrations each ({workers * attempts} in all), {doses} doses in stock")
+    if doses >= workers * attempts:
+        print("⚠️  The stock never runs out, so the strategies are not put to the test; lower --contention-stock.")
+    print(f"{'strategy':<10} {'attempts':>9} {'administered':>13} {'stock left':>11} {'negative rows':>14} {'adm/s':>9}  totals")
+    for strategy, tried, administered, stock_left, negative_rows, rate, correct, counts in rows:
+        print(f"{strategy:<10} {tried:>9} {administered:>13} {stock_left:>11} {negative_rows:>14} {rate:>9.1f}  "
+              f"{'correct' if correct else 'WRONG'}")
+        for outcome, count in sorted(counts.items()):
+            if outcome != administration.ADMINISTERED:
+                print(f"{'':<10}   {count} x {outcome}")
+    if failed:
+        print("\n❌ The atomic administration lost track of the stock under contention.")
+        return 1
+    print("\n✅ The atomic administration kept the stock totals correct under contention.")
+    return 0
+
+def _logged_before(db_path, vaccine_id):
+    """Administrations of the vaccine already in the source database."""
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT count(*) FROM AdministrationLog a JOIN Prescription p ON p.id_prescription = a.prescription_id "
+                            "WHERE p.id_medicine = ?", (vaccine_id,)).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the dashboards' database paths without a display.")
+    parser.add_argument("--db", help="Database to benchmark (default: bench_<size>.db)")
+    parser.add_argument("--size", choices=SIZES, default="small",
+                        help="Size of the synthetic database built when --db does not exist (default: %(default)s)")
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS,
+                        help="Only run this scenario (can be repeated; default: all)")
+    parser.add_argument("--iterations", type=int, default=200, help="Measured runs per scenario")
+    parser.add_argument("--warmup", type=int, default=10, help="Unmeasured runs per scenario")
+    parser.add_argument("--max-seconds", type=float, default=10.0, help="Time budget per scenario")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for the sampled parameters")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed p95 slowdown against the baseline, as a fraction (default: %(default)s)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.5,
+                        help="Ignore slowdowns smaller than this, to absorb timer noise (default: %(default)s)")
+    parser.add_argument("--contention", type=int, metavar="PROCESSES",
+                        help="Instead of the scenarios, administer one vaccine from this many processes at once "
+                             "(on scratch copies of the database) and check the stock totals")
+    parser.add_argument("--contention-attempts", type=int, default=50, help="Administrations per process (default: %(default)s)")
+    parser.add_argument("--contention-stock", type=int,
+                        help="Doses in stock at the start (default: three quarters of all attempts, so stock runs out)")
+    args = parser.parse_args()
+
+    db_path = args.db or f"bench_{args.size}.db"
+    if not os.path.exists(db_path):
+        import synthetic_data # Only needed to build a missing database
+        print(f"Building {args.size} synthetic database '{db_path}'...")
+        synthetic_data.build(db_path, **SIZES[args.size])
+
+    if args.contention:
+        sys.exit(run_contention(db_path, args.contention, args.contention_attempts, args.contention_stock))
+
+    pool = data_access.ConnectionPool(db_path, max_connections=1)
+    try:
+        samples = Samples(pool, random.Random(args.seed))
+        if not samples.pending or not samples.patients:
+            sys.exit(f"'{db_path}' has no patients or pending prescriptions to benchmark with.")
+
+        results = {}
+        for name in args.scenario or SCENARIOS:
+            print(f"Running {name}...", flush=True)
+            results[name] = run_scenario(SCENARIOS[name], pool, samples, args.iterations, args.warmup, args.max_seconds)
+        info = database_info(pool)
+    finally:
+        pool.close_all()
+
+    print()
+    print(format_results(results))
+
+    report = {
+        "meta": {
+            "database": os.path.abspath(db_path),
+            "rows": info,
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "iterations": args.iterations,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to '{args.output}'.")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("meta", {}).get("rows") != info:
+            print("⚠️ The baseline was recorded on a database with different row counts.")
+        regressions = compare_to_baseline(results, baseline, args.tolerance, args.min_delta_ms)
+        if regressions:
+            print(f"\n❌ {len(regressions)} scenario(s) slower than the baseline (p95, tolerance {args.tolerance:.0%}):")
+            for name, before, after in regressions:
+                print(f"  {name}: {before:.3f} ms -> {after:.3f} ms")
+            sys.exit(1)
+        print(f"\n✅ No scenario is slower than the baseline (p95, tolerance {args.tolerance:.0%}).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# change_watcher.py – Vaccination System
+"""
+Change notifications for the dashboards, so every station sees what the others commit.
+
+A page subscribes a refresh function to the tables a panel shows. A ChangeWatcher polls on a Tk
+timer with two cheap checks:
+
+1. PRAGMA data_version, on the watcher's own connection. It changes whenever another connection
+   (another station, or this process's pool) has committed, and is answered without reading any
+   table; nothing else runs while it stays the same.
+2. Only then, the change counters in TableVersion (bumped by triggers, see database.py). Tables
+   whose counter moved are compared with the subscriptions, and only the matching panels are
+   re-queried.
+
+After committing a change itself, a page calls poll() instead of reloading its panels: the
+change is picked up at once, and the next timer tick does not reload them a second time.
+"""
+import sqlite3
+
+import data_access
+
+POLL_INTERVAL_MS = 500 # Changes show up on every station within a second
+
+
+class Subscription:
+    """Returned by ChangeWatcher.watch(), pass it to unwatch()."""
+    def __init__(self, tables, callback):
+        self.tables = frozenset(tables)
+        self.callback = callback
+
+
+class ChangeWatcher:
+    """
+    Polls the database for commits and calls the subscribers of the tables that changed.
+    Runs on the Tk thread only; callbacks are called there with the set of changed tables they watch.
+    Args:
+        widget (tk.Misc): Whose after() schedules the polls (e.g. the page's frame).
+        db_path (str): Database to watch, normally the pool's db_path.
+        interval_ms (int): Time between two polls.
+    """
+    def __init__(self, widget, db_path=data_access.DB_PATH, interval_ms=POLL_INTERVAL_MS):
+        self.widget = widget
+        self.db_path = db_path
+        self.interval_ms = interval_ms
+        self._conn = None
+        self._data_version = None
+        self._versions = {} # TableVersion.name -> version at the last poll
+        self._subscriptions = []
+        self._after_id = None
+
+    def watch(self, tables, callback):
+        """
+        Calls callback(changed_tables) whenever one of `tables` changes.
+        Returns:
+            Subscription
+        """
+        subscription = Subscription(tables, callback)
+        self._subscriptions.append(subscription)
+        return subscription
+
+    def unwatch(self, subscription):
+        if subscription in self._subscriptions:
+            self._subscriptions.remove(subscription)
+
+    def start(self):
+        """Opens the watcher's connection, takes the current state as the baseline and starts polling."""
+        if self._conn is None:
+            # Not from the pool: data_version only reports commits made by *other* connections
+            self._conn = sqlite3.connect(self.db_path, timeout=data_access.DEFAULT_BUSY_TIMEOUT, isolation_level=None)
+            try:
+                self._conn.execute("PRAGMA query_only = ON")
+                self._read_changes()
+            except sqlite3.Error:
+                self.stop()
+                raise
+        self._schedule()
+
+    def stop(self):
+        """Stops polling and closes the connection. Call before the widget is destroyed."""
+        if self._after_id is not None:
+            try:
+                self.widget.after_cancel(self._after_id)
+            except Exception: # The widget is already gone
+                pass
+            self._after_id = None
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _schedule(self):
+        if self._conn is not None and self._after_id is None:
+            self._after_id = self.widget.after(self.interval_ms, self._tick)
+
+    def _tick(self):
+        self._after_id = None
+        try:
+            self.poll()
+        finally: # A failing callback does not stop the polling
+            self._schedule()
+
+    def _read_changes(self):
+        """Returns the tables whose counter moved since the last call (empty if nothing was committed)."""
+        data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self._data_version:
+            return set()
+        # data_version is read first: a commit landing in between is reported again next time, never lost
+        self._data_version = data_version
+        versions = dict(self._conn.execute("SELECT name, version FROM TableVersion").fetchall())
+        changed = {table for table, version in versions.items() if self._versions.get(table) != version}
+        self._versions = versions
+        return changed
+
+    def poll(self):
+        """
+        Checks for changes now and notifies the subscribers of the changed tables.
+        Returns:
+            set: The tables that changed.
+        """
+        if self._conn is None:
+            return set()
+        try:
+            changed = self._read_changes()
+        except sqlite3.Error: # e.g. locked by a writer in rollback-journal mode: try again next tick
+            return set()
+        for subscription in list(self._subscriptions): # A callback may unwatch
+            tables = subscription.tables & changed
+            if tables and subscription in self._subscriptions:
+                subscription.callback(tables)
+        return changed
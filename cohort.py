@@ -0,0 +1,110 @@
+# cohort.py – Vaccination System
+"""
+Cohort prescribing: one vaccine prescribed to every patient of a doctor that matches a filter
+(age band, not vaccinated with it this season), e.g. for a seasonal flu campaign.
+
+preview() counts the cohort with one query. prescribe() then creates the prescriptions in one
+transaction with INSERT ... SELECT, in chunks of patients so progress can be reported, and skips
+patients that already have a pending prescription of the vaccine.
+"""
+import datetime
+from collections import namedtuple
+
+import queries
+
+SEASON_START_MONTH = 9 # Vaccination seasons (flu) start on September 1st
+PRESCRIBE_CHUNK_SIZE = 1000 # Patients per INSERT ... SELECT
+
+
+def season_start(today=None):
+    """First day of the current vaccination season."""
+    today = today or datetime.date.today()
+    year = today.year if today.month >= SEASON_START_MONTH else today.year - 1
+    return datetime.date(year, SEASON_START_MONTH, 1)
+
+def _years_before(day, years):
+    try:
+        return day.replace(year=day.year - years)
+    except ValueError: # February 29th in a year that is not a leap year
+        return day.replace(year=day.year - years, day=28)
+
+
+class CohortFilter:
+    """
+    Which of a doctor's patients get the vaccine. Every criterion is optional.
+    Attributes:
+        min_age, max_age (int): Age band in whole years, both inclusive.
+        not_vaccinated_since (datetime.date): Skip patients who had a dose of the vaccine
+                                              administered on or after this day (e.g. season_start()).
+    """
+    def __init__(self, min_age=None, max_age=None, not_vaccinated_since=None):
+        self.min_age = min_age
+        self.max_age = max_age
+        self.not_vaccinated_since = not_vaccinated_since
+
+    def params(self, doctor_id, vaccine_id, today=None):
+        """Named parameters of the queries.COHORT_* statements."""
+        today = today or datetime.date.today()
+        return {
+            "doctor": doctor_id,
+            "vaccine": vaccine_id,
+            # Aged min_age or more: born on or before today's date min_age years ago
+            "born_on_or_before": _years_before(today, self.min_age).isoformat() if self.min_age is not None else None,
+            # Aged max_age or less: not yet max_age + 1, i.e. born after today's date max_age + 1 years ago
+            "born_after": _years_before(today, self.max_age + 1).isoformat() if self.max_age is not None else None,
+            "vaccinated_since": self.not_vaccinated_since.isoformat() if self.not_vaccinated_since else None,
+        }
+
+    def describe(self):
+        parts = []
+        if self.min_age is not None and self.max_age is not None:
+            parts.append(f"aged {self.min_age}–{self.max_age}")
+        elif self.min_age is not None:
+            parts.append(f"aged {self.min_age} or more")
+        elif self.max_age is not None:
+            parts.append(f"aged {self.max_age} or less")
+        if self.not_vaccinated_since:
+            parts.append(f"not vaccinated since {self.not_vaccinated_since.isoformat()}")
+        return ", ".join(parts) or "all patients"
+
+
+# matching: patients matching the filter; already_pending: of those, already holding a pending
+# prescription of the vaccine (skipped); to_prescribe: prescriptions prescribe() would create
+CohortPreview = namedtuple("CohortPreview", ["matching", "already_pending", "to_prescribe"])
+
+
+def preview(pool, doctor_id, vaccine_id, cohort_filter):
+    """Counts the cohort without changing anything. Returns a CohortPreview."""
+    matching, already_pending = pool.fetchone(queries.COHORT_PREVIEW, cohort_filter.params(doctor_id, vaccine_id),
+                                              label="cohort.preview")
+    return CohortPreview(matching, already_pending, matching - already_pending)
+
+
+def prescribe(pool, doctor_id, vaccine_id, cohort_filter, quantity=1, chunk_size=PRESCRIBE_CHUNK_SIZE,
+              expected=None, progress=None):
+    """
+    Prescribes the vaccine to every patient of the cohort that has no pending prescription of it,
+    in one transaction: either all prescriptions are created or none.
+    Args:
+        expected (int): Number of prescriptions expected (the preview's to_prescribe), for progress.
+        progress (callable): Called with (prescriptions created so far, expected) after each chunk.
+    Returns:
+        list: idpatient of every patient that got a prescription.
+    Raises:
+        sqlite3.Error: Nothing was prescribed.
+    """
+    params = dict(cohort_filter.params(doctor_id, vaccine_id), quantity=quantity, chunk=chunk_size)
+
+    def insert_chunks(cursor):
+        prescribed = []
+        after = 0
+        while True:
+            rows = cursor.execute(queries.COHORT_PRESCRIBE, dict(params, after=after), label="cohort.prescribe").fetchall()
+            prescribed.extend(row[0] for row in rows)
+            if progress:
+                progress(len(prescribed), max(expected or 0, len(prescribed)))
+            if len(rows) < chunk_size:
+                return prescribed
+            after = max(row[0] for row in rows) # Keyset: continue after the last patient of this chunk
+
+    return pool.write(insert_chunks, label="cohort.prescribe")
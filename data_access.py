@@ -0,0 +1,465 @@
+# data_access.py – Vaccination System
+"""
+Shared data-access layer used by every dashboard.
+
+Instead of opening a fresh sqlite3 connection for every click, pages borrow a
+connection from a small bounded pool. A thread keeps the connection it borrowed
+for the duration of a `with` block (nested blocks reuse it), and connections are
+returned to the pool afterwards so their statement cache and page cache stay warm.
+Every statement executed through the pool is timed per label, so the cost of the
+hot paths (patient file, stock overview, ...) can be inspected with query_stats().
+
+Several workstations share one database file, so connections use WAL journaling (readers
+no longer block the writer) and a busy timeout, and writes go through write(), which retries
+with jittered backoff when the database is locked and records every retry per operation
+(see contention_stats()).
+"""
+import atexit
+import os
+import queue
+import random
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+DB_PATH = 'vaccinedatabase.db'
+
+# Seconds a connection waits for a lock before SQLite reports "database is locked".
+DEFAULT_BUSY_TIMEOUT = float(os.environ.get("VACCINE_DB_BUSY_TIMEOUT", "5"))
+
+# WAL lets readers and one writer work at the same time. It needs the stations to reach the
+# database file through a local disk (WAL does not work over network file systems); set
+# VACCINE_DB_JOURNAL_MODE=DELETE to keep the classic rollback journal in that case.
+JOURNAL_MODE = os.environ.get("VACCINE_DB_JOURNAL_MODE", "WAL").upper()
+
+# Pragmas applied to every new connection. Values are inserted verbatim into
+# "PRAGMA name = value", so only trusted configuration should be passed here.
+DEFAULT_PRAGMAS = {
+    "journal_mode": JOURNAL_MODE,
+    "cache_size": -16000,   # ~16 MB page cache per connection
+    "temp_store": "MEMORY", # Sorts and temporary b-trees stay in RAM
+}
+if JOURNAL_MODE == "WAL":
+    DEFAULT_PRAGMAS["synchronous"] = "NORMAL" # Durable in WAL mode, avoids an fsync per commit
+
+# Retry policy for write() when the database stays locked beyond the busy timeout.
+MAX_WRITE_ATTEMPTS = 6
+RETRY_BASE_DELAY = 0.05 # Seconds before the first retry, doubled on every further attempt
+RETRY_MAX_DELAY = 2.0
+
+
+class QueryStats:
+    """Thread-safe accumulator of per-label query timings."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = {} # label -> [count, total_seconds, max_seconds]
+
+    def record(self, label, elapsed, count=1):
+        """
+        Adds a timing sample for a label.
+        Args:
+            label (str): Name of the query.
+            elapsed (float): Seconds spent.
+            count (int): 1 for an execution, 0 for time spent fetching rows of an execution already counted.
+        """
+        with self._lock:
+            entry = self._data.setdefault(label, [0, 0.0, 0.0])
+            entry[0] += count
+            entry[1] += elapsed
+            entry[2] = max(entry[2], elapsed)
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: label -> {'count', 'total_ms', 'avg_ms', 'max_ms'}
+        """
+        with self._lock:
+            return {
+                label: {
+                    'count': count,
+                    'total_ms': total * 1000.0,
+                    'avg_ms': (total / count) * 1000.0 if count else 0.0,
+                    'max_ms': worst * 1000.0,
+                }
+                for label, (count, total, worst) in self._data.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._data.clear()
+
+
+class ContentionStats:
+    """Thread-safe record of how often each write operation had to wait for a lock."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = {} # label -> [runs, retries, failures, seconds_waited]
+
+    def record(self, label, retries, waited, failed=False):
+        with self._lock:
+            entry = self._data.setdefault(label, [0, 0, 0, 0.0])
+            entry[0] += 1
+            entry[1] += retries
+            entry[2] += 1 if failed else 0
+            entry[3] += waited
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: label -> {'runs', 'retries', 'failures', 'waited_ms'}
+        """
+        with self._lock:
+            return {
+                label: {'runs': runs, 'retries': retries, 'failures': failures, 'waited_ms': waited * 1000.0}
+                for label, (runs, retries, failures, waited) in self._data.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._data.clear()
+
+
+def is_busy_error(error):
+    """True if a sqlite3 error means another connection holds the lock (SQLITE_BUSY/SQLITE_LOCKED)."""
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    code = getattr(error, "sqlite_errorcode", None)
+    if code is not None:
+        return code & 0xFF in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+    message = str(error).lower()
+    return "database is locked" in message or "database is busy" in message
+
+
+def _default_label(sql):
+    """Builds a short label from the SQL text when the caller did not name the query."""
+    return " ".join(sql.split())[:60]
+
+
+class TimedCursor:
+    """
+    Thin wrapper around sqlite3.Cursor that records how long each statement takes.
+    Execution and row fetching are both charged to the label of the last execute().
+    """
+    def __init__(self, cursor, stats):
+        self._cursor = cursor
+        self._stats = stats
+        self._label = None
+
+    def execute(self, sql, params=(), label=None):
+        self._label = label or _default_label(sql)
+        start = time.perf_counter()
+        self._cursor.execute(sql, params)
+        self._stats.record(self._label, time.perf_counter() - start)
+        return self
+
+    def executemany(self, sql, seq_of_params, label=None):
+        self._label = label or _default_label(sql)
+        start = time.perf_counter()
+        self._cursor.executemany(sql, seq_of_params)
+        self._stats.record(self._label, time.perf_counter() - start)
+        return self
+
+    def _timed_fetch(self, fetch, *args):
+        start = time.perf_counter()
+        result = fetch(*args)
+        if self._label:
+            self._stats.record(self._label, time.perf_counter() - start, count=0)
+        return result
+
+    def fetchone(self):
+        return self._timed_fetch(self._cursor.fetchone)
+
+    def fetchall(self):
+        return self._timed_fetch(self._cursor.fetchall)
+
+    def fetchmany(self, size=None):
+        return self._timed_fetch(self._cursor.fetchmany, size or self._cursor.arraysize)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+
+class ConnectionPool:
+    """
+    Bounded pool of sqlite3 connections.
+
+    A thread borrows one connection for the duration of a connection()/cursor()/transaction()
+    block; nested blocks on the same thread reuse the borrowed connection, so a transaction
+    and the reads inside it always see the same data. At most `max_connections` connections
+    exist at once; further borrowers wait up to `acquire_timeout` seconds.
+    """
+    def __init__(self, db_path=DB_PATH, max_connections=4, pragmas=None,
+                 cached_statements=256, timeout=DEFAULT_BUSY_TIMEOUT, acquire_timeout=30.0,
+                 max_write_attempts=MAX_WRITE_ATTEMPTS):
+        """
+        Args:
+            db_path (str): Path to the SQLite database file.
+            max_connections (int): Upper bound on open connections.
+            pragmas (dict): Pragmas applied to each new connection (defaults to DEFAULT_PRAGMAS).
+            cached_statements (int): Size of each connection's prepared-statement cache.
+            timeout (float): Busy timeout, seconds sqlite waits on a locked database before failing.
+            acquire_timeout (float): Seconds to wait for a free connection.
+            max_write_attempts (int): Attempts write() makes before giving up on a locked database.
+        """
+        self.db_path = db_path
+        self.max_connections = max_connections
+        self.pragmas = dict(DEFAULT_PRAGMAS if pragmas is None else pragmas)
+        self.cached_statements = cached_statements
+        self.timeout = timeout
+        self.acquire_timeout = acquire_timeout
+        self.max_write_attempts = max_write_attempts
+        self.stats = QueryStats()
+        self.contention = ContentionStats()
+
+        self._idle = queue.LifoQueue() # Most recently used first, its cache is the warmest
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._local = threading.local()
+        self._all_lock = threading.Lock()
+        self._all_connections = []
+        self._borrowed = {} # thread ident -> connection currently borrowed by that thread
+        self._shared_lock = threading.Lock()
+        self._shared = {} # name -> cache built on this pool, see shared()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False,
+                               cached_statements=self.cached_statements,
+                               isolation_level=None) # Transactions are controlled explicitly
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        with self._all_lock:
+            self._all_connections.append(conn)
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Borrows a connection for the current thread (re-entrant)."""
+        held = getattr(self._local, "conn", None)
+        if held is not None:
+            yield held
+            return
+
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            raise sqlite3.OperationalError("Timed out waiting for a free database connection.")
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._connect()
+        except BaseException:
+            self._slots.release()
+            raise
+
+        self._local.conn = conn
+        with self._all_lock:
+            self._borrowed[threading.get_ident()] = conn
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            with self._all_lock:
+                self._borrowed.pop(threading.get_ident(), None)
+            if conn.in_transaction: # Never hand out a connection with a dangling transaction
+                conn.rollback()
+            self._idle.put(conn)
+            self._slots.release()
+
+    @contextmanager
+    def cursor(self, row_factory=None):
+        """Yields a TimedCursor for reads (autocommit, no explicit transaction)."""
+        with self.connection() as conn:
+            raw_cursor = conn.cursor()
+            if row_factory is not None:
+                raw_cursor.row_factory = row_factory
+            try:
+                yield TimedCursor(raw_cursor, self.stats)
+            finally:
+                raw_cursor.close()
+
+    @contextmanager
+    def transaction(self, row_factory=None, immediate=False):
+        """
+        Yields a TimedCursor inside BEGIN ... COMMIT. Any exception rolls the transaction back.
+        A transaction() nested in another one on the same thread joins the outer transaction.
+        Args:
+            immediate (bool): Take the write lock at BEGIN, so a busy database is reported
+                              up front instead of when the first write is attempted.
+        """
+        with self.connection() as conn:
+            if conn.in_transaction:
+                with self.cursor(row_factory) as cursor:
+                    yield cursor
+                return
+
+            conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+            try:
+                with self.cursor(row_factory) as cursor:
+                    yield cursor
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+
+    def write(self, operation, label, row_factory=None):
+        """
+        Runs operation(cursor) in a BEGIN IMMEDIATE transaction and returns its result.
+        If the database is still locked after the busy timeout, the whole transaction is retried
+        with jittered exponential backoff, up to max_write_attempts times. Retries, failures and
+        time spent waiting are recorded under `label` (see contention_stats()).
+        Called inside another transaction on the same thread, the operation joins that
+        transaction and is not retried on its own.
+        Args:
+            operation (callable): Receives a TimedCursor; must only touch the database (no UI),
+                                  since it may run more than once.
+            label (str): Name of the operation for the contention statistics.
+        """
+        with self.connection() as conn:
+            if conn.in_transaction:
+                with self.cursor(row_factory) as cursor:
+                    return operation(cursor)
+
+        attempt = 0
+        waited = 0.0
+        while True:
+            attempt += 1
+            started = time.perf_counter()
+            try:
+                with self.transaction(row_factory, immediate=True) as cursor:
+                    result = operation(cursor)
+            except sqlite3.Error as error:
+                waited += time.perf_counter() - started
+                if not is_busy_error(error) or attempt >= self.max_write_attempts:
+                    self.contention.record(label, attempt - 1, waited, failed=is_busy_error(error))
+                    raise
+                delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (attempt - 1))
+                delay *= random.uniform(0.5, 1.5) # Jitter so competing stations do not retry in lockstep
+                time.sleep(delay)
+                waited += delay
+                continue
+            self.contention.record(label, attempt - 1, waited)
+            return result
+
+    def fetchall(self, sql, params=(), label=None):
+        with self.cursor() as cursor:
+            return cursor.execute(sql, params, label=label).fetchall()
+
+    def fetchone(self, sql, params=(), label=None):
+        with self.cursor() as cursor:
+            return cursor.execute(sql, params, label=label).fetchone()
+
+    def interrupt(self, thread_id):
+        """
+        Aborts the statement running on the connection borrowed by the given thread, if any; it then
+        fails with sqlite3.OperationalError("interrupted"). Safe to call from any thread.
+        """
+        with self._all_lock:
+            conn = self._borrowed.get(thread_id)
+            if conn is not None:
+                conn.interrupt()
+
+    def query_stats(self):
+        """Returns per-label timings, see QueryStats.snapshot()."""
+        return self.stats.snapshot()
+
+    def contention_stats(self):
+        """Returns per-operation lock contention, see ContentionStats.snapshot()."""
+        return self.contention.snapshot()
+
+    def shared(self, name, factory):
+        """
+        Returns the object registered under `name` for this pool (e.g. the vaccine catalogue),
+        created with factory(pool) on first use. Such caches belong to the pool: they are released
+        with it, and by clear_shared() when configure_pool() replaces it.
+        """
+        with self._shared_lock:
+            if name not in self._shared:
+                self._shared[name] = factory(self)
+            return self._shared[name]
+
+    def clear_shared(self):
+        with self._shared_lock:
+            self._shared.clear()
+
+    def close_all(self):
+        """Closes every connection created by this pool."""
+        with self._all_lock:
+            connections, self._all_connections = self._all_connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._idle = queue.LifoQueue()
+
+
+def read_table_versions(pool, tables):
+    """
+    Returns the change counters (TableVersion, maintained by triggers) of the given tables as a
+    tuple, in the same order. A cache built from these tables is current while the tuple is unchanged.
+    """
+    placeholders = ", ".join("?" * len(tables))
+    rows = dict(pool.fetchall(f"SELECT name, version FROM TableVersion WHERE name IN ({placeholders})", tuple(tables),
+                              label="table_versions"))
+    return tuple(rows.get(table) for table in tables)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """Returns the process-wide connection pool, creating it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool()
+        return _pool
+
+def configure_pool(**kwargs):
+    """
+    Replaces the process-wide pool with one built from the given ConnectionPool arguments.
+    Call this before the first page is created (e.g. to point at another database file).
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close_all()
+            _pool.clear_shared() # Its caches (and the data they hold) must not outlive it
+        _pool = ConnectionPool(**kwargs)
+        return _pool
+
+
+def format_query_stats(stats):
+    """Formats a query_stats() dict as a table sorted by total time."""
+    lines = [f"{'query':<62} {'count':>7} {'total ms':>10} {'avg ms':>8} {'max ms':>8}"]
+    for label, entry in sorted(stats.items(), key=lambda item: item[1]['total_ms'], reverse=True):
+        lines.append(f"{label:<62} {entry['count']:>7} {entry['total_ms']:>10.2f} {entry['avg_ms']:>8.3f} {entry['max_ms']:>8.3f}")
+    return "\n".join(lines)
+
+def format_contention_stats(stats):
+    """Formats a contention_stats() dict as a table sorted by retries."""
+    lines = [f"{'write operation':<40} {'runs':>7} {'retries':>8} {'failures':>9} {'waited ms':>10}"]
+    for label, entry in sorted(stats.items(), key=lambda item: item[1]['retries'], reverse=True):
+        lines.append(f"{label:<40} {entry['runs']:>7} {entry['retries']:>8} {entry['failures']:>9} {entry['waited_ms']:>10.1f}")
+    return "\n".join(lines)
+
+def _print_stats_at_exit():
+    if _pool is not None:
+        print(format_query_stats(_pool.query_stats()), file=sys.stderr)
+        print(format_contention_stats(_pool.contention_stats()), file=sys.stderr)
+
+# Set VACCINE_QUERY_STATS=1 to print the per-query timings when the application exits.
+if os.environ.get("VACCINE_QUERY_STATS"):
+    atexit.register(_print_stats_at_exit)
@@ -1,206 +1,816 @@
-import sqlite3 as sq
-import os
-
-db_path = "vaccinedatabase.db"
-
-# Remove the old database file to recreate it cleanly (optional)
-if os.path.exists(db_path):
-    os.remove(db_path)
-
-conn = sq.connect(db_path)
-cursor = conn.cursor()
-
-# Create the main tables
-cursor.executescript("""
-CREATE TABLE Person (
-    idperson INTEGER PRIMARY KEY AUTOINCREMENT,
-    firstname TEXT NOT NULL,
-    familyname TEXT NOT NULL,
-    dateofbirth TEXT NOT NULL -- Storing as TEXT, consider YYYY-MM-DD format
-);
-
-CREATE TABLE Credentials (
-    email TEXT PRIMARY KEY,
-    password TEXT NOT NULL,
-    user_type TEXT NOT NULL CHECK(user_type IN ('doctor', 'patient', 'nurse', 'center_admin')),
-    person_id INTEGER UNIQUE, -- Ensure one credential per person
-    FOREIGN KEY (person_id) REFERENCES Person(idperson)
-);
-
-CREATE TABLE Doctor (
-    iddoctor INTEGER PRIMARY KEY AUTOINCREMENT,
-    idperson INTEGER NOT NULL UNIQUE, -- Ensure one doctor profile per person
-    FOREIGN KEY (idperson) REFERENCES Person(idperson)
-);
-
-CREATE TABLE Nurse (
-    idnurse INTEGER PRIMARY KEY AUTOINCREMENT,
-    idperson INTEGER NOT NULL UNIQUE, -- Ensure one nurse profile per person
-    FOREIGN KEY (idperson) REFERENCES Person(idperson)
-);
-
-CREATE TABLE CenterAdmin (
-    idadmin INTEGER PRIMARY KEY AUTOINCREMENT,
-    idperson INTEGER NOT NULL UNIQUE, -- Ensure one admin profile per person
-    FOREIGN KEY (idperson) REFERENCES Person(idperson)
-);
-
-CREATE TABLE Patient (
-    idpatient INTEGER PRIMARY KEY AUTOINCREMENT,
-    idperson INTEGER NOT NULL UNIQUE, -- Ensure one patient profile per person
-    FOREIGN KEY (idperson) REFERENCES Person(idperson)
-);
-
--- Junction table to link doctors and their patients
-CREATE TABLE DoctorPatient (
-    iddoctor INTEGER,
-    idpatient INTEGER,
-    PRIMARY KEY (iddoctor, idpatient), -- Ensures a doctor can only be linked to a patient once
-    FOREIGN KEY (iddoctor) REFERENCES Doctor(iddoctor),
-    FOREIGN KEY (idpatient) REFERENCES Patient(idpatient)
-);
-
-CREATE TABLE Medicine (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    Med_name TEXT NOT NULL UNIQUE -- Vaccine names should be unique
-);
-
-CREATE TABLE Prescription (
-    id_prescription INTEGER PRIMARY KEY AUTOINCREMENT,
-    idpatient INTEGER,
-    id_medicine INTEGER, -- Renamed from id_vaccine to match Medicine table
-    iddoctor INTEGER,
-    quantity INTEGER DEFAULT 1, -- Added quantity for prescription
-    status TEXT DEFAULT 'pending' CHECK(status IN ('pending', 'administered', 'cancelled')), -- Added more statuses
-    prescription_date TEXT, -- Date of prescription
-    FOREIGN KEY (idpatient) REFERENCES Patient(idpatient),
-    FOREIGN KEY (id_medicine) REFERENCES Medicine(id),
-    FOREIGN KEY (iddoctor) REFERENCES Doctor(iddoctor)
-);
-
-CREATE TABLE VaccinationCenter (
-    idcenter INTEGER PRIMARY KEY AUTOINCREMENT,
-    name TEXT NOT NULL UNIQUE,
-    address TEXT,
-    admin_id INTEGER UNIQUE, -- Assuming one admin per center
-    FOREIGN KEY (admin_id) REFERENCES CenterAdmin(idadmin)
-);
-
-CREATE TABLE CenterStock (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    center_id INTEGER,
-    vaccine_id INTEGER, -- This refers to Medicine.id
-    quantity INTEGER DEFAULT 0,
-    last_updated TEXT, -- Timestamp for when the stock was last updated
-    UNIQUE (center_id, vaccine_id), -- Ensures one stock entry per vaccine per center
-    FOREIGN KEY (center_id) REFERENCES VaccinationCenter(idcenter),
-    FOREIGN KEY (vaccine_id) REFERENCES Medicine(id)
-);
-
-CREATE TABLE AdministrationLog (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    prescription_id INTEGER UNIQUE, -- A prescription should only be administered once
-    nurse_id INTEGER,
-    center_id INTEGER, -- Center where the vaccine was administered
-    administered_at TEXT, -- Timestamp of administration
-    FOREIGN KEY (prescription_id) REFERENCES Prescription(id_prescription),
-    FOREIGN KEY (nurse_id) REFERENCES Nurse(idnurse),
-    FOREIGN KEY (center_id) REFERENCES VaccinationCenter(idcenter)
-);
-""")
-
-# Insert sample data
-# -----------------------------------
-# Persons
-persons_data = [
-    ('John', 'Doe', '1980-01-15'),      # Person ID 1 (Doctor)
-    ('Alice', 'Smith', '1990-04-10'),   # Person ID 2 (Doctor)
-    ('Robert', 'Patient', '2000-06-01'),# Person ID 3 (Patient)
-    ('Laura', 'Palmer', '2001-07-21'),  # Person ID 4 (Patient)
-    ('Michael', 'Nurse', '1985-03-30'), # Person ID 5 (Nurse)
-    ('Claire', 'Admin', '1970-12-12'),  # Person ID 6 (Center Admin)
-    ('David', 'Lee', '1992-08-25')      # Person ID 7 (Nurse)
-]
-cursor.executemany("INSERT INTO Person (firstname, familyname, dateofbirth) VALUES (?, ?, ?)", persons_data)
-
-# Roles and Credentials
-# Doctor 1
-cursor.execute("INSERT INTO Doctor (idperson) VALUES (1)")
-cursor.execute("INSERT INTO Credentials (email, password, user_type, person_id) VALUES ('doc1@example.com', 'password123', 'doctor', 1)")
-
-# Doctor 2
-cursor.execute("INSERT INTO Doctor (idperson) VALUES (2)")
-cursor.execute("INSERT INTO Credentials (email, password, user_type, person_id) VALUES ('doc2@example.com', 'password123', 'doctor', 2)")
-
-# Patient 1
-cursor.execute("INSERT INTO Patient (idperson) VALUES (3)")
-cursor.execute("INSERT INTO Credentials (email, password, user_type, person_id) VALUES ('patient1@example.com', 'password123', 'patient', 3)")
-
-# Patient 2
-cursor.execute("INSERT INTO Patient (idperson) VALUES (4)")
-cursor.execute("INSERT INTO Credentials (email, password, user_type, person_id) VALUES ('patient2@example.com', 'password123', 'patient', 4)")
-
-# Nurse 1
-cursor.execute("INSERT INTO Nurse (idperson) VALUES (5)")
-cursor.execute("INSERT INTO Credentials (email, password, user_type, person_id) VALUES ('nurse1@example.com', 'password123', 'nurse', 5)")
-
-# Center Admin 1
-cursor.execute("INSERT INTO CenterAdmin (idperson) VALUES (6)")
-cursor.execute("INSERT INTO Credentials (email, password, user_type, person_id) VALUES ('admin1@example.com', 'password123', 'center_admin', 6)")
-
-# Nurse 2
-cursor.execute("INSERT INTO Nurse (idperson) VALUES (7)")
-cursor.execute("INSERT INTO Credentials (email, password, user_type, person_id) VALUES ('nurse2@example.com', 'password123', 'nurse', 7)")
-
-
-# Link patients to doctors (DoctorPatient table uses Doctor.iddoctor and Patient.idpatient)
-# Assuming Doctor with idperson=1 has iddoctor=1, Patient with idperson=3 has idpatient=1, etc.
-cursor.execute("INSERT INTO DoctorPatient (iddoctor, idpatient) VALUES (1, 1)") # John Doe (doc) - Robert Patient (pat)
-cursor.execute("INSERT INTO DoctorPatient (iddoctor, idpatient) VALUES (1, 2)") # John Doe (doc) - Laura Palmer (pat)
-cursor.execute("INSERT INTO DoctorPatient (iddoctor, idpatient) VALUES (2, 2)") # Alice Smith (doc) - Laura Palmer (pat)
-
-
-# Available Vaccines (Medicines)
-vaccines_data = [
-    ('COVID-19 Vaccine (Pfizer)',),
-    ('Influenza Vaccine (Flu Shot)',),
-    ('Hepatitis B Vaccine',),
-    ('MMR Vaccine (Measles, Mumps, Rubella)',)
-]
-cursor.executemany("INSERT INTO Medicine (Med_name) VALUES (?)", vaccines_data)
-
-# Vaccination Centers
-# Center Admin with idperson=6 has idadmin=1
-cursor.execute("INSERT INTO VaccinationCenter (name, address, admin_id) VALUES ('City Central Vaccination Clinic', '123 Health St, Anytown', 1)")
-cursor.execute("INSERT INTO VaccinationCenter (name, address) VALUES ('Community Health Hub', '456 Wellness Ave, Otherville')") # No admin assigned initially
-
-# Stock for Centers (CenterStock uses VaccinationCenter.idcenter and Medicine.id)
-# City Central Vaccination Clinic (idcenter=1)
-cursor.execute("INSERT INTO CenterStock (center_id, vaccine_id, quantity, last_updated) VALUES (1, 1, 100, datetime('now'))") # Pfizer
-cursor.execute("INSERT INTO CenterStock (center_id, vaccine_id, quantity, last_updated) VALUES (1, 2, 150, datetime('now'))") # Flu Shot
-cursor.execute("INSERT INTO CenterStock (center_id, vaccine_id, quantity, last_updated) VALUES (1, 3, 75, datetime('now'))")  # Hep B
-
-# Community Health Hub (idcenter=2)
-cursor.execute("INSERT INTO CenterStock (center_id, vaccine_id, quantity, last_updated) VALUES (2, 1, 50, datetime('now'))")  # Pfizer
-cursor.execute("INSERT INTO CenterStock (center_id, vaccine_id, quantity, last_updated) VALUES (2, 4, 60, datetime('now'))")  # MMR
-
-
-# Sample Prescriptions (Prescription uses Patient.idpatient, Medicine.id, Doctor.iddoctor)
-# Patient 1 (Robert, idpatient=1), Vaccine: Pfizer (id=1), Doctor: John Doe (iddoctor=1)
-cursor.execute("INSERT INTO Prescription (idpatient, id_medicine, iddoctor, quantity, status, prescription_date) VALUES (1, 1, 1, 1, 'pending', date('now'))")
-# Patient 2 (Laura, idpatient=2), Vaccine: Flu Shot (id=2), Doctor: John Doe (iddoctor=1)
-cursor.execute("INSERT INTO Prescription (idpatient, id_medicine, iddoctor, quantity, status, prescription_date) VALUES (2, 2, 1, 1, 'pending', date('now'))")
-# Patient 2 (Laura, idpatient=2), Vaccine: Hep B (id=3), Doctor: Alice Smith (iddoctor=2)
-cursor.execute("INSERT INTO Prescription (idpatient, id_medicine, iddoctor, quantity, status, prescription_date) VALUES (2, 3, 2, 1, 'administered', date('now', '-7 days'))")
-
-
-# Sample Administration Log (AdministrationLog uses Prescription.id_prescription, Nurse.idnurse, VaccinationCenter.idcenter)
-# For the administered prescription (id_prescription=3), Nurse: Michael Nurse (idnurse=1), Center: City Central (idcenter=1)
-cursor.execute("INSERT INTO AdministrationLog (prescription_id, nurse_id, center_id, administered_at) VALUES (3, 1, 1, datetime('now', '-7 days'))")
-
-
-conn.commit()
-cursor.close()
-conn.close()
-
-print("✅ Database 'vaccinedatabase.db' initialized successfully with enhanced schema and sample data.")
+# database.py – Vaccination System
+"""
+Creates and upgrades the SQLite database used by the application.
+
+The schema is built by an ordered list of migrations. PRAGMA user_version stores the number
+of the last migration applied, so running this script against a live database only applies
+the missing steps, in place, without rebuilding tables or touching existing rows.
+Sample data is only inserted when asked for.
+
+Usage:
+    python database.py                  # Create the database or upgrade it to the latest schema
+    python database.py --seed           # ... and insert the sample data into an empty database
+    python database.py --reset --seed   # Delete the file first and rebuild it with sample data
+"""
+import sqlite3 as sq
+import argparse
+import os
+import time
+from collections import namedtuple
+import queries
+
+db_path = "vaccinedatabase.db"
+
+# A migration is applied in its own transaction together with the user_version bump.
+# `backfill` (optional) runs afterwards in transactions of its own, typically chunks of
+# backfill_in_chunks(); it must be idempotent, because an interrupted backfill is simply re-run
+# on the next upgrade (user_version is only bumped once it has finished).
+Migration = namedtuple("Migration", ["version", "name", "apply", "backfill"], defaults=[None])
+
+
+def run_script(conn, script):
+    """Executes a multi-statement SQL script statement by statement inside the current transaction
+    (unlike executescript(), which would commit first)."""
+    statement = ""
+    for line in script.splitlines(keepends=True):
+        statement += line
+        if sq.complete_statement(statement):
+            conn.execute(statement)
+            statement = ""
+    if statement.strip():
+        conn.execute(statement)
+
+def column_exists(conn, table, column):
+    return any(row[1] == column for row in conn.execute(f"PRAGMA table_info({table})"))
+
+def add_column_if_missing(conn, table, column, definition):
+    """ALTER TABLE ... ADD COLUMN, skipped when the column already exists (keeps migrations idempotent)."""
+    if not column_exists(conn, table, column):
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+# Chunked backfills: the rowids [next_rowid, end_rowid) of their table are not done yet (none once
+# finished; the row is kept, so re-running the migration does not start the backfill again).
+# Rows added after the migration (rowid >= end_rowid, AUTOINCREMENT) are handled by its triggers.
+BACKFILL_PROGRESS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS BackfillProgress (
+    name TEXT PRIMARY KEY,
+    next_rowid INTEGER NOT NULL,
+    end_rowid INTEGER NOT NULL
+);
+"""
+
+def start_backfill(conn, name, table):
+    """
+    Registers the chunked backfill `name` over the rows `table` has now. Called from a migration's
+    apply(), in the transaction that also creates the triggers maintaining the new data, so every
+    row is either backfilled or handled by a trigger. Does nothing if the backfill was already started.
+    """
+    run_script(conn, BACKFILL_PROGRESS_SCHEMA)
+    conn.execute(f"""INSERT OR IGNORE INTO BackfillProgress (name, next_rowid, end_rowid)
+                     SELECT ?, coalesce(min(rowid), 0), coalesce(max(rowid), 0) + 1 FROM {table}""", (name,))
+
+def backfill_in_chunks(conn, name, sql, chunk_size=50000, progress=None):
+    """
+    Runs the backfill registered by start_backfill() in rowid ranges, committing after each chunk
+    together with its progress, so a large backfill never holds the write lock for long and an
+    interrupted one resumes after the last committed chunk instead of redoing it.
+    Args:
+        conn (sqlite3.Connection): Connection in autocommit mode (isolation_level=None).
+        name (str): The backfill's name in BackfillProgress.
+        sql (str): Statement using the named parameters :lo and :hi (rowid >= :lo AND rowid < :hi).
+        chunk_size (int): Rows per transaction.
+        progress (callable): Optional callback(done_up_to_rowid, last_rowid).
+    Returns:
+        int: Total number of rows changed.
+    """
+    low, end = conn.execute("SELECT next_rowid, end_rowid FROM BackfillProgress WHERE name = ?", (name,)).fetchone()
+    changed = 0
+    for lo in range(low, end, chunk_size):
+        hi = min(lo + chunk_size, end)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            changed += conn.execute(sql, {"lo": lo, "hi": hi}).rowcount
+            conn.execute("UPDATE BackfillProgress SET next_rowid = ? WHERE name = ?", (hi, name))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        if progress:
+            progress(hi - 1, end - 1)
+    return changed
+
+
+# --- Migrations ---------------------------------------------------------------
+
+BASE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS Person (
+    idperson INTEGER PRIMARY KEY AUTOINCREMENT,
+    firstname TEXT NOT NULL,
+    familyname TEXT NOT NULL,
+    dateofbirth TEXT NOT NULL -- Storing as TEXT, consider YYYY-MM-DD format
+);
+
+CREATE TABLE IF NOT EXISTS Credentials (
+    email TEXT PRIMARY KEY,
+    password TEXT NOT NULL,
+    user_type TEXT NOT NULL CHECK(user_type IN ('doctor', 'patient', 'nurse', 'center_admin')),
+    person_id INTEGER UNIQUE, -- Ensure one credential per person
+    FOREIGN KEY (person_id) REFERENCES Person(idperson)
+);
+
+CREATE TABLE IF NOT EXISTS Doctor (
+    iddoctor INTEGER PRIMARY KEY AUTOINCREMENT,
+    idperson INTEGER NOT NULL UNIQUE, -- Ensure one doctor profile per person
+    FOREIGN KEY (idperson) REFERENCES Person(idperson)
+);
+
+CREATE TABLE IF NOT EXISTS Nurse (
+    idnurse INTEGER PRIMARY KEY AUTOINCREMENT,
+    idperson INTEGER NOT NULL UNIQUE, -- Ensure one nurse profile per person
+    FOREIGN KEY (idperson) REFERENCES Person(idperson)
+);
+
+CREATE TABLE IF NOT EXISTS CenterAdmin (
+    idadmin INTEGER PRIMARY KEY AUTOINCREMENT,
+    idperson INTEGER NOT NULL UNIQUE, -- Ensure one admin profile per person
+    FOREIGN KEY (idperson) REFERENCES Person(idperson)
+);
+
+CREATE TABLE IF NOT EXISTS Patient (
+    idpatient INTEGER PRIMARY KEY AUTOINCREMENT,
+    idperson INTEGER NOT NULL UNIQUE, -- Ensure one patient profile per person
+    FOREIGN KEY (idperson) REFERENCES Person(idperson)
+);
+
+-- Junction table to link doctors and their patients
+CREATE TABLE IF NOT EXISTS DoctorPatient (
+    iddoctor INTEGER,
+    idpatient INTEGER,
+    PRIMARY KEY (iddoctor, idpatient), -- Ensures a doctor can only be linked to a patient once
+    FOREIGN KEY (iddoctor) REFERENCES Doctor(iddoctor),
+    FOREIGN KEY (idpatient) REFERENCES Patient(idpatient)
+);
+
+CREATE TABLE IF NOT EXISTS Medicine (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    Med_name TEXT NOT NULL UNIQUE -- Vaccine names should be unique
+);
+
+CREATE TABLE IF NOT EXISTS Prescription (
+    id_prescription INTEGER PRIMARY KEY AUTOINCREMENT,
+    idpatient INTEGER,
+    id_medicine INTEGER, -- Renamed from id_vaccine to match Medicine table
+    iddoctor INTEGER,
+    quantity INTEGER DEFAULT 1, -- Added quantity for prescription
+    status TEXT DEFAULT 'pending' CHECK(status IN ('pending', 'administered', 'cancelled')), -- Added more statuses
+    prescription_date TEXT, -- Date of prescription
+    FOREIGN KEY (idpatient) REFERENCES Patient(idpatient),
+    FOREIGN KEY (id_medicine) REFERENCES Medicine(id),
+    FOREIGN KEY (iddoctor) REFERENCES Doctor(iddoctor)
+);
+
+CREATE TABLE IF NOT EXISTS VaccinationCenter (
+    idcenter INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL UNIQUE,
+    address TEXT,
+    admin_id INTEGER UNIQUE, -- Assuming one admin per center
+    FOREIGN KEY (admin_id) REFERENCES CenterAdmin(idadmin)
+);
+
+CREATE TABLE IF NOT EXISTS CenterStock (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    center_id INTEGER,
+    vaccine_id INTEGER, -- This refers to Medicine.id
+    quantity INTEGER DEFAULT 0,
+    last_updated TEXT, -- Timestamp for when the stock was last updated
+    UNIQUE (center_id, vaccine_id), -- Ensures one stock entry per vaccine per center
+    FOREIGN KEY (center_id) REFERENCES VaccinationCenter(idcenter),
+    FOREIGN KEY (vaccine_id) REFERENCES Medicine(id)
+);
+
+CREATE TABLE IF NOT EXISTS AdministrationLog (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    prescription_id INTEGER UNIQUE, -- A prescription should only be administered once
+    nurse_id INTEGER,
+    center_id INTEGER, -- Center where the vaccine was administered
+    administered_at TEXT, -- Timestamp of administration
+    FOREIGN KEY (prescription_id) REFERENCES Prescription(id_prescription),
+    FOREIGN KEY (nurse_id) REFERENCES Nurse(idnurse),
+    FOREIGN KEY (center_id) REFERENCES VaccinationCenter(idcenter)
+);
+"""
+
+def _migration_1_base_schema(conn):
+    # IF NOT EXISTS lets databases created before migrations existed adopt version 1 unchanged.
+    run_script(conn, BASE_SCHEMA)
+
+
+# Indexes for the dashboards' hot lookups (see queries.HOT_QUERIES).
+# DoctorPatient needs none: its (iddoctor, idpatient) primary key already serves iddoctor lookups.
+DASHBOARD_INDEXES = """
+-- Patient file and history joins: all prescriptions of a patient, newest first (covering)
+CREATE INDEX IF NOT EXISTS idx_prescription_patient
+    ON Prescription (idpatient, prescription_date, status, id_medicine, iddoctor, quantity);
+
+-- Pending prescriptions only: stays small because administered rows drop out of it (covering)
+CREATE INDEX IF NOT EXISTS idx_prescription_pending
+    ON Prescription (idpatient, prescription_date, id_medicine, iddoctor, quantity)
+    WHERE status = 'pending';
+
+-- Centers that have a vaccine in stock, largest stock first (covering)
+CREATE INDEX IF NOT EXISTS idx_centerstock_available
+    ON CenterStock (vaccine_id, quantity, center_id)
+    WHERE quantity > 0;
+"""
+
+def _migration_2_dashboard_indexes(conn):
+    run_script(conn, DASHBOARD_INDEXES)
+
+
+# Full-text index over the names and date of birth of every person, for the type-ahead patient
+# search (see patient_search.py). External content: the text lives only in Person, the FTS
+# table stores just the index and is kept in sync by triggers. While the backfill runs, the
+# update and delete triggers skip the people it has not indexed yet: removing an entry that was
+# never indexed would corrupt the index, and the backfill reads their current values anyway.
+PERSON_SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS PersonSearch USING fts5(
+    firstname, familyname, dateofbirth,
+    content='Person', content_rowid='idperson',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='1 2 3' -- Fast prefix queries for the first keystrokes
+);
+
+CREATE TRIGGER IF NOT EXISTS person_search_insert AFTER INSERT ON Person BEGIN
+    INSERT INTO PersonSearch (rowid, firstname, familyname, dateofbirth)
+    VALUES (new.idperson, new.firstname, new.familyname, new.dateofbirth);
+END;
+
+CREATE TRIGGER IF NOT EXISTS person_search_delete AFTER DELETE ON Person
+WHEN NOT EXISTS (SELECT 1 FROM BackfillProgress
+                 WHERE name = 'PersonSearch' AND old.idperson >= next_rowid AND old.idperson < end_rowid)
+BEGIN
+    INSERT INTO PersonSearch (PersonSearch, rowid, firstname, familyname, dateofbirth)
+    VALUES ('delete', old.idperson, old.firstname, old.familyname, old.dateofbirth);
+END;
+
+CREATE TRIGGER IF NOT EXISTS person_search_update AFTER UPDATE OF firstname, familyname, dateofbirth ON Person
+WHEN NOT EXISTS (SELECT 1 FROM BackfillProgress
+                 WHERE name = 'PersonSearch' AND old.idperson >= next_rowid AND old.idperson < end_rowid)
+BEGIN
+    INSERT INTO PersonSearch (PersonSearch, rowid, firstname, familyname, dateofbirth)
+    VALUES ('delete', old.idperson, old.firstname, old.familyname, old.dateofbirth);
+    INSERT INTO PersonSearch (rowid, firstname, familyname, dateofbirth)
+    VALUES (new.idperson, new.firstname, new.familyname, new.dateofbirth);
+END;
+"""
+
+PERSON_SEARCH_BACKFILL = """
+INSERT INTO PersonSearch (rowid, firstname, familyname, dateofbirth)
+SELECT idperson, firstname, familyname, dateofbirth FROM Person
+WHERE idperson >= :lo AND idperson < :hi
+"""
+
+def _migration_3_person_search(conn):
+    start_backfill(conn, "PersonSearch", "Person") # Before the triggers, which refer to its progress
+    run_script(conn, PERSON_SEARCH_SCHEMA)
+
+def _backfill_person_search(conn):
+    backfill_in_chunks(conn, "PersonSearch", PERSON_SEARCH_BACKFILL)
+
+
+# Change counters for in-memory caches: a trigger bumps a table's version on every change, so a
+# cache can check whether it is still current by reading one row instead of re-reading the table.
+TABLE_VERSION_SCHEMA = """
+CREATE TABLE IF NOT EXISTS TableVersion (
+    name TEXT PRIMARY KEY, -- Name of the tracked table
+    version INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+def version_triggers(table, events=("INSERT", "UPDATE", "DELETE")):
+    """SQL creating the triggers that bump `table`'s row in TableVersion (and the row itself)."""
+    script = f"INSERT OR IGNORE INTO TableVersion (name, version) VALUES ('{table}', 0);\n"
+    for event in events:
+        script += (f"CREATE TRIGGER IF NOT EXISTS {table.lower()}_version_{event.lower()} AFTER {event} ON {table} BEGIN\n"
+                   f"    UPDATE TableVersion SET version = version + 1 WHERE name = '{table}';\n"
+                   f"END;\n")
+    return script
+
+def _migration_4_stock_versions(conn):
+    # Vaccine availability (availability.py) depends on the stock and on the center names
+    run_script(conn, TABLE_VERSION_SCHEMA)
+    run_script(conn, version_triggers("CenterStock"))
+    run_script(conn, version_triggers("VaccinationCenter"))
+
+def _migration_5_medicine_version(conn):
+    # The vaccine catalogue (vaccine_catalogue.py) is only re-read when Medicine changes
+    run_script(conn, version_triggers("Medicine"))
+
+
+
+# Stock ledger (see stock_ledger.py): every stock change is appended to StockMovement, and a
+# trigger applies it to CenterStock, which stays the current balance (one row per center and
+# vaccine) so reading a balance never sums the ledger. Each movement also stores the balance it
+# left, and every STOCK_SNAPSHOT_INTERVAL movements all balances are copied into a snapshot, so the
+# stock at any past time is rebuilt from the snapshot before it plus fewer than that many movements.
+STOCK_SNAPSHOT_INTERVAL = 10000
+
+STOCK_LEDGER_SCHEMA = """
+CREATE TABLE IF NOT EXISTS StockMovement (
+    id INTEGER PRIMARY KEY, -- Order of the movements; rows are never updated or deleted
+    center_id INTEGER NOT NULL,
+    vaccine_id INTEGER NOT NULL, -- Medicine.id
+    change INTEGER NOT NULL, -- Doses added (positive) or taken (negative)
+    balance_after INTEGER NOT NULL, -- CenterStock.quantity once this movement is applied
+    kind TEXT NOT NULL CHECK(kind IN ('opening', 'intake', 'removal', 'administration', 'transfer')),
+    reference INTEGER, -- Prescription.id_prescription for an administration, the other center for a transfer
+    moved_at TEXT NOT NULL DEFAULT (datetime('now')),
+    FOREIGN KEY (center_id) REFERENCES VaccinationCenter(idcenter),
+    FOREIGN KEY (vaccine_id) REFERENCES Medicine(id)
+);
+
+-- History of one center's vaccine, and its balance at a point in time (covering)
+CREATE INDEX IF NOT EXISTS idx_stockmovement_history
+    ON StockMovement (center_id, vaccine_id, moved_at, balance_after);
+
+CREATE TABLE IF NOT EXISTS StockSnapshot (
+    movement_id INTEGER PRIMARY KEY, -- Last StockMovement.id included in the snapshot
+    taken_at TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_stocksnapshot_taken_at ON StockSnapshot (taken_at, movement_id);
+
+CREATE TABLE IF NOT EXISTS StockSnapshotBalance (
+    movement_id INTEGER NOT NULL, -- StockSnapshot.movement_id
+    center_id INTEGER NOT NULL,
+    vaccine_id INTEGER NOT NULL,
+    quantity INTEGER NOT NULL,
+    PRIMARY KEY (movement_id, center_id, vaccine_id)
+) WITHOUT ROWID;
+"""
+
+STOCK_LEDGER_TRIGGERS = f"""
+-- A movement must leave the stock it claims, and never a negative one
+CREATE TRIGGER IF NOT EXISTS stock_movement_check BEFORE INSERT ON StockMovement BEGIN
+    SELECT RAISE(ABORT, 'not enough stock') WHERE NEW.balance_after < 0;
+    SELECT RAISE(ABORT, 'balance_after does not match the current stock')
+    WHERE NEW.balance_after IS NOT coalesce((SELECT quantity FROM CenterStock
+                                             WHERE center_id = NEW.center_id AND vaccine_id = NEW.vaccine_id), 0) + NEW.change;
+END;
+
+CREATE TRIGGER IF NOT EXISTS stock_movement_apply AFTER INSERT ON StockMovement BEGIN
+    INSERT INTO CenterStock (center_id, vaccine_id, quantity, last_updated)
+    VALUES (NEW.center_id, NEW.vaccine_id, NEW.change, NEW.moved_at)
+    ON CONFLICT (center_id, vaccine_id) DO UPDATE
+    SET quantity = quantity + excluded.quantity, last_updated = excluded.last_updated;
+    -- Periodic snapshot (the WHERE is checked once, before CenterStock is read)
+    INSERT INTO StockSnapshot (movement_id, taken_at)
+    SELECT NEW.id, NEW.moved_at WHERE NEW.id % {STOCK_SNAPSHOT_INTERVAL} = 0;
+    INSERT INTO StockSnapshotBalance (movement_id, center_id, vaccine_id, quantity)
+    SELECT NEW.id, center_id, vaccine_id, quantity FROM CenterStock WHERE NEW.id % {STOCK_SNAPSHOT_INTERVAL} = 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS stock_movement_no_update BEFORE UPDATE ON StockMovement BEGIN
+    SELECT RAISE(ABORT, 'StockMovement is append-only');
+END;
+
+CREATE TRIGGER IF NOT EXISTS stock_movement_no_delete BEFORE DELETE ON StockMovement BEGIN
+    SELECT RAISE(ABORT, 'StockMovement is append-only');
+END;
+"""
+
+def _migration_6_stock_ledger(conn):
+    run_script(conn, STOCK_LEDGER_SCHEMA)
+    # The existing balances open the ledger, as of their last update (the quantity has not changed
+    # since), and form its first snapshot. Done before the triggers exist, so they are not applied twice.
+    conn.execute("""
+        INSERT INTO StockMovement (center_id, vaccine_id, change, balance_after, kind, moved_at)
+        SELECT center_id, vaccine_id, coalesce(quantity, 0), coalesce(quantity, 0), 'opening',
+               coalesce(last_updated, datetime('now'))
+        FROM CenterStock
+        WHERE NOT EXISTS (SELECT 1 FROM StockMovement) -- Idempotent
+        ORDER BY last_updated, id
+    """)
+    conn.execute("""
+        INSERT OR IGNORE INTO StockSnapshot (movement_id, taken_at)
+        SELECT max(id), datetime('now') FROM StockMovement HAVING max(id) IS NOT NULL
+    """)
+    conn.execute("""
+        INSERT OR IGNORE INTO StockSnapshotBalance (movement_id, center_id, vaccine_id, quantity)
+        SELECT (SELECT max(movement_id) FROM StockSnapshot), center_id, vaccine_id, coalesce(quantity, 0)
+        FROM CenterStock WHERE EXISTS (SELECT 1 FROM StockSnapshot)
+    """)
+    run_script(conn, STOCK_LEDGER_TRIGGERS)
+
+def _migration_7_dashboard_versions(conn):
+    # The dashboards' change watcher (change_watcher.py) re-queries a panel only when one of the
+    # tables it shows moved: patient lists, prescriptions and the vaccination history
+    for table in ("Person", "DoctorPatient", "Prescription", "AdministrationLog"):
+        run_script(conn, version_triggers(table))
+
+# Reporting rollups (see reporting.py): doses administered per day, center and vaccine, and the
+# pending backlog per vaccine, kept current by triggers so reports never aggregate AdministrationLog.
+# Besides the finest grain (DailyDoses) there are rollups per day and vaccine and per day and center,
+# and the same per month (month = its first day): every report sums the smallest tables that have
+# the columns it filters and groups by (see queries.REPORT_QUERIES).
+REPORTING_SCHEMA = """
+CREATE TABLE IF NOT EXISTS DailyDoses (
+    day TEXT NOT NULL, -- date(AdministrationLog.administered_at)
+    center_id INTEGER NOT NULL,
+    vaccine_id INTEGER NOT NULL, -- Medicine.id
+    administrations INTEGER NOT NULL, -- AdministrationLog rows
+    doses INTEGER NOT NULL, -- Sum of their Prescription.quantity
+    PRIMARY KEY (day, center_id, vaccine_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS DailyVaccineDoses (
+    day TEXT NOT NULL,
+    vaccine_id INTEGER NOT NULL,
+    administrations INTEGER NOT NULL,
+    doses INTEGER NOT NULL,
+    PRIMARY KEY (day, vaccine_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS DailyCenterDoses (
+    day TEXT NOT NULL,
+    center_id INTEGER NOT NULL,
+    administrations INTEGER NOT NULL,
+    doses INTEGER NOT NULL,
+    PRIMARY KEY (day, center_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS MonthlyVaccineDoses (
+    month TEXT NOT NULL, -- 'YYYY-MM-01'
+    vaccine_id INTEGER NOT NULL,
+    administrations INTEGER NOT NULL,
+    doses INTEGER NOT NULL,
+    PRIMARY KEY (month, vaccine_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS MonthlyCenterDoses (
+    month TEXT NOT NULL,
+    center_id INTEGER NOT NULL,
+    administrations INTEGER NOT NULL,
+    doses INTEGER NOT NULL,
+    PRIMARY KEY (month, center_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS PendingBacklog (
+    vaccine_id INTEGER PRIMARY KEY, -- Medicine.id
+    prescriptions INTEGER NOT NULL, -- Pending Prescription rows
+    doses INTEGER NOT NULL -- Sum of their quantity
+);
+"""
+
+# Created after the backfill, which is faster than updating them row by row
+REPORTING_INDEXES = """
+-- One center, or one vaccine, over a range of days (covering)
+CREATE INDEX IF NOT EXISTS idx_dailydoses_center ON DailyDoses (center_id, day, vaccine_id, administrations, doses);
+CREATE INDEX IF NOT EXISTS idx_dailydoses_vaccine ON DailyDoses (vaccine_id, day, center_id, administrations, doses);
+CREATE INDEX IF NOT EXISTS idx_dailyvaccinedoses_vaccine ON DailyVaccineDoses (vaccine_id, day, administrations, doses);
+"""
+
+# (table, grouping columns) of the dose rollups
+DOSE_ROLLUPS = (
+    ("DailyDoses", ("day", "center_id", "vaccine_id")),
+    ("DailyVaccineDoses", ("day", "vaccine_id")),
+    ("DailyCenterDoses", ("day", "center_id")),
+    ("MonthlyVaccineDoses", ("month", "vaccine_id")),
+    ("MonthlyCenterDoses", ("month", "center_id")),
+)
+
+def _dose_rollup_upserts(sign, source, day, center, vaccine, quantity):
+    """
+    SQL adding (sign "+") or removing (sign "-") administrations in every dose rollup.
+    `source` is the FROM ... WHERE selecting them; the other arguments are column expressions.
+    Administrations without a valid day, center or vaccine are not counted (reporting.verify does the same).
+    """
+    columns = {"day": f"date({day})", "month": f"strftime('%Y-%m-01', {day})", "center_id": center, "vaccine_id": vaccine}
+    script = ""
+    for table, keys in DOSE_ROLLUPS:
+        script += (f"    INSERT INTO {table} ({', '.join(keys)}, administrations, doses)\n"
+                   f"    SELECT {', '.join(columns[key] for key in keys)}, {sign}1, {sign}ifnull({quantity}, 0)\n"
+                   f"    {source} AND date({day}) IS NOT NULL AND {center} IS NOT NULL AND {vaccine} IS NOT NULL\n"
+                   f"    ON CONFLICT ({', '.join(keys)}) DO UPDATE\n"
+                   f"    SET administrations = administrations + excluded.administrations, doses = doses + excluded.doses;\n")
+    return script
+
+def _backlog_upsert(sign, row):
+    """SQL adding or removing prescription `row` (NEW or OLD) in PendingBacklog if it is pending."""
+    return (f"    INSERT INTO PendingBacklog (vaccine_id, prescriptions, doses)\n"
+            f"    SELECT {row}.id_medicine, {sign}1, {sign}ifnull({row}.quantity, 0)\n"
+            f"    WHERE {row}.status = 'pending' AND {row}.id_medicine IS NOT NULL\n"
+            f"    ON CONFLICT (vaccine_id) DO UPDATE\n"
+            f"    SET prescriptions = prescriptions + excluded.prescriptions, doses = doses + excluded.doses;\n")
+
+def _administration_upserts(sign, log):
+    return _dose_rollup_upserts(sign, f"FROM Prescription pr WHERE pr.id_prescription = {log}.prescription_id",
+                                f"{log}.administered_at", f"{log}.center_id", "pr.id_medicine", "pr.quantity")
+
+def _prescription_upserts(sign, row):
+    """The administration of prescription `row`, if any, counted with the row's vaccine and quantity."""
+    return _dose_rollup_upserts(sign, f"FROM AdministrationLog al WHERE al.prescription_id = {row}.id_prescription",
+                                "al.administered_at", "al.center_id", f"{row}.id_medicine", f"{row}.quantity")
+
+REPORTING_TRIGGERS = f"""
+CREATE TRIGGER IF NOT EXISTS reporting_administration_insert AFTER INSERT ON AdministrationLog BEGIN
+{_administration_upserts("+", "NEW")}END;
+
+CREATE TRIGGER IF NOT EXISTS reporting_administration_delete AFTER DELETE ON AdministrationLog BEGIN
+{_administration_upserts("-", "OLD")}END;
+
+CREATE TRIGGER IF NOT EXISTS reporting_administration_update
+AFTER UPDATE OF prescription_id, center_id, administered_at ON AdministrationLog BEGIN
+{_administration_upserts("-", "OLD")}{_administration_upserts("+", "NEW")}END;
+
+CREATE TRIGGER IF NOT EXISTS reporting_prescription_insert AFTER INSERT ON Prescription BEGIN
+{_backlog_upsert("+", "NEW")}END;
+
+CREATE TRIGGER IF NOT EXISTS reporting_prescription_delete AFTER DELETE ON Prescription BEGIN
+{_backlog_upsert("-", "OLD")}END;
+
+CREATE TRIGGER IF NOT EXISTS reporting_prescription_update
+AFTER UPDATE OF status, quantity, id_medicine ON Prescription BEGIN
+{_backlog_upsert("-", "OLD")}{_backlog_upsert("+", "NEW")}END;
+
+-- An administered prescription whose vaccine or quantity is corrected moves its doses
+CREATE TRIGGER IF NOT EXISTS reporting_prescription_correction
+AFTER UPDATE OF quantity, id_medicine ON Prescription BEGIN
+{_prescription_upserts("-", "OLD")}{_prescription_upserts("+", "NEW")}END;
+"""
+
+# The rollups computed from scratch (used by the migration and by reporting.rebuild)
+REPORTING_BACKFILL = """
+DELETE FROM DailyDoses;
+DELETE FROM DailyVaccineDoses;
+DELETE FROM DailyCenterDoses;
+DELETE FROM MonthlyVaccineDoses;
+DELETE FROM MonthlyCenterDoses;
+DELETE FROM PendingBacklog;
+
+INSERT INTO DailyDoses (day, center_id, vaccine_id, administrations, doses)
+SELECT date(al.administered_at), al.center_id, pr.id_medicine, count(*), ifnull(sum(pr.quantity), 0)
+FROM AdministrationLog al
+JOIN Prescription pr ON pr.id_prescription = al.prescription_id
+WHERE date(al.administered_at) IS NOT NULL AND al.center_id IS NOT NULL AND pr.id_medicine IS NOT NULL
+GROUP BY 1, 2, 3;
+
+INSERT INTO DailyVaccineDoses (day, vaccine_id, administrations, doses)
+SELECT day, vaccine_id, sum(administrations), sum(doses) FROM DailyDoses GROUP BY day, vaccine_id;
+
+INSERT INTO DailyCenterDoses (day, center_id, administrations, doses)
+SELECT day, center_id, sum(administrations), sum(doses) FROM DailyDoses GROUP BY day, center_id;
+
+INSERT INTO MonthlyVaccineDoses (month, vaccine_id, administrations, doses)
+SELECT strftime('%Y-%m-01', day), vaccine_id, sum(administrations), sum(doses) FROM DailyVaccineDoses GROUP BY 1, 2;
+
+INSERT INTO MonthlyCenterDoses (month, center_id, administrations, doses)
+SELECT strftime('%Y-%m-01', day), center_id, sum(administrations), sum(doses) FROM DailyCenterDoses GROUP BY 1, 2;
+
+INSERT INTO PendingBacklog (vaccine_id, prescriptions, doses)
+SELECT id_medicine, count(*), ifnull(sum(quantity), 0)
+FROM Prescription
+WHERE status = 'pending' AND id_medicine IS NOT NULL
+GROUP BY id_medicine;
+"""
+
+def _migration_8_reporting(conn):
+    # Backfilled in the migration's own transaction, together with the triggers: an administration
+    # committed by a station during a chunked backfill could otherwise be counted twice or not at all.
+    run_script(conn, REPORTING_SCHEMA)
+    run_script(conn, REPORTING_BACKFILL)
+    run_script(conn, REPORTING_INDEXES)
+    run_script(conn, REPORTING_TRIGGERS)
+
+# audit_export.py: administrations in time order from a point in time (the export's keyset), for
+# all centers or for one. `id` breaks ties between administrations recorded in the same second.
+AUDIT_EXPORT_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_administrationlog_time ON AdministrationLog (administered_at, id);
+CREATE INDEX IF NOT EXISTS idx_administrationlog_center ON AdministrationLog (center_id, administered_at, id);
+"""
+
+def _migration_9_audit_export_indexes(conn):
+    run_script(conn, AUDIT_EXPORT_INDEXES)
+
+MIGRATIONS = [
+    Migration(1, "base schema", _migration_1_base_schema),
+    Migration(2, "dashboard indexes", _migration_2_dashboard_indexes),
+    Migration(3, "patient search index", _migration_3_person_search, _backfill_person_search),
+    Migration(4, "stock change counters", _migration_4_stock_versions),
+    Migration(5, "vaccine catalogue counter", _migration_5_medicine_version),
+    Migration(6, "stock ledger", _migration_6_stock_ledger),
+    Migration(7, "dashboard change counters", _migration_7_dashboard_versions),
+    Migration(8, "reporting rollups", _migration_8_reporting),
+    Migration(9, "audit export indexes", _migration_9_audit_export_indexes),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def migrate(path=db_path, target_version=None, verbose=True):
+    """
+    Brings the database at `path` up to `target_version` (default: latest), in place.
+    Returns:
+        list: (version, name, seconds) for every migration that was applied.
+    """
+    target_version = LATEST_VERSION if target_version is None else target_version
+    conn = sq.connect(path, isolation_level=None) # Transactions are controlled explicitly
+    applied = []
+    try:
+        current = schema_version(conn)
+        for migration in MIGRATIONS:
+            if migration.version <= current or migration.version > target_version:
+                continue
+            started = time.perf_counter()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                migration.apply(conn)
+                if migration.backfill is None:
+                    conn.execute(f"PRAGMA user_version = {migration.version}")
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            if migration.backfill is not None:
+                migration.backfill(conn)
+                conn.execute(f"PRAGMA user_version = {migration.version}")
+            elapsed = time.perf_counter() - started
+            applied.append((migration.version, migration.name, elapsed))
+            if verbose:
+                print(f"  [{migration.version}] {migration.name}: {elapsed * 1000:.1f} ms")
+    finally:
+        conn.close()
+    return applied
+
+
+# Small, bounded lookup tables. Once ANALYZE has run, the planner may legitimately scan their
+# covering index (e.g. walk Medicine by name and probe CenterStock per vaccine), so that is not a problem.
+# PendingBacklog has one row per vaccine and is always read whole.
+REFERENCE_TABLE_INDEXES = ("sqlite_autoindex_Medicine_1", "PendingBacklog")
+
+
+def check_query_plans(conn):
+    """
+    Runs EXPLAIN QUERY PLAN for every query in queries.HOT_QUERIES.
+    Returns:
+        list: (query name, plan detail) for each step that scans a whole table or index
+              instead of searching it. Empty when every hot query is index-driven.
+    """
+    problems = []
+    for name, (sql, params) in queries.HOT_QUERIES.items():
+        for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params):
+            detail = row[3]
+            if (detail.startswith("SCAN ") and not detail.endswith(REFERENCE_TABLE_INDEXES)
+                    and "VIRTUAL TABLE INDEX" not in detail # Full-text lookups report as SCAN ... VIRTUAL TABLE
+                    and not detail.startswith("SCAN (subquery-")): # Reads the rows of a LIMITed subquery, not a table
+                problems.append((name, detail))
+    return problems
+
+
+# --- Sample data --------------------------------------------------------------
+
+def seed_sample_data(conn):
+    """Inserts the demo users, vaccines, centers and prescriptions. Only meant for an empty database."""
+    cursor = conn.cursor()
+
+    # Insert sample data
+    # -----------------------------------
+    # Persons
+    persons_data = [
+        ('John', 'Doe', '1980-01-15'),      # Person ID 1 (Doctor)
+        ('Alice', 'Smith', '1990-04-10'),   # Person ID 2 (Doctor)
+        ('Robert', 'Patient', '2000-06-01'),# Person ID 3 (Patient)
+        ('Laura', 'Palmer', '2001-07-21'),  # Person ID 4 (Patient)
+        ('Michael', 'Nurse', '1985-03-30'), # Person ID 5 (Nurse)
+        ('Claire', 'Admin', '1970-12-12'),  # Person ID 6 (Center Admin)
+        ('David', 'Lee', '1992-08-25')      # Person ID 7 (Nurse)
+    ]
+    cursor.executemany("INSERT INTO Person (firstname, familyname, dateofbirth) VALUES (?, ?, ?)", persons_data)
+
+    # Roles and Credentials
+    # Doctor 1
+    cursor.execute("INSERT INTO Doctor (idperson) VALUES (1)")
+    cursor.execute("INSERT INTO Credentials (email, password, user_type, person_id) VALUES ('doc1@example.com', 'password123', 'doctor', 1)")
+
+    # Doctor 2
+    cursor.execute("INSERT INTO Doctor (idperson) VALUES (2)")
+    cursor.execute("INSERT INTO Credentials (email, password, user_type, person_id) VALUES ('doc2@example.com', 'password123', 'doctor', 2)")
+
+    # Patient 1
+    cursor.execute("INSERT INTO Patient (idperson) VALUES (3)")
+    cursor.execute("INSERT INTO Credentials (email, password, user_type, person_id) VALUES ('patient1@example.com', 'password123', 'patient', 3)")
+
+    # Patient 2
+    cursor.execute("INSERT INTO Patient (idperson) VALUES (4)")
+    cursor.execute("INSERT INTO Credentials (email, password, user_type, person_id) VALUES ('patient2@example.com', 'password123', 'patient', 4)")
+
+    # Nurse 1
+    cursor.execute("INSERT INTO Nurse (idperson) VALUES (5)")
+    cursor.execute("INSERT INTO Credentials (email, password, user_type, person_id) VALUES ('nurse1@example.com', 'password123', 'nurse', 5)")
+
+    # Center Admin 1
+    cursor.execute("INSERT INTO CenterAdmin (idperson) VALUES (6)")
+    cursor.execute("INSERT INTO Credentials (email, password, user_type, person_id) VALUES ('admin1@example.com', 'password123', 'center_admin', 6)")
+
+    # Nurse 2
+    cursor.execute("INSERT INTO Nurse (idperson) VALUES (7)")
+    cursor.execute("INSERT INTO Credentials (email, password, user_type, person_id) VALUES ('nurse2@example.com', 'password123', 'nurse', 7)")
+
+
+    # Link patients to doctors (DoctorPatient table uses Doctor.iddoctor and Patient.idpatient)
+    # Assuming Doctor with idperson=1 has iddoctor=1, Patient with idperson=3 has idpatient=1, etc.
+    cursor.execute("INSERT INTO DoctorPatient (iddoctor, idpatient) VALUES (1, 1)") # John Doe (doc) - Robert Patient (pat)
+    cursor.execute("INSERT INTO DoctorPatient (iddoctor, idpatient) VALUES (1, 2)") # John Doe (doc) - Laura Palmer (pat)
+    cursor.execute("INSERT INTO DoctorPatient (iddoctor, idpatient) VALUES (2, 2)") # Alice Smith (doc) - Laura Palmer (pat)
+
+
+    # Available Vaccines (Medicines)
+    vaccines_data = [
+        ('COVID-19 Vaccine (Pfizer)',),
+        ('Influenza Vaccine (Flu Shot)',),
+        ('Hepatitis B Vaccine',),
+        ('MMR Vaccine (Measles, Mumps, Rubella)',)
+    ]
+    cursor.executemany("INSERT INTO Medicine (Med_name) VALUES (?)", vaccines_data)
+
+    # Vaccination Centers
+    # Center Admin with idperson=6 has idadmin=1
+    cursor.execute("INSERT INTO VaccinationCenter (name, address, admin_id) VALUES ('City Central Vaccination Clinic', '123 Health St, Anytown', 1)")
+    cursor.execute("INSERT INTO VaccinationCenter (name, address) VALUES ('Community Health Hub', '456 Wellness Ave, Otherville')") # No admin assigned initially
+
+    # Stock for Centers (VaccinationCenter.idcenter and Medicine.id)
+    # City Central Vaccination Clinic (idcenter=1)
+    # Stock is received through the ledger (StockMovement); its trigger fills CenterStock
+    receive = "INSERT INTO StockMovement (center_id, vaccine_id, change, balance_after, kind) VALUES (?, ?, ?, ?, 'intake')"
+    cursor.execute(receive, (1, 1, 100, 100)) # Pfizer
+    cursor.execute(receive, (1, 2, 150, 150)) # Flu Shot
+    cursor.execute(receive, (1, 3, 75, 75))   # Hep B
+
+    # Community Health Hub (idcenter=2)
+    cursor.execute(receive, (2, 1, 50, 50))   # Pfizer
+    cursor.execute(receive, (2, 4, 60, 60))   # MMR
+
+
+    # Sample Prescriptions (Prescription uses Patient.idpatient, Medicine.id, Doctor.iddoctor)
+    # Patient 1 (Robert, idpatient=1), Vaccine: Pfizer (id=1), Doctor: John Doe (iddoctor=1)
+    cursor.execute("INSERT INTO Prescription (idpatient, id_medicine, iddoctor, quantity, status, prescription_date) VALUES (1, 1, 1, 1, 'pending', date('now'))")
+    # Patient 2 (Laura, idpatient=2), Vaccine: Flu Shot (id=2), Doctor: John Doe (iddoctor=1)
+    cursor.execute("INSERT INTO Prescription (idpatient, id_medicine, iddoctor, quantity, status, prescription_date) VALUES (2, 2, 1, 1, 'pending', date('now'))")
+    # Patient 2 (Laura, idpatient=2), Vaccine: Hep B (id=3), Doctor: Alice Smith (iddoctor=2)
+    cursor.execute("INSERT INTO Prescription (idpatient, id_medicine, iddoctor, quantity, status, prescription_date) VALUES (2, 3, 2, 1, 'administered', date('now', '-7 days'))")
+
+
+    # Sample Administration Log (AdministrationLog uses Prescription.id_prescription, Nurse.idnurse, VaccinationCenter.idcenter)
+    # For the administered prescription (id_prescription=3), Nurse: Michael Nurse (idnurse=1), Center: City Central (idcenter=1)
+    cursor.execute("INSERT INTO AdministrationLog (prescription_id, nurse_id, center_id, administered_at) VALUES (3, 1, 1, datetime('now', '-7 days'))")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create or upgrade the vaccination database.")
+    parser.add_argument("--db", default=db_path, help="Database file (default: %(default)s)")
+    parser.add_argument("--reset", action="store_true", help="Delete the existing database file before migrating")
+    parser.add_argument("--seed", action="store_true", help="Insert the sample data (only into an empty database)")
+    parser.add_argument("--check-plans", action="store_true", help="Fail if a hot dashboard query does a full scan")
+    args = parser.parse_args()
+
+    # Remove the old database file to recreate it cleanly (opt-in)
+    if args.reset and os.path.exists(args.db):
+        os.remove(args.db)
+
+    print(f"Migrating '{args.db}' to schema version {LATEST_VERSION}...")
+    applied = migrate(args.db)
+    if not applied:
+        print("  Already up to date.")
+
+    if args.seed:
+        conn = sq.connect(args.db)
+        try:
+            if conn.execute("SELECT 1 FROM Person LIMIT 1").fetchone():
+                print("⚠️  Database already contains data, sample data was not inserted.")
+            else:
+                seed_sample_data(conn)
+                conn.commit()
+                print("✅ Sample data inserted.")
+        finally:
+            conn.close()
+
+    print(f"✅ Database '{args.db}' is at schema version {LATEST_VERSION}.")
+
+    if args.check_plans:
+        conn = sq.connect(args.db)
+        try:
+            problems = check_query_plans(conn)
+        finally:
+            conn.close()
+        for name, detail in problems:
+            print(f"❌ {name}: {detail}")
+        if problems:
+            raise SystemExit(1)
+        print(f"✅ All {len(queries.HOT_QUERIES)} hot queries are served by indexes.")
+
+
+if __name__ == "__main__":
+    main()
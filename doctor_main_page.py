@@ -1,414 +1,552 @@
-# doctor_main_page.py – Vaccination System
-import tkinter as tk
-from tkinter import ttk, messagebox, Frame, Label, Entry, Button, Listbox, Scrollbar, END, Toplevel
-import sqlite3
-import re # For email validation
-from main_page import MainPage # Base class
-import os
-DB_PATH = 'vaccinedatabase.db'
-
-class DoctorMainPage(MainPage):
-    def __init__(self, current_user_id, current_user_role):
-        super().__init__(user_type_display_name="Doctor", current_user_id=current_user_id, current_user_role=current_user_role)
-        # self.doctor_id is now self.specific_role_id from MainPage
-        if self.specific_role_id is None:
-             messagebox.showerror("Error", "Doctor ID not found. Cannot load Doctor dashboard.", parent=self.root)
-             self.root.destroy()
-             return
-
-        self.selected_patient_info = None  # To store (patient_display_name, patient_id)
-        self.selected_vaccine_info = None # To store (vaccine_name, vaccine_id from Medicine table)
-
-        self._setup_doctor_ui()
-        self.add_logout_button() # Add logout button from base class
-
-    def _setup_doctor_ui(self):
-        """Sets up the UI elements specific to the Doctor's dashboard."""
-        controls_frame = ttk.Frame(self.main_content_frame)
-        controls_frame.pack(pady=10, padx=10, fill=tk.X)
-
-        # --- Patient Management Section ---
-        patient_mgmt_frame = ttk.LabelFrame(controls_frame, text="Patient Management", padding=(10,5))
-        patient_mgmt_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0,10))
-
-        # Patient selection
-        Label(patient_mgmt_frame, text="Select Patient:").pack(pady=(5,0), anchor=tk.W)
-        self.patients_combobox = ttk.Combobox(patient_mgmt_frame, width=35, state="readonly")
-        self.patients_combobox.pack(pady=5, fill=tk.X)
-        self.patients_combobox.bind("<<ComboboxSelected>>", self.on_patient_select)
-        self.populate_patients_list() # Load doctor's patients
-
-        # Register New Patient Button
-        ttk.Button(patient_mgmt_frame, text="Register New Patient", command=self.open_patient_registration_window).pack(pady=10, fill=tk.X)
-
-        # --- Vaccine Prescription Section ---
-        vaccine_mgmt_frame = ttk.LabelFrame(controls_frame, text="Vaccine Prescription", padding=(10,5))
-        vaccine_mgmt_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-
-        # Vaccine list (using the method from MainPage)
-        self.vaccine_listbox = self.create_vaccine_list_display(vaccine_mgmt_frame, title="Select Vaccine to Prescribe")
-        if self.vaccine_listbox: # Check if listbox was created
-            self.vaccine_listbox.bind("<<ListboxSelect>>", self.on_vaccine_select_for_prescription)
-
-        # Quantity Entry
-        Label(vaccine_mgmt_frame, text="Quantity:").pack(pady=(5,0), anchor=tk.W)
-        self.quantity_var = tk.StringVar(value="1") # Default quantity to 1
-        self.quantity_entry = ttk.Entry(vaccine_mgmt_frame, textvariable=self.quantity_var, width=5)
-        self.quantity_entry.pack(pady=5, anchor=tk.W)
-
-        # Prescribe Vaccine Button
-        ttk.Button(vaccine_mgmt_frame, text="Prescribe Selected Vaccine", command=self.prescribe_vaccine).pack(pady=10, fill=tk.X)
-
-        # --- View Patient File Section ---
-        view_patient_frame = ttk.LabelFrame(self.main_content_frame, text="Patient Records", padding=(10,5))
-        view_patient_frame.pack(pady=10, padx=10, fill=tk.BOTH, expand=True)
-
-        ttk.Button(view_patient_frame, text="View Selected Patient's File", command=self.view_patient_file).pack(pady=10, fill=tk.X)
-
-        self.patient_file_display = tk.Text(view_patient_frame, height=10, width=80, wrap=tk.WORD, state=tk.DISABLED, bg="#f5f5f5")
-        self.patient_file_display.pack(pady=5, fill=tk.BOTH, expand=True)
-        
-        # Scrollbar for patient file display
-        patient_file_scrollbar = ttk.Scrollbar(view_patient_frame, orient=tk.VERTICAL, command=self.patient_file_display.yview)
-        patient_file_scrollbar.pack(side=tk.RIGHT, fill=tk.Y, before=self.patient_file_display) # Pack before to ensure it's next to Text
-        self.patient_file_display.config(yscrollcommand=patient_file_scrollbar.set)
-
-
-    def populate_patients_list(self):
-        """Populates the combobox with patients assigned to this doctor."""
-        self.patients_combobox.set('') # Clear current selection
-        self.patients_combobox['values'] = []
-        self.patients_data = [] # Store (display_name, patient_id, person_id)
-
-        conn = None
-        try:
-            conn = sqlite3.connect(DB_PATH)
-            cursor = conn.cursor()
-            # Fetches patient's idpatient, firstname, familyname, and idperson
-            cursor.execute("""
-                SELECT P.idpatient, Person.firstname, Person.familyname, Person.idperson
-                FROM Patient P
-                JOIN Person ON P.idperson = Person.idperson
-                JOIN DoctorPatient DP ON P.idpatient = DP.idpatient
-                WHERE DP.iddoctor = ?
-                ORDER BY Person.familyname, Person.firstname
-            """, (self.specific_role_id,)) # Use specific_role_id which is doctor_id here
-            
-            patients = cursor.fetchall()
-            if patients:
-                patient_display_names = []
-                for patient_id, first, last, person_id in patients:
-                    display_name = f"{last}, {first} (ID: {patient_id})"
-                    patient_display_names.append(display_name)
-                    self.patients_data.append({'name': display_name, 'idpatient': patient_id, 'idperson': person_id})
-                self.patients_combobox['values'] = patient_display_names
-            else:
-                self.patients_combobox['values'] = ["No patients assigned."]
-        except sqlite3.Error as e:
-            messagebox.showerror("Database Error", f"Failed to load patients: {e}", parent=self.root)
-            self.patients_combobox['values'] = ["Error loading patients."]
-        finally:
-            if conn:
-                conn.close()
-
-    def on_patient_select(self, event=None):
-        """Handles patient selection from the combobox."""
-        selected_display_name = self.patients_combobox.get()
-        if selected_display_name and selected_display_name not in ["No patients assigned.", "Error loading patients."]:
-            # Find the patient_id from self.patients_data
-            for patient_info in self.patients_data:
-                if patient_info['name'] == selected_display_name:
-                    self.selected_patient_info = patient_info # Store full info
-                    self.status_label.config(text=f"Selected Patient: {self.selected_patient_info['name']}")
-                    self.clear_patient_file_display() # Clear previous patient's data
-                    return
-        self.selected_patient_info = None
-        self.status_label.config(text="No patient selected.")
-        self.clear_patient_file_display()
-
-
-    def on_vaccine_select_for_prescription(self, event=None):
-        """Handles vaccine selection from the listbox for prescription."""
-        selection = self.vaccine_listbox.curselection()
-        if selection:
-            selected_item = self.vaccine_listbox.get(selection[0])
-            # Extract vaccine name and ID, assuming format "Vaccine Name (ID: X)"
-            match = re.search(r"(.*) \(ID: (\d+)\)", selected_item)
-            if match:
-                vaccine_name = match.group(1).strip()
-                vaccine_id = int(match.group(2))
-                self.selected_vaccine_info = {'name': vaccine_name, 'id': vaccine_id}
-                self.status_label.config(text=f"Selected Vaccine: {vaccine_name}")
-                return
-        self.selected_vaccine_info = None
-        self.status_label.config(text="No vaccine selected for prescription.")
-
-
-    def prescribe_vaccine(self):
-        """Prescribes the selected vaccine to the selected patient."""
-        if not self.selected_patient_info:
-            messagebox.showerror("Error", "Please select a patient first.", parent=self.root)
-            return
-        if not self.selected_vaccine_info:
-            messagebox.showerror("Error", "Please select a vaccine from the list.", parent=self.root)
-            return
-
-        try:
-            quantity = int(self.quantity_var.get())
-            if quantity <= 0:
-                messagebox.showerror("Error", "Quantity must be a positive integer.", parent=self.root)
-                return
-        except ValueError:
-            messagebox.showerror("Error", "Invalid quantity entered.", parent=self.root)
-            return
-
-        patient_id = self.selected_patient_info['idpatient']
-        vaccine_id = self.selected_vaccine_info['id']
-        vaccine_name = self.selected_vaccine_info['name']
-        doctor_id = self.specific_role_id # This is the iddoctor
-
-        confirm = messagebox.askyesno("Confirm Prescription",
-                                      f"Prescribe {quantity} dose(s) of {vaccine_name} to {self.selected_patient_info['name']}?",
-                                      parent=self.root)
-        if not confirm:
-            return
-
-        conn = None
-        try:
-            conn = sqlite3.connect(DB_PATH)
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO Prescription (idpatient, id_medicine, iddoctor, quantity, status, prescription_date)
-                VALUES (?, ?, ?, ?, 'pending', date('now'))
-            """, (patient_id, vaccine_id, doctor_id, quantity))
-            conn.commit()
-            messagebox.showinfo("Success", f"{vaccine_name} prescribed successfully to {self.selected_patient_info['name']}.", parent=self.root)
-            self.status_label.config(text=f"Prescribed {vaccine_name} to {self.selected_patient_info['name']}.")
-            # Optionally, refresh patient file if it's currently displayed
-            if self.patient_file_display.get("1.0", tk.END).strip(): # Check if display has content
-                self.view_patient_file()
-
-        except sqlite3.Error as e:
-            messagebox.showerror("Database Error", f"Failed to prescribe vaccine: {e}", parent=self.root)
-        finally:
-            if conn:
-                conn.close()
-
-    def open_patient_registration_window(self):
-        """Opens a new window for registering a new patient."""
-        self.patient_reg_window = Toplevel(self.root)
-        self.patient_reg_window.title("Register New Patient")
-        self.patient_reg_window.geometry("400x350")
-        self.patient_reg_window.configure(bg='#e0f7fa')
-        self.patient_reg_window.transient(self.root)
-        self.patient_reg_window.grab_set()
-
-        reg_frame = ttk.Frame(self.patient_reg_window, padding="20")
-        reg_frame.pack(expand=True, fill=tk.BOTH)
-
-        ttk.Label(reg_frame, text="Patient Registration Details", font=('Arial', 14, 'bold'), foreground='#00796b').grid(row=0, column=0, columnspan=2, pady=(0,15))
-
-        fields = ["First Name:", "Last Name:", "Date of Birth (YYYY-MM-DD):", "Email:", "Password:"]
-        self.patient_reg_entries = {}
-
-        for i, field_text in enumerate(fields):
-            ttk.Label(reg_frame, text=field_text).grid(row=i+1, column=0, padx=5, pady=5, sticky=tk.W)
-            entry_widget = ttk.Entry(reg_frame, width=30, show="*" if field_text == "Password:" else "")
-            entry_widget.grid(row=i+1, column=1, padx=5, pady=5, sticky=tk.EW)
-            self.patient_reg_entries[field_text] = entry_widget
-        
-        reg_frame.grid_columnconfigure(1, weight=1)
-
-        ttk.Button(reg_frame, text="Register Patient", command=self.register_new_patient, style='Login.TButton').grid(row=len(fields)+1, column=0, columnspan=2, pady=20, sticky=tk.EW)
-
-    def validate_email_format(self, email): # Copied from LoginPortal for direct use
-        if not email: return False
-        pattern = r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
-        return re.match(pattern, email) is not None
-
-    def register_new_patient(self):
-        """Handles the logic for registering a new patient."""
-        first_name = self.patient_reg_entries["First Name:"].get()
-        last_name = self.patient_reg_entries["Last Name:"].get()
-        dob = self.patient_reg_entries["Date of Birth (YYYY-MM-DD):"].get()
-        email = self.patient_reg_entries["Email:"].get()
-        password = self.patient_reg_entries["Password:"].get()
-
-        if not all([first_name, last_name, dob, email, password]):
-            messagebox.showerror("Error", "All fields are required.", parent=self.patient_reg_window)
-            return
-
-        if not self.validate_email_format(email): # Use the local validation method
-            messagebox.showerror("Error", "Invalid email format.", parent=self.patient_reg_window)
-            return
-        
-        if len(password) < 6: # Basic password length check
-            messagebox.showerror("Error", "Password must be at least 6 characters long.", parent=self.patient_reg_window)
-            return
-
-        if not re.match(r"^\d{4}-\d{2}-\d{2}$", dob): # Basic DOB format check
-            messagebox.showerror("Error", "Invalid Date of Birth format. Use YYYY-MM-DD.", parent=self.patient_reg_window)
-            return
-
-        conn = None
-        try:
-            conn = sqlite3.connect(DB_PATH)
-            cursor = conn.cursor()
-
-            # Check if email already exists in Credentials
-            cursor.execute("SELECT email FROM Credentials WHERE email = ?", (email,))
-            if cursor.fetchone():
-                messagebox.showerror("Error", "This email is already registered.", parent=self.patient_reg_window)
-                return
-
-            # 1. Insert into Person table
-            cursor.execute("INSERT INTO Person (firstname, familyname, dateofbirth) VALUES (?, ?, ?)",
-                           (first_name, last_name, dob))
-            person_id = cursor.lastrowid
-
-            # 2. Insert into Patient table
-            cursor.execute("INSERT INTO Patient (idperson) VALUES (?)", (person_id,))
-            patient_id = cursor.lastrowid # This is the idpatient
-
-            # 3. Insert into Credentials table for the patient
-            cursor.execute("INSERT INTO Credentials (email, password, user_type, person_id) VALUES (?, ?, 'patient', ?)",
-                           (email, password, person_id))
-
-            # 4. Link patient to the current doctor in DoctorPatient table
-            cursor.execute("INSERT INTO DoctorPatient (iddoctor, idpatient) VALUES (?, ?)",
-                           (self.specific_role_id, patient_id)) # specific_role_id is doctor_id
-
-            conn.commit()
-            messagebox.showinfo("Success", f"Patient {first_name} {last_name} registered successfully and assigned to you.", parent=self.patient_reg_window)
-            self.patient_reg_window.destroy()
-            self.populate_patients_list() # Refresh the patient list in the main dashboard
-
-        except sqlite3.IntegrityError as ie:
-             messagebox.showerror("Database Error", f"Registration failed. The email might already exist or another data conflict occurred: {ie}", parent=self.patient_reg_window)
-             if conn: conn.rollback()
-        except sqlite3.Error as e:
-            messagebox.showerror("Database Error", f"Failed to register patient: {e}", parent=self.patient_reg_window)
-            if conn: conn.rollback()
-        finally:
-            if conn:
-                conn.close()
-
-    def view_patient_file(self):
-        """Displays the selected patient's file (details, prescriptions, history)."""
-        if not self.selected_patient_info:
-            messagebox.showinfo("Info", "Please select a patient to view their file.", parent=self.root)
-            self.clear_patient_file_display()
-            return
-
-        patient_id = self.selected_patient_info['idpatient'] # This is Patient.idpatient
-        patient_person_id = self.selected_patient_info['idperson'] # This is Person.idperson for the patient
-        
-        self.patient_file_display.config(state=tk.NORMAL)
-        self.patient_file_display.delete("1.0", tk.END)
-
-        conn = None
-        try:
-            conn = sqlite3.connect(DB_PATH)
-            cursor = conn.cursor()
-
-            # Fetch Patient Details
-            cursor.execute("""
-                SELECT p.firstname, p.familyname, p.dateofbirth, c.email
-                FROM Person p
-                JOIN Credentials c ON p.idperson = c.person_id
-                WHERE p.idperson = ?
-            """, (patient_person_id,))
-            details = cursor.fetchone()
-
-            if details:
-                self.patient_file_display.insert(tk.END, f"--- Patient Details ---\n", "header")
-                self.patient_file_display.insert(tk.END, f"Name: {details[0]} {details[1]}\n")
-                self.patient_file_display.insert(tk.END, f"DOB: {details[2]}\n")
-                self.patient_file_display.insert(tk.END, f"Email: {details[3]}\n\n")
-
-            # Fetch Prescriptions (Pending and Administered)
-            cursor.execute("""
-                SELECT m.Med_name, pr.quantity, pr.status, pr.prescription_date, d_person.familyname AS doctor_name
-                FROM Prescription pr
-                JOIN Medicine m ON pr.id_medicine = m.id
-                JOIN Doctor doc ON pr.iddoctor = doc.iddoctor
-                JOIN Person d_person ON doc.idperson = d_person.idperson
-                WHERE pr.idpatient = ?
-                ORDER BY pr.prescription_date DESC
-            """, (patient_id,))
-            prescriptions = cursor.fetchall()
-
-            self.patient_file_display.insert(tk.END, "--- Vaccine Prescriptions ---\n", "header")
-            if prescriptions:
-                for med_name, qty, status, pres_date, doc_name in prescriptions:
-                    self.patient_file_display.insert(tk.END, f"- {med_name} (Qty: {qty}) | Status: {status.upper()} | Prescribed: {pres_date} by Dr. {doc_name}\n")
-            else:
-                self.patient_file_display.insert(tk.END, "No prescriptions found for this patient.\n")
-            self.patient_file_display.insert(tk.END, "\n")
-
-            # Fetch Vaccination History (from AdministrationLog)
-            cursor.execute("""
-                SELECT m.Med_name, pr.quantity, al.administered_at, vc.name AS center_name, n_person.familyname AS nurse_name
-                FROM AdministrationLog al
-                JOIN Prescription pr ON al.prescription_id = pr.id_prescription
-                JOIN Medicine m ON pr.id_medicine = m.id
-                JOIN Nurse n ON al.nurse_id = n.idnurse
-                JOIN Person n_person ON n.idperson = n_person.idperson
-                JOIN VaccinationCenter vc ON al.center_id = vc.idcenter
-                WHERE pr.idpatient = ?
-                ORDER BY al.administered_at DESC
-            """, (patient_id,))
-            history = cursor.fetchall()
-
-            self.patient_file_display.insert(tk.END, "--- Vaccination History ---\n", "header")
-            if history:
-                for med_name, qty, admin_date, center, nurse in history:
-                    self.patient_file_display.insert(tk.END, f"- {med_name} (Qty: {qty}) | Administered: {admin_date} at {center} by Nurse {nurse}\n")
-            else:
-                self.patient_file_display.insert(tk.END, "No vaccination history found for this patient.\n")
-
-            # Configure tags for headers
-            self.patient_file_display.tag_configure("header", font=("Arial", 11, "bold", "underline"), foreground="#005b96")
-
-        except sqlite3.Error as e:
-            self.patient_file_display.insert(tk.END, f"Error loading patient file: {e}")
-            messagebox.showerror("Database Error", f"Could not load patient file: {e}", parent=self.root)
-        finally:
-            if conn:
-                conn.close()
-            self.patient_file_display.config(state=tk.DISABLED)
-
-    def clear_patient_file_display(self):
-        self.patient_file_display.config(state=tk.NORMAL)
-        self.patient_file_display.delete("1.0", tk.END)
-        self.patient_file_display.config(state=tk.DISABLED)
-
-
-# This is for standalone testing of the DoctorMainPage
-if __name__ == "__main__":
-    # Ensure the database exists and is populated. Run database.py first.
-    # For testing, we need a valid person_id for a doctor from the database.
-    # Let's assume person_id 1 is 'doc1@example.com' (John Doe)
-    mock_doctor_person_id = 1 
-    mock_doctor_role = "doctor"
-
-    if not os.path.exists(DB_PATH):
-        print(f"Database file '{DB_PATH}' not found. Please run database.py to create and populate it.")
-    else:
-        # Verify if the mock doctor exists to prevent errors during testing
-        conn_test = None
-        try:
-            conn_test = sqlite3.connect(DB_PATH)
-            cursor_test = conn_test.cursor()
-            cursor_test.execute("SELECT person_id FROM Credentials WHERE person_id = ? AND user_type = 'doctor'", (mock_doctor_person_id,))
-            if cursor_test.fetchone():
-                app = DoctorMainPage(current_user_id=mock_doctor_person_id, current_user_role=mock_doctor_role)
-                app.run()
-            else:
-                print(f"Test doctor with person_id {mock_doctor_person_id} not found in the database.")
-                print("Please ensure 'database.py' has been run and contains this doctor.")
-        except sqlite3.Error as e:
-            print(f"Database error during test setup: {e}")
-        finally:
-            if conn_test:
-                conn_test.close()
+# doctor_main_page.py – Vaccination System
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog, Frame, Label, Entry, Button, Listbox, Scrollbar, END, Toplevel
+import sqlite3
+import re # For email validation
+import datetime
+from main_page import MainPage # Base class
+from patient_search import PatientSearchBox
+from patient_file import get_patient_file_service, PatientFileView
+from vaccine_catalogue import vaccine_display_name
+import cohort
+import patient_import
+import os
+DB_PATH = 'vaccinedatabase.db'
+PROGRESS_INTERVAL_MS = 100 # How often the progress of a running cohort prescription or import is repainted
+
+class DoctorMainPage(MainPage):
+    def __init__(self, current_user_id, current_user_role, session=None, shell=None):
+        super().__init__(user_type_display_name="Doctor", current_user_id=current_user_id, current_user_role=current_user_role, session=session, shell=shell)
+        # self.doctor_id is now self.specific_role_id from MainPage
+        if self.specific_role_id is None:
+             messagebox.showerror("Error", "Doctor ID not found. Cannot load Doctor dashboard.", parent=self.root)
+             self.close_window()
+             return
+
+        self.selected_patient_info = None  # To store (patient_display_name, patient_id)
+        self.patient_files = get_patient_file_service(self.db) # Shared with the nurse dashboard
+        self.selected_vaccine_info = None # To store (vaccine_name, vaccine_id from Medicine table)
+        self.cohort_window = None
+        self.cohort_preview = None # (vaccine_id, CohortFilter, quantity, CohortPreview) the Prescribe button acts on
+        self.cohort_running = None # (done, total) of the cohort prescription in progress, set by its worker thread
+        self.import_running = None # (imported, rejected) of the CSV import in progress, set by its worker thread
+
+        self._setup_doctor_ui()
+        self.add_logout_button() # Add logout button from base class
+        # Refresh only the panels whose tables another station (or this one) changed
+        self.changes.watch(("Person", "DoctorPatient"), lambda tables: self.populate_patients_list())
+        self.changes.watch(("Person", "Prescription", "AdministrationLog"), self.on_patient_records_changed)
+        self.changes.watch(("Medicine",), self.on_vaccines_changed)
+        if self.session is not None and self.session.patient_count is not None: # Counted by the login query
+            self.status_label.config(text=f"Status: Ready – {self.session.patient_count} patient(s) under your care")
+
+    def _setup_doctor_ui(self):
+        """Sets up the UI elements specific to the Doctor's dashboard."""
+        controls_frame = ttk.Frame(self.main_content_frame)
+        controls_frame.pack(pady=10, padx=10, fill=tk.X)
+
+        # --- Patient Management Section ---
+        patient_mgmt_frame = ttk.LabelFrame(controls_frame, text="Patient Management", padding=(10,5))
+        patient_mgmt_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0,10))
+
+        # Patient selection: type-ahead search over this doctor's patients
+        Label(patient_mgmt_frame, text="Search Patient (name, date of birth or ID):").pack(pady=(5,0), anchor=tk.W)
+        self.patient_search_box = PatientSearchBox(patient_mgmt_frame, self, self.on_patient_select, doctor_id=self.specific_role_id)
+        self.patient_search_box.pack(pady=5, fill=tk.BOTH, expand=True)
+
+        # Register New Patient Button
+        ttk.Button(patient_mgmt_frame, text="Register New Patient", command=self.open_patient_registration_window).pack(pady=10, fill=tk.X)
+        # Onboarding a practice: many patients at once from a CSV file
+        ttk.Button(patient_mgmt_frame, text="Import Patients (CSV)...", command=self.import_patients_from_csv).pack(pady=(0,10), fill=tk.X)
+
+        # --- Vaccine Prescription Section ---
+        vaccine_mgmt_frame = ttk.LabelFrame(controls_frame, text="Vaccine Prescription", padding=(10,5))
+        vaccine_mgmt_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        # Vaccine list (using the method from MainPage)
+        self.vaccine_listbox = self.create_vaccine_list_display(vaccine_mgmt_frame, title="Select Vaccine to Prescribe")
+        if self.vaccine_listbox: # Check if listbox was created
+            self.vaccine_listbox.bind("<<ListboxSelect>>", self.on_vaccine_select_for_prescription)
+
+        # Quantity Entry
+        Label(vaccine_mgmt_frame, text="Quantity:").pack(pady=(5,0), anchor=tk.W)
+        self.quantity_var = tk.StringVar(value="1") # Default quantity to 1
+        self.quantity_entry = ttk.Entry(vaccine_mgmt_frame, textvariable=self.quantity_var, width=5)
+        self.quantity_entry.pack(pady=5, anchor=tk.W)
+
+        # Prescribe Vaccine Button
+        ttk.Button(vaccine_mgmt_frame, text="Prescribe Selected Vaccine", command=self.prescribe_vaccine).pack(pady=10, fill=tk.X)
+        # Campaigns: one vaccine for every patient matching a filter
+        ttk.Button(vaccine_mgmt_frame, text="Cohort Prescribe...", command=self.open_cohort_window).pack(pady=(0,10), fill=tk.X)
+
+        # --- View Patient File Section ---
+        view_patient_frame = ttk.LabelFrame(self.main_content_frame, text="Patient Records", padding=(10,5))
+        view_patient_frame.pack(pady=10, padx=10, fill=tk.BOTH, expand=True)
+
+        ttk.Button(view_patient_frame, text="View Selected Patient's File", command=self.view_patient_file).pack(pady=10, fill=tk.X)
+
+        # Details, then prescriptions and history in paged tables (further rows are read while scrolling)
+        self.patient_file_view = PatientFileView(view_patient_frame, self, height=6)
+        self.patient_file_view.pack(pady=5, fill=tk.BOTH, expand=True)
+
+
+    def populate_patients_list(self):
+        """Refreshes the patient search results (e.g. after a patient was registered or assigned)."""
+        self.patient_search_box.refresh()
+
+    def on_patient_select(self, patient_info=None):
+        """Handles patient selection from the search results (None when the selection is gone)."""
+        self.cancel_background("patient_file") # The file being loaded belongs to the previous patient
+        self.clear_patient_file_display() # Clear previous patient's data
+        if patient_info:
+            self.selected_patient_info = patient_info # Store full info
+            self.status_label.config(text=f"Selected Patient: {self.selected_patient_info['name']}")
+            return
+        self.selected_patient_info = None
+        self.status_label.config(text="No patient selected.")
+
+
+    def on_vaccine_select_for_prescription(self, event=None):
+        """Handles vaccine selection from the listbox for prescription."""
+        vaccine = self.selected_vaccine()
+        if vaccine:
+            self.selected_vaccine_info = {'name': vaccine.name, 'id': vaccine.id}
+            self.status_label.config(text=f"Selected Vaccine: {vaccine.name}")
+            return
+        self.selected_vaccine_info = None
+        self.status_label.config(text="No vaccine selected for prescription.")
+
+
+    def on_vaccines_changed(self, tables):
+        self.populate_vaccine_list() # Keeps the selected vaccine selected
+        if self.selected_vaccine_info and self.selected_vaccine() is None: # It was removed
+            self.on_vaccine_select_for_prescription()
+
+    def prescribe_vaccine(self):
+        """Prescribes the selected vaccine to the selected patient."""
+        if not self.selected_patient_info:
+            messagebox.showerror("Error", "Please select a patient first.", parent=self.root)
+            return
+        if not self.selected_vaccine_info:
+            messagebox.showerror("Error", "Please select a vaccine from the list.", parent=self.root)
+            return
+
+        try:
+            quantity = int(self.quantity_var.get())
+            if quantity <= 0:
+                messagebox.showerror("Error", "Quantity must be a positive integer.", parent=self.root)
+                return
+        except ValueError:
+            messagebox.showerror("Error", "Invalid quantity entered.", parent=self.root)
+            return
+
+        patient_id = self.selected_patient_info['idpatient']
+        vaccine_id = self.selected_vaccine_info['id']
+        vaccine_name = self.selected_vaccine_info['name']
+        doctor_id = self.specific_role_id # This is the iddoctor
+
+        confirm = messagebox.askyesno("Confirm Prescription",
+                                      f"Prescribe {quantity} dose(s) of {vaccine_name} to {self.selected_patient_info['name']}?",
+                                      parent=self.root)
+        if not confirm:
+            return
+
+        try:
+            self.db.write(lambda cursor: cursor.execute("""
+                INSERT INTO Prescription (idpatient, id_medicine, iddoctor, quantity, status, prescription_date)
+                VALUES (?, ?, ?, ?, 'pending', date('now'))
+            """, (patient_id, vaccine_id, doctor_id, quantity)), label="doctor.prescribe")
+            self.patient_files.invalidate(patient_id) # The cached file no longer has this prescription
+            self.changes.poll() # Re-renders the file if it is displayed
+            messagebox.showinfo("Success", f"{vaccine_name} prescribed successfully to {self.selected_patient_info['name']}.", parent=self.root)
+            self.status_label.config(text=f"Prescribed {vaccine_name} to {self.selected_patient_info['name']}.")
+
+        except sqlite3.Error as e:
+            messagebox.showerror("Database Error", f"Failed to prescribe vaccine: {e}", parent=self.root)
+
+    def open_cohort_window(self):
+        """Opens the cohort prescribing window (or brings it to the front)."""
+        if self.cohort_window is not None and self.cohort_window.winfo_exists():
+            self.cohort_window.lift()
+            return
+
+        self.cohort_window = Toplevel(self.root)
+        self.cohort_window.title("Cohort Prescribing")
+        self.cohort_window.geometry("460x420")
+        self.cohort_window.transient(self.root)
+        self.cohort_preview = None
+
+        frame = ttk.Frame(self.cohort_window, padding="15")
+        frame.pack(expand=True, fill=tk.BOTH)
+        frame.grid_columnconfigure(1, weight=1)
+
+        ttk.Label(frame, text="Vaccine:").grid(row=0, column=0, padx=5, pady=5, sticky=tk.W)
+        self.cohort_vaccines = {vaccine_display_name(vaccine): vaccine for vaccine in self.vaccine_catalogue.vaccines()}
+        self.cohort_vaccine_combo = ttk.Combobox(frame, values=list(self.cohort_vaccines), state="readonly")
+        self.cohort_vaccine_combo.grid(row=0, column=1, padx=5, pady=5, sticky=tk.EW)
+        if self.selected_vaccine_info: # Start from the vaccine selected on the dashboard
+            vaccine = self.vaccine_catalogue.get(self.selected_vaccine_info['id'])
+            if vaccine:
+                self.cohort_vaccine_combo.set(vaccine_display_name(vaccine))
+
+        ttk.Label(frame, text="Minimum age (years):").grid(row=1, column=0, padx=5, pady=5, sticky=tk.W)
+        self.cohort_min_age_var = tk.StringVar()
+        ttk.Entry(frame, textvariable=self.cohort_min_age_var, width=6).grid(row=1, column=1, padx=5, pady=5, sticky=tk.W)
+        ttk.Label(frame, text="Maximum age (years):").grid(row=2, column=0, padx=5, pady=5, sticky=tk.W)
+        self.cohort_max_age_var = tk.StringVar()
+        ttk.Entry(frame, textvariable=self.cohort_max_age_var, width=6).grid(row=2, column=1, padx=5, pady=5, sticky=tk.W)
+
+        # "No dose of this vaccine this season", from the start of the season by default
+        self.cohort_not_vaccinated_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(frame, text="Skip patients vaccinated since (YYYY-MM-DD):",
+                        variable=self.cohort_not_vaccinated_var).grid(row=3, column=0, padx=5, pady=5, sticky=tk.W)
+        self.cohort_since_var = tk.StringVar(value=cohort.season_start().isoformat())
+        ttk.Entry(frame, textvariable=self.cohort_since_var, width=12).grid(row=3, column=1, padx=5, pady=5, sticky=tk.W)
+
+        ttk.Label(frame, text="Quantity:").grid(row=4, column=0, padx=5, pady=5, sticky=tk.W)
+        self.cohort_quantity_var = tk.StringVar(value="1")
+        ttk.Entry(frame, textvariable=self.cohort_quantity_var, width=6).grid(row=4, column=1, padx=5, pady=5, sticky=tk.W)
+
+        # Any change to the criteria invalidates the preview the Prescribe button relies on
+        for variable in (self.cohort_min_age_var, self.cohort_max_age_var, self.cohort_not_vaccinated_var,
+                         self.cohort_since_var, self.cohort_quantity_var):
+            variable.trace_add("write", lambda *args: self._reset_cohort_preview())
+        self.cohort_vaccine_combo.bind("<<ComboboxSelected>>", lambda event: self._reset_cohort_preview())
+
+        ttk.Button(frame, text="Preview", command=self.preview_cohort).grid(row=5, column=0, columnspan=2, pady=(15,5), sticky=tk.EW)
+        self.cohort_result_label = ttk.Label(frame, text="Choose the criteria and press Preview.", wraplength=400)
+        self.cohort_result_label.grid(row=6, column=0, columnspan=2, pady=5, sticky=tk.W)
+        self.cohort_progress = ttk.Progressbar(frame, mode="determinate")
+        self.cohort_progress.grid(row=7, column=0, columnspan=2, pady=5, sticky=tk.EW)
+        self.cohort_prescribe_button = ttk.Button(frame, text="Prescribe", command=self.prescribe_cohort, state=tk.DISABLED)
+        self.cohort_prescribe_button.grid(row=8, column=0, columnspan=2, pady=5, sticky=tk.EW)
+
+    def _cohort_criteria(self):
+        """Reads the cohort window. Returns (vaccine, CohortFilter, quantity), or None after showing what is wrong."""
+        vaccine = self.cohort_vaccines.get(self.cohort_vaccine_combo.get())
+        if vaccine is None:
+            messagebox.showerror("Error", "Please select a vaccine.", parent=self.cohort_window)
+            return None
+        try:
+            min_age = int(self.cohort_min_age_var.get()) if self.cohort_min_age_var.get().strip() else None
+            max_age = int(self.cohort_max_age_var.get()) if self.cohort_max_age_var.get().strip() else None
+            quantity = int(self.cohort_quantity_var.get())
+        except ValueError:
+            messagebox.showerror("Error", "Ages and quantity must be whole numbers.", parent=self.cohort_window)
+            return None
+        if (min_age is not None and min_age < 0) or (max_age is not None and max_age < 0) or quantity <= 0:
+            messagebox.showerror("Error", "Ages cannot be negative and the quantity must be positive.", parent=self.cohort_window)
+            return None
+        if min_age is not None and max_age is not None and min_age > max_age:
+            messagebox.showerror("Error", "The minimum age is above the maximum age.", parent=self.cohort_window)
+            return None
+        since = None
+        if self.cohort_not_vaccinated_var.get():
+            try:
+                since = datetime.date.fromisoformat(self.cohort_since_var.get().strip())
+            except ValueError:
+                messagebox.showerror("Error", "Invalid date. Use YYYY-MM-DD.", parent=self.cohort_window)
+                return None
+        return vaccine, cohort.CohortFilter(min_age, max_age, since), quantity
+
+    def _reset_cohort_preview(self):
+        self.cancel_background("cohort_preview") # A count still running is for the old criteria
+        if self.cohort_preview is None:
+            return
+        self.cohort_preview = None
+        self.cohort_prescribe_button.config(state=tk.DISABLED)
+        self.cohort_result_label.config(text="The criteria changed. Press Preview again.")
+
+    def preview_cohort(self):
+        """Counts the patients the criteria select, in the background."""
+        criteria = self._cohort_criteria()
+        if criteria is None:
+            return
+        self._reset_cohort_preview()
+        vaccine, cohort_filter, quantity = criteria
+        self.cohort_progress.config(value=0)
+        self.run_in_background(cohort.preview, self.db, self.specific_role_id, vaccine.id, cohort_filter,
+                               on_success=lambda result: self._show_cohort_preview(vaccine, cohort_filter, quantity, result),
+                               key="cohort_preview", busy_text="Counting cohort...")
+
+    def _show_cohort_preview(self, vaccine, cohort_filter, quantity, result):
+        if self.cohort_window is None or not self.cohort_window.winfo_exists():
+            return
+        self.cohort_result_label.config(
+            text=f"{result.matching} patient(s) {cohort_filter.describe()}; {result.already_pending} already have "
+                 f"{vaccine.name} pending. {result.to_prescribe} prescription(s) will be created.")
+        if result.to_prescribe and self.cohort_running is None: # Not while a prescription is still being written
+            self.cohort_preview = (vaccine, cohort_filter, quantity, result)
+            self.cohort_prescribe_button.config(state=tk.NORMAL, text=f"Prescribe to {result.to_prescribe} patient(s)")
+
+    def prescribe_cohort(self):
+        """Creates the previewed prescriptions in one transaction, in the background."""
+        if self.cohort_preview is None or self.cohort_running is not None:
+            return
+        vaccine, cohort_filter, quantity, result = self.cohort_preview
+        if not messagebox.askyesno("Confirm Cohort Prescription",
+                                   f"Prescribe {quantity} dose(s) of {vaccine.name} to {result.to_prescribe} patient(s)?",
+                                   parent=self.cohort_window):
+            return
+
+        def record_progress(done, total): # Worker thread: only stores it, the Tk thread paints it
+            self.cohort_running = (done, total)
+        self.cohort_prescribe_button.config(state=tk.DISABLED)
+        self.cohort_preview = None
+        self.cohort_running = (0, result.to_prescribe)
+        self.run_in_background(lambda: cohort.prescribe(self.db, self.specific_role_id, vaccine.id, cohort_filter,
+                                                        quantity=quantity, expected=result.to_prescribe,
+                                                        progress=record_progress),
+                               on_success=lambda prescribed: self._cohort_prescribed(vaccine, prescribed),
+                               on_error=self._cohort_prescribe_failed,
+                               key="cohort_prescribe", busy_text=f"Prescribing {vaccine.name} to the cohort...")
+        self._show_cohort_progress()
+
+    def _cohort_window_open(self):
+        return self.cohort_window is not None and self.cohort_window.winfo_exists()
+
+    def _show_cohort_progress(self):
+        """Repaints the progress of the running cohort prescription until it finishes."""
+        if self.cohort_running is None or self.closed: # Closing the page cancels (rolls back) the prescription
+            return
+        if self._cohort_window_open():
+            done, total = self.cohort_running
+            self.cohort_progress.config(maximum=total or 1, value=done)
+            self.cohort_result_label.config(text=f"Prescribing... {done}/{total}")
+        self.root.after(PROGRESS_INTERVAL_MS, self._show_cohort_progress)
+
+    def _cohort_prescribed(self, vaccine, prescribed):
+        self.cohort_running = None
+        for patient_id in prescribed: # Their cached files do not have the new prescription
+            self.patient_files.invalidate(patient_id)
+        self.changes.poll() # Refreshes the patient list and the file on display
+        if self._cohort_window_open():
+            self.cohort_progress.config(maximum=len(prescribed) or 1, value=len(prescribed))
+            self.cohort_result_label.config(text=f"{vaccine.name} prescribed to {len(prescribed)} patient(s).")
+        self.status_label.config(text=f"Cohort: prescribed {vaccine.name} to {len(prescribed)} patient(s).")
+
+    def _cohort_prescribe_failed(self, e): # Rolled back: nothing was prescribed
+        self.cohort_running = None
+        parent = self.cohort_window if self._cohort_window_open() else self.root
+        if parent is self.cohort_window:
+            self.cohort_result_label.config(text="Nothing was prescribed.")
+        messagebox.showerror("Database Error", f"Cohort prescription failed: {e}", parent=parent)
+
+    def open_patient_registration_window(self):
+        """Opens a new window for registering a new patient."""
+        self.patient_reg_window = Toplevel(self.root)
+        self.patient_reg_window.title("Register New Patient")
+        self.patient_reg_window.geometry("400x350")
+        self.patient_reg_window.configure(bg='#e0f7fa')
+        self.patient_reg_window.transient(self.root)
+        self.patient_reg_window.grab_set()
+
+        reg_frame = ttk.Frame(self.patient_reg_window, padding="20")
+        reg_frame.pack(expand=True, fill=tk.BOTH)
+
+        ttk.Label(reg_frame, text="Patient Registration Details", font=('Arial', 14, 'bold'), foreground='#00796b').grid(row=0, column=0, columnspan=2, pady=(0,15))
+
+        fields = ["First Name:", "Last Name:", "Date of Birth (YYYY-MM-DD):", "Email:", "Password:"]
+        self.patient_reg_entries = {}
+
+        for i, field_text in enumerate(fields):
+            ttk.Label(reg_frame, text=field_text).grid(row=i+1, column=0, padx=5, pady=5, sticky=tk.W)
+            entry_widget = ttk.Entry(reg_frame, width=30, show="*" if field_text == "Password:" else "")
+            entry_widget.grid(row=i+1, column=1, padx=5, pady=5, sticky=tk.EW)
+            self.patient_reg_entries[field_text] = entry_widget
+        
+        reg_frame.grid_columnconfigure(1, weight=1)
+
+        ttk.Button(reg_frame, text="Register Patient", command=self.register_new_patient, style='Login.TButton').grid(row=len(fields)+1, column=0, columnspan=2, pady=20, sticky=tk.EW)
+
+    def validate_email_format(self, email): # Copied from LoginPortal for direct use
+        if not email: return False
+        pattern = r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
+        return re.match(pattern, email) is not None
+
+    def register_new_patient(self):
+        """Handles the logic for registering a new patient."""
+        first_name = self.patient_reg_entries["First Name:"].get()
+        last_name = self.patient_reg_entries["Last Name:"].get()
+        dob = self.patient_reg_entries["Date of Birth (YYYY-MM-DD):"].get()
+        email = self.patient_reg_entries["Email:"].get()
+        password = self.patient_reg_entries["Password:"].get()
+
+        if not all([first_name, last_name, dob, email, password]):
+            messagebox.showerror("Error", "All fields are required.", parent=self.patient_reg_window)
+            return
+
+        if not self.validate_email_format(email): # Use the local validation method
+            messagebox.showerror("Error", "Invalid email format.", parent=self.patient_reg_window)
+            return
+        
+        if len(password) < 6: # Basic password length check
+            messagebox.showerror("Error", "Password must be at least 6 characters long.", parent=self.patient_reg_window)
+            return
+
+        if not re.match(r"^\d{4}-\d{2}-\d{2}$", dob): # Basic DOB format check
+            messagebox.showerror("Error", "Invalid Date of Birth format. Use YYYY-MM-DD.", parent=self.patient_reg_window)
+            return
+
+        try:
+            # Check if email already exists in Credentials (the primary key still guards against races)
+            if self.db.fetchone("SELECT email FROM Credentials WHERE email = ?", (email,), label="doctor.register.email_check"):
+                messagebox.showerror("Error", "This email is already registered.", parent=self.patient_reg_window)
+                return
+
+            def insert_patient(cursor):
+                # 1. Insert into Person table
+                cursor.execute("INSERT INTO Person (firstname, familyname, dateofbirth) VALUES (?, ?, ?)",
+                               (first_name, last_name, dob), label="doctor.register.person")
+                person_id = cursor.lastrowid
+
+                # 2. Insert into Patient table
+                cursor.execute("INSERT INTO Patient (idperson) VALUES (?)", (person_id,), label="doctor.register.patient")
+                patient_id = cursor.lastrowid # This is the idpatient
+
+                # 3. Insert into Credentials table for the patient
+                cursor.execute("INSERT INTO Credentials (email, password, user_type, person_id) VALUES (?, ?, 'patient', ?)",
+                               (email, password, person_id), label="doctor.register.credentials")
+
+                # 4. Link patient to the current doctor in DoctorPatient table
+                cursor.execute("INSERT INTO DoctorPatient (iddoctor, idpatient) VALUES (?, ?)",
+                               (self.specific_role_id, patient_id), label="doctor.register.link") # specific_role_id is doctor_id
+
+            self.db.write(insert_patient, label="doctor.register_patient")
+
+            messagebox.showinfo("Success", f"Patient {first_name} {last_name} registered successfully and assigned to you.", parent=self.patient_reg_window)
+            self.patient_reg_window.destroy()
+            self.changes.poll() # Refreshes the patient list in the main dashboard
+
+        except sqlite3.IntegrityError as ie: # The transaction has already been rolled back
+             messagebox.showerror("Database Error", f"Registration failed. The email might already exist or another data conflict occurred: {ie}", parent=self.patient_reg_window)
+        except sqlite3.Error as e:
+            messagebox.showerror("Database Error", f"Failed to register patient: {e}", parent=self.patient_reg_window)
+
+    def import_patients_from_csv(self):
+        """Imports patients from a CSV file and assigns them to this doctor (see patient_import.py), in the background."""
+        if self.import_running is not None:
+            messagebox.showinfo("Import Running", "A patient import is still running.", parent=self.root)
+            return
+        csv_path = filedialog.askopenfilename(parent=self.root, title="Import Patients",
+                                              filetypes=[("CSV files", "*.csv"), ("All files", "*.*")])
+        if not csv_path:
+            return
+        if not messagebox.askyesno("Confirm Import",
+                                   f"Import the patients of '{os.path.basename(csv_path)}' and assign them to you?\n\n"
+                                   f"Expected columns: {', '.join(patient_import.COLUMNS)}.\n\n"
+                                   "The import runs in the background. Closing this page stops it: the patients "
+                                   "imported until then are kept, and importing the file again adds the rest.",
+                                   parent=self.root):
+            return
+
+        def record_progress(imported, rejected): # Worker thread: only stores it, the Tk thread paints it
+            self.import_running = (imported, rejected)
+        file_name = os.path.basename(csv_path)
+        self.import_running = (0, 0)
+        self.run_in_background(lambda: patient_import.import_patients(csv_path, self.specific_role_id, self.db,
+                                                                      progress=record_progress, stop=lambda: self.closed),
+                               on_success=self._patients_imported,
+                               on_error=lambda e: self._patient_import_failed(file_name, e),
+                               key="patient_import", busy_text="Importing patients...")
+        self._show_import_progress()
+
+    def _show_import_progress(self):
+        """Repaints the progress of the running import in the status bar until it finishes."""
+        if self.import_running is None or self.closed: # Closing the page stops the import after its current chunk
+            return
+        imported, rejected = self.import_running
+        self.status_label.config(text=f"Importing patients... {imported} imported, {rejected} rejected")
+        self.root.after(PROGRESS_INTERVAL_MS, self._show_import_progress)
+
+    def _patients_imported(self, result):
+        self.import_running = None
+        summary = f"{result.imported} patient(s) imported and assigned to you."
+        if result.rejects_path:
+            summary += f"\n\n{result.rejected} row(s) rejected, see:\n{result.rejects_path}"
+        self.status_label.config(text=f"Imported {result.imported} patient(s), {result.rejected} rejected.")
+        self.changes.poll()
+        messagebox.showinfo("Import Finished", summary, parent=self.root)
+
+    def _patient_import_failed(self, file_name, e):
+        self.import_running = None
+        if isinstance(e, sqlite3.Error): # The chunks committed before the error are kept
+            self.status_label.config(text="Patient import stopped.")
+            self.changes.poll()
+            messagebox.showerror("Database Error", f"Patient import stopped: {e}\n\n"
+                                 "Patients imported before the error are kept; importing the file again skips them.",
+                                 parent=self.root)
+            return
+        self.status_label.config(text="Patient import failed.")
+        messagebox.showerror("Import Error", f"Cannot import '{file_name}': {e}", parent=self.root)
+
+    def view_patient_file(self):
+        """Displays the selected patient's file (details, prescriptions, history), loading it in the background if needed."""
+        if not self.selected_patient_info:
+            messagebox.showinfo("Info", "Please select a patient to view their file.", parent=self.root)
+            self.clear_patient_file_display()
+            return
+
+        patient_id = self.selected_patient_info['idpatient'] # This is Patient.idpatient
+        patient_file = self.patient_files.cached(patient_id)
+        if patient_file is not None:
+            self.cancel_background("patient_file")
+            self._show_patient_file(patient_file)
+            return
+
+        # Keyed, so a file still loading for another patient is cancelled
+        self.run_in_background(self.patient_files.get, patient_id,
+                               on_success=self._show_patient_file, on_error=self._show_patient_file_error,
+                               key="patient_file", busy_text="Loading patient file...")
+
+    def on_patient_records_changed(self, tables):
+        """
+        Prescriptions, administrations or names changed somewhere: the file on display is re-read in
+        the background and replaces that patient's cached file. The other cached files are now stale
+        and are re-read when next viewed (PatientFileService checks the change counters).
+        """
+        if self.selected_patient_info and self.patient_file_view.is_showing():
+            # Keyed like a normal load, so selecting another patient meanwhile cancels it
+            self.run_in_background(self.patient_files.get, self.selected_patient_info['idpatient'], True,
+                                   on_success=self._show_patient_file, on_error=self._show_patient_file_error,
+                                   key="patient_file", busy_text="Refreshing patient file...")
+
+    def _show_patient_file(self, patient_file):
+        self.patient_file_view.show(patient_file)
+
+    def _show_patient_file_error(self, e):
+        self.patient_file_view.show_error(e)
+        messagebox.showerror("Database Error", f"Could not load patient file: {e}", parent=self.root)
+
+    def clear_patient_file_display(self):
+        self.patient_file_view.clear()
+
+
+# This is for standalone testing of the DoctorMainPage
+if __name__ == "__main__":
+    # Ensure the database exists and is populated. Run database.py first.
+    # For testing, we need a valid person_id for a doctor from the database.
+    # Let's assume person_id 1 is 'doc1@example.com' (John Doe)
+    mock_doctor_person_id = 1 
+    mock_doctor_role = "doctor"
+
+    if not os.path.exists(DB_PATH):
+        print(f"Database file '{DB_PATH}' not found. Please run database.py to create and populate it.")
+    else:
+        # Verify if the mock doctor exists to prevent errors during testing
+        conn_test = None
+        try:
+            conn_test = sqlite3.connect(DB_PATH)
+            cursor_test = conn_test.cursor()
+            cursor_test.execute("SELECT person_id FROM Credentials WHERE person_id = ? AND user_type = 'doctor'", (mock_doctor_person_id,))
+            if cursor_test.fetchone():
+                app = DoctorMainPage(current_user_id=mock_doctor_person_id, current_user_role=mock_doctor_role)
+                app.run()
+            else:
+                print(f"Test doctor with person_id {mock_doctor_person_id} not found in the database.")
+                print("Please ensure 'database.py' has been run and contains this doctor.")
+        except sqlite3.Error as e:
+            print(f"Database error during test setup: {e}")
+        finally:
+            if conn_test:
+                conn_test.close()
@@ -0,0 +1,176 @@
+# list_model.py – Vaccination System
+"""
+Keyed models for the dashboards' Listbox and Combobox widgets.
+
+A page hands the model the new result set as (key, label, value) rows instead of emptying the
+widget and inserting every row again. ListboxModel diffs the keys against what is shown and
+applies only the inserts, deletes and changed labels, so a refresh where one prescription was
+administered costs one Tk call instead of one per row, does not flicker, and keeps the scroll
+position. Selection is tracked by key: a selected row stays selected wherever it moves, and is
+only lost when its key is gone.
+"""
+import difflib
+
+import tkinter as tk
+
+
+class ListboxModel:
+    """
+    The rows of a Listbox, keyed. Keys must be unique and hashable (e.g. a row ID).
+    The listbox gets exportselection=False: its selection is application state, and must not be
+    cleared when text is selected in another widget.
+    """
+    def __init__(self, listbox):
+        self.listbox = listbox
+        self.listbox.config(exportselection=False)
+        self._keys = [] # Key of each row in display order; None for the message row of an empty list
+        self._labels = []
+        self._values = []
+        self._index = {} # key -> row
+
+    def __len__(self):
+        """Number of rows, not counting the message of an empty list."""
+        return len(self._index)
+
+    def update(self, rows, empty_text=None):
+        """
+        Shows `rows`, changing only the rows of the widget that differ.
+        Args:
+            rows (iterable): (key, label, value) tuples in display order.
+            empty_text (str): Shown as a single unselectable row when there are no rows.
+        Returns:
+            int: Rows inserted, deleted or relabelled (0 when nothing changed).
+        """
+        rows = list(rows)
+        keys = [key for key, _, _ in rows]
+        labels = [label for _, label, _ in rows]
+        values = [value for _, _, value in rows]
+        if not rows and empty_text is not None:
+            keys, labels, values = [None], [empty_text], [None]
+
+        selected = self.selected_keys()
+        top_row = self.listbox.nearest(0) if self._keys else 0
+        top_key = self._keys[top_row] if top_row < len(self._keys) else None
+
+        changed = 0
+        matcher = difflib.SequenceMatcher(None, self._keys, keys, autojunk=False)
+        # From the end, so the row numbers of the parts not handled yet stay valid
+        for tag, i1, i2, j1, j2 in reversed(matcher.get_opcodes()):
+            if tag == "equal":
+                for old, new in zip(range(i2 - 1, i1 - 1, -1), range(j2 - 1, j1 - 1, -1)):
+                    if self._labels[old] != labels[new]: # Same row, new text (e.g. a quantity)
+                        self.listbox.delete(old)
+                        self.listbox.insert(old, labels[new])
+                        changed += 1
+                continue
+            if i2 > i1:
+                self.listbox.delete(i1, i2 - 1)
+            if j2 > j1:
+                self.listbox.insert(i1, *labels[j1:j2])
+            changed += (i2 - i1) + (j2 - j1)
+
+        self._keys, self._labels, self._values = keys, labels, values
+        self._index = {key: row for row, key in enumerate(keys) if key is not None}
+
+        # Relabelled rows lost their selection, rows that moved kept it
+        for key in selected:
+            row = self._index.get(key)
+            if row is not None and not self.listbox.selection_includes(row):
+                self.listbox.selection_set(row)
+        if changed and top_key in self._index and self._index[top_key] != top_row:
+            self.listbox.yview(self._index[top_key]) # Rows were added or removed above the view
+        return changed
+
+    def clear(self, empty_text=None):
+        self.update((), empty_text)
+
+    def index_of(self, key):
+        """Row of the key, or None if it is not shown."""
+        return self._index.get(key)
+
+    def value_at(self, row):
+        return self._values[row] if 0 <= row < len(self._values) else None
+
+    def selected_keys(self):
+        return [self._keys[row] for row in self.listbox.curselection()
+                if row < len(self._keys) and self._keys[row] is not None]
+
+    def selected_key(self):
+        keys = self.selected_keys()
+        return keys[0] if keys else None
+
+    def selected_value(self):
+        """Value of the (first) selected row, None if nothing or the empty-list message is selected."""
+        key = self.selected_key()
+        return self._values[self._index[key]] if key is not None else None
+
+    def select(self, key):
+        """Selects the row of the key (only that one) and scrolls to it. Returns False if it is not shown."""
+        self.listbox.selection_clear(0, tk.END)
+        row = self._index.get(key)
+        if row is None:
+            return False
+        self.listbox.selection_set(row)
+        self.listbox.see(row)
+        return True
+
+
+class ComboboxModel:
+    """
+    The choices of a (read-only) ttk.Combobox, keyed. update() keeps the chosen key chosen, even
+    if its label changed, and clears the choice only when the key is gone.
+    """
+    def __init__(self, combobox):
+        self.combobox = combobox
+        self._keys = []
+        self._labels = []
+        self._values = []
+        self._index = {}
+
+    def __len__(self):
+        return len(self._index)
+
+    def update(self, rows, empty_text=None):
+        """
+        Sets the choices to `rows`, (key, label, value) tuples in display order.
+        Returns:
+            bool: False if the chosen key is no longer among the choices (the choice was cleared).
+        """
+        rows = list(rows)
+        selected = self.selected_key()
+        keys = [key for key, _, _ in rows]
+        labels = [label for _, label, _ in rows]
+        values = [value for _, _, value in rows]
+        if not rows and empty_text is not None:
+            keys, labels, values = [None], [empty_text], [None]
+
+        if labels != self._labels: # Otherwise the widget is left alone
+            self.combobox["values"] = labels
+        self._keys, self._labels, self._values = keys, labels, values
+        self._index = {key: row for row, key in enumerate(keys) if key is not None}
+
+        if selected is None:
+            return True
+        row = self._index.get(selected)
+        if row is None:
+            self.combobox.set("")
+            return False
+        if self.combobox.get() != labels[row]:
+            self.combobox.set(labels[row])
+        return True
+
+    def selected_key(self):
+        row = self.combobox.current() # -1 when the text is not one of the choices
+        return self._keys[row] if 0 <= row < len(self._keys) else None
+
+    def selected_value(self):
+        key = self.selected_key()
+        return self._values[self._index[key]] if key is not None else None
+
+    def select(self, key):
+        """Chooses the key. Returns False if it is not among the choices."""
+        row = self._index.get(key)
+        if row is None:
+            return False
+        self.combobox.current(row)
+        return True
@@ -1,295 +1,392 @@
-# Vaccination Management System - Login Portal
-import tkinter as tk
-from tkinter import messagebox, ttk, Frame, Label, Entry, Button
-import sqlite3
-import re # For email validation
-import os
-# Import specific main page classes (will be defined in their respective files)
-from patient_main_page import PatientMainPage
-from doctor_main_page import DoctorMainPage
-from nurse_main_page import NurseMainPage
-from center_admin_main_page import CenterAdminMainPage
-
-DB_PATH = 'vaccinedatabase.db'
-
-class LoginPortal:
-    def __init__(self, root):
-        self.root = root
-        self.root.title("Vaccination System Login")
-        self.root.geometry("450x550") # Adjusted size for better layout
-        self.root.configure(bg='#e0f7fa') # Light cyan background
-
-        # --- Styling ---
-        self.style = ttk.Style()
-        self.style.theme_use('clam') # Using a modern theme
-
-        self.style.configure('TLabel', background='#e0f7fa', font=('Arial', 11))
-        self.style.configure('Header.TLabel', background='#00796b', foreground='white', font=('Arial', 18, 'bold'), padding=10) # Teal header
-        self.style.configure('TButton', font=('Arial', 11, 'bold'), padding=5)
-        self.style.configure('Login.TButton', background='#00796b', foreground='white') # Teal button
-        self.style.map('Login.TButton', background=[('active', '#004d40')]) # Darker teal on hover/press
-        self.style.configure('Register.TButton', background='#fbc02d', foreground='black') # Amber button
-        self.style.map('Register.TButton', background=[('active', '#f57f17')]) # Darker amber on hover/press
-        self.style.configure('TEntry', font=('Arial', 11), padding=5)
-
-        # --- Main Frame ---
-        main_frame = ttk.Frame(root, padding="20 20 20 20", style='TFrame')
-        main_frame.pack(expand=True, fill=tk.BOTH)
-        self.style.configure('TFrame', background='#e0f7fa')
-
-
-        # --- Title ---
-        title_label = ttk.Label(main_frame, text="Vaccination Management System", style='Header.TLabel', anchor=tk.CENTER)
-        title_label.pack(fill=tk.X, pady=(0, 20))
-
-        # --- Login Section ---
-        login_frame = ttk.LabelFrame(main_frame, text="User Login", padding="15 10", style='TLabelframe')
-        login_frame.pack(pady=10, padx=10, fill=tk.X)
-        self.style.configure('TLabelframe', background='#e0f7fa', bordercolor='#00796b')
-        self.style.configure('TLabelframe.Label', background='#e0f7fa', foreground='#00796b', font=('Arial', 12, 'bold'))
-
-
-        ttk.Label(login_frame, text="Email:").grid(row=0, column=0, padx=5, pady=8, sticky=tk.W)
-        self.email_entry = ttk.Entry(login_frame, width=30)
-        self.email_entry.grid(row=0, column=1, padx=5, pady=8, sticky=tk.EW)
-
-        ttk.Label(login_frame, text="Password:").grid(row=1, column=0, padx=5, pady=8, sticky=tk.W)
-        self.password_entry = ttk.Entry(login_frame, show="*", width=30)
-        self.password_entry.grid(row=1, column=1, padx=5, pady=8, sticky=tk.EW)
-
-        login_button = ttk.Button(login_frame, text="Login", command=self.login, style='Login.TButton')
-        login_button.grid(row=2, column=0, columnspan=2, padx=5, pady=15, sticky=tk.EW)
-
-        # --- Registration Button ---
-        register_button = ttk.Button(main_frame, text="Register New User (Doctor, Nurse, Admin)",
-                                     command=self.open_registration_window, style='Register.TButton')
-        register_button.pack(pady=15, padx=10, fill=tk.X)
-        
-        # Make grid columns in login_frame responsive
-        login_frame.grid_columnconfigure(1, weight=1)
-
-    def validate_email(self, email):
-        """Validates email format using a regular expression."""
-        if not email: return False
-        # Basic regex for email validation
-        pattern = r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
-        return re.match(pattern, email) is not None
-
-    def validate_password(self, password):
-        """Validates password (e.g., minimum length)."""
-        if not password or len(password) < 6: # Example: min 6 characters
-            messagebox.showerror("Validation Error", "Password must be at least 6 characters long.", parent=self.root)
-            return False
-        return True
-
-    def login(self):
-        email = self.email_entry.get()
-        password = self.password_entry.get()
-
-        if not email or not password:
-            messagebox.showerror("Login Error", "Please enter both email and password.", parent=self.root)
-            return
-
-        if not self.validate_email(email):
-            messagebox.showerror("Login Error", "Invalid email format.", parent=self.root)
-            return
-
-        user_data = self.authenticate_user(email, password)
-        if user_data:
-            person_id = user_data['person_id']
-            user_role = user_data['user_type']
-            first_name = user_data['firstname']
-
-            messagebox.showinfo("Login Successful", f"Welcome, {first_name}!", parent=self.root)
-            self.root.destroy()  # Close the login window
-
-            # Open the appropriate main page based on the user's role
-            if user_role == "patient":
-                PatientMainPage(current_user_id=person_id, current_user_role=user_role).run()
-            elif user_role == "doctor":
-                DoctorMainPage(current_user_id=person_id, current_user_role=user_role).run()
-            elif user_role == "nurse":
-                NurseMainPage(current_user_id=person_id, current_user_role=user_role).run()
-            elif user_role == "center_admin":
-                CenterAdminMainPage(current_user_id=person_id, current_user_role=user_role).run()
-            else:
-                # Fallback if role is unknown, though DB constraints should prevent this
-                messagebox.showerror("Role Error", f"Unknown user role: {user_role}")
-                self.reopen_login_portal() # Re-open login if role is problematic
-        else:
-            messagebox.showerror("Login Failed", "Incorrect email or password.", parent=self.root)
-
-    def authenticate_user(self, email, password):
-        """Authenticates user against the database."""
-        conn = None
-        try:
-            conn = sqlite3.connect(DB_PATH)
-            conn.row_factory = sqlite3.Row # Access columns by name
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT c.person_id, c.user_type, p.firstname
-                FROM Credentials c
-                JOIN Person p ON c.person_id = p.idperson
-                WHERE c.email = ? AND c.password = ?
-            """, (email, password))
-            user_row = cursor.fetchone()
-            if user_row:
-                return dict(user_row) # Convert row object to dictionary
-            return None
-        except sqlite3.Error as e:
-            messagebox.showerror("Database Error", f"Authentication failed: {e}", parent=self.root)
-            return None
-        finally:
-            if conn:
-                conn.close()
-
-    def open_registration_window(self):
-        self.registration_window = tk.Toplevel(self.root)
-        self.registration_window.title("User Registration")
-        self.registration_window.geometry("450x450")
-        self.registration_window.configure(bg='#e0f7fa')
-        self.registration_window.transient(self.root) # Keep on top of login
-        self.registration_window.grab_set() # Modal behavior
-
-        reg_main_frame = ttk.Frame(self.registration_window, padding="20", style='TFrame')
-        reg_main_frame.pack(expand=True, fill=tk.BOTH)
-
-        ttk.Label(reg_main_frame, text="Register New Staff", font=('Arial', 16, 'bold'), foreground='#00796b').pack(pady=(0,15))
-
-        fields = ["First Name:", "Last Name:", "Date of Birth (YYYY-MM-DD):", "Email:", "Password:", "Confirm Password:", "User Type:"]
-        self.reg_entries = {}
-
-        for i, field in enumerate(fields):
-            ttk.Label(reg_main_frame, text=field).grid(row=i, column=0, padx=5, pady=5, sticky=tk.W)
-            if field == "User Type:":
-                self.reg_entries[field] = ttk.Combobox(reg_main_frame, values=["doctor", "nurse", "center_admin"], state="readonly", width=28)
-                self.reg_entries[field].set("doctor") # Default selection
-            elif field == "Password:" or field == "Confirm Password:":
-                 self.reg_entries[field] = ttk.Entry(reg_main_frame, show="*", width=30)
-            else:
-                self.reg_entries[field] = ttk.Entry(reg_main_frame, width=30)
-            self.reg_entries[field].grid(row=i, column=1, padx=5, pady=5, sticky=tk.EW)
-
-        reg_main_frame.grid_columnconfigure(1, weight=1)
-
-        register_btn = ttk.Button(reg_main_frame, text="Register", command=self.register_user, style='Login.TButton')
-        register_btn.grid(row=len(fields), column=0, columnspan=2, padx=5, pady=20, sticky=tk.EW)
-
-    def register_user(self):
-        # Retrieve data from registration form
-        first_name = self.reg_entries["First Name:"].get()
-        last_name = self.reg_entries["Last Name:"].get()
-        dob = self.reg_entries["Date of Birth (YYYY-MM-DD):"].get() # TODO: Add date validation
-        email = self.reg_entries["Email:"].get()
-        password = self.reg_entries["Password:"].get()
-        confirm_password = self.reg_entries["Confirm Password:"].get()
-        user_type = self.reg_entries["User Type:"].get()
-
-        # --- Validations ---
-        if not all([first_name, last_name, dob, email, password, confirm_password, user_type]):
-            messagebox.showerror("Error", "All fields are required.", parent=self.registration_window)
-            return
-
-        if not self.validate_email(email):
-            messagebox.showerror("Error", "Invalid email format.", parent=self.registration_window)
-            return
-
-        if password != confirm_password:
-            messagebox.showerror("Error", "Passwords do not match.", parent=self.registration_window)
-            return
-
-        if not self.validate_password(password): # Uses the password validation from login
-            # Messagebox is shown by validate_password itself
-            return
-
-        # Validate DOB format (basic check)
-        if not re.match(r"^\d{4}-\d{2}-\d{2}$", dob):
-            messagebox.showerror("Error", "Invalid Date of Birth format. Please use YYYY-MM-DD.", parent=self.registration_window)
-            return
-
-        conn = None
-        try:
-            conn = sqlite3.connect(DB_PATH)
-            cursor = conn.cursor()
-
-            # Check if email already exists
-            cursor.execute("SELECT email FROM Credentials WHERE email = ?", (email,))
-            if cursor.fetchone():
-                messagebox.showerror("Error", "This email is already registered.", parent=self.registration_window)
-                return
-
-            # Insert into Person table
-            cursor.execute("INSERT INTO Person (firstname, familyname, dateofbirth) VALUES (?, ?, ?)",
-                           (first_name, last_name, dob))
-            person_id = cursor.lastrowid # Get the ID of the newly inserted person
-
-            # Insert into the specific role table (Doctor, Nurse, CenterAdmin)
-            role_table_map = {
-                "doctor": "Doctor",
-                "nurse": "Nurse",
-                "center_admin": "CenterAdmin"
-            }
-            if user_type in role_table_map:
-                role_table_name = role_table_map[user_type]
-                cursor.execute(f"INSERT INTO {role_table_name} (idperson) VALUES (?)", (person_id,))
-            else:
-                messagebox.showerror("Error", "Invalid user type selected.", parent=self.registration_window)
-                conn.rollback() # Rollback person insertion if role is invalid
-                return
-
-            # Insert into Credentials table
-            cursor.execute("INSERT INTO Credentials (email, password, user_type, person_id) VALUES (?, ?, ?, ?)",
-                           (email, password, user_type, person_id))
-
-            conn.commit()
-            messagebox.showinfo("Success", "Registration successful! You can now log in.", parent=self.registration_window)
-            self.registration_window.destroy()
-
-        except sqlite3.IntegrityError as ie:
-            # This might happen if person_id is not unique in role tables (should be handled by UNIQUE constraint)
-            messagebox.showerror("Database Error", f"Registration failed due to a data conflict: {ie}. The email might already be in use.", parent=self.registration_window)
-            if conn: conn.rollback()
-        except sqlite3.Error as e:
-            messagebox.showerror("Database Error", f"Registration failed: {e}", parent=self.registration_window)
-            if conn: conn.rollback()
-        finally:
-            if conn:
-                conn.close()
-
-    def reopen_login_portal(self):
-        """Helper to reopen the login portal if something goes wrong after closing it."""
-        new_root = tk.Tk()
-        LoginPortal(new_root)
-        new_root.mainloop()
-
-
-def main():
-    # Initialize and run the database setup script first if it's not already done
-    # import database # You might run database.py separately once
-    
-    root = tk.Tk()
-    app = LoginPortal(root)
-    root.mainloop()
-
-if __name__ == "__main__":
-    # It's good practice to ensure the database exists and has tables.
-    # Running database.py manually once or having a check here is advisable.
-    if not os.path.exists(DB_PATH):
-        messagebox.showerror("Database Error", f"Database file '{DB_PATH}' not found. Please run database.py first.")
-    else:
-        # Check if essential tables exist
-        conn_check = None
-        try:
-            conn_check = sqlite3.connect(DB_PATH)
-            cursor_check = conn_check.cursor()
-            cursor_check.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='Credentials';")
-            if not cursor_check.fetchone():
-                messagebox.showerror("Database Error", "Table 'Credentials' not found. The database might be corrupted or not initialized correctly. Please run database.py.")
-            else:
-                main() # Proceed to login if DB and table exist
-        except sqlite3.Error as e:
-             messagebox.showerror("Database Error", f"Error connecting to database: {e}")
-        finally:
-            if conn_check:
-                conn_check.close()
-
+# Vaccination Management System - Login Portal
+import time
+_IMPORT_STARTED = time.perf_counter() # For --profile-imports
+import tkinter as tk
+from tkinter import messagebox, ttk, Frame, Label, Entry, Button
+import sqlite3
+import re # For email validation
+import os
+import sys
+import importlib
+from data_access import get_pool
+from session import load_session
+
+DB_PATH = 'vaccinedatabase.db'
+
+# Dashboard of each role: user_type -> (module, class). A user only ever opens one of them, so the
+# modules are imported on login instead of at startup, which keeps the login window quick to appear.
+ROLE_PAGES = {
+    "patient": ("patient_main_page", "PatientMainPage"),
+    "doctor": ("doctor_main_page", "DoctorMainPage"),
+    "nurse": ("nurse_main_page", "NurseMainPage"),
+    "center_admin": ("center_admin_main_page", "CenterAdminMainPage"),
+}
+
+def load_role_page(user_type):
+    """
+    Imports the dashboard module of a role (once; Python caches it) and returns its page class.
+    Returns:
+        type or None: The MainPage subclass, or None for an unknown role.
+    """
+    if user_type not in ROLE_PAGES:
+        return None
+    module_name, class_name = ROLE_PAGES[user_type]
+    return getattr(importlib.import_module(module_name), class_name)
+
+class AppShell:
+    """
+    Owns the application's only Tk root and its one mainloop, and swaps the login screen and the
+    dashboards in and out of it. Logging out and in again therefore costs building one dashboard
+    frame, not a new Tk interpreter, and nothing accumulates over a shift: the login screen is
+    built once and reused, and a dashboard is destroyed completely on logout (its widgets, dialogs
+    and background work) since it holds the previous user's data.
+    """
+    def __init__(self, root):
+        self.root = root
+        # ttk style settings are per theme: the dashboards keep the default theme they always had,
+        # the login screen switches to its own when shown
+        self.dashboard_theme = ttk.Style(root).theme_use()
+        self.login_portal = None # Built on first show_login(), then reused
+        self.page = None # Current dashboard (MainPage), if any
+        self.root.protocol("WM_DELETE_WINDOW", self.quit)
+
+    def show_login(self):
+        """Closes the current dashboard, if any, and shows the login screen."""
+        self._close_page()
+        if self.login_portal is None:
+            self.login_portal = LoginPortal(self.root, shell=self)
+        else:
+            self.login_portal.show()
+        return self.login_portal
+
+    def show_dashboard(self, page_class, session):
+        """Replaces the login screen with the dashboard of the logged-in user."""
+        if self.login_portal is not None:
+            self.login_portal.hide()
+        self._close_dialogs()
+        ttk.Style(self.root).theme_use(self.dashboard_theme)
+        page = page_class(current_user_id=session.person_id, current_user_role=session.user_type,
+                          session=session, shell=self)
+        if not page.closed: # A page that could not load has already gone back to the login screen
+            self.page = page
+
+    def page_closed(self, page):
+        """Called by MainPage.close_window(): the user logged out (or the page could not load)."""
+        if page is self.page:
+            self.page = None
+        self.show_login()
+
+    def _close_page(self):
+        if self.page is not None:
+            page, self.page = self.page, None
+            page.teardown()
+        self._close_dialogs()
+
+    def _close_dialogs(self):
+        # Dialogs (registration windows, ...) left open belong to the previous screen
+        for child in self.root.winfo_children():
+            if isinstance(child, tk.Toplevel):
+                child.destroy()
+
+    def quit(self):
+        """Window closed: stop the dashboard's background work and end the mainloop."""
+        self._close_page()
+        self.root.destroy()
+
+    def run(self):
+        self.show_login()
+        self.root.mainloop()
+
+
+class LoginPortal:
+    def __init__(self, root, shell):
+        """
+        Builds the login screen into `root`.
+        Args:
+            shell (AppShell): Opens the dashboard after a successful login.
+        """
+        self.root = root
+        self.shell = shell
+        self.db = get_pool() # Shared pooled data-access layer
+
+        # --- Styling ---
+        self.style = ttk.Style()
+        self.style.theme_use('clam') # Using a modern theme
+
+        self.style.configure('TLabel', background='#e0f7fa', font=('Arial', 11))
+        self.style.configure('Header.TLabel', background='#00796b', foreground='white', font=('Arial', 18, 'bold'), padding=10) # Teal header
+        self.style.configure('TButton', font=('Arial', 11, 'bold'), padding=5)
+        self.style.configure('Login.TButton', background='#00796b', foreground='white') # Teal button
+        self.style.map('Login.TButton', background=[('active', '#004d40')]) # Darker teal on hover/press
+        self.style.configure('Register.TButton', background='#fbc02d', foreground='black') # Amber button
+        self.style.map('Register.TButton', background=[('active', '#f57f17')]) # Darker amber on hover/press
+        self.style.configure('TEntry', font=('Arial', 11), padding=5)
+
+        # --- Main Frame ---
+        main_frame = ttk.Frame(root, padding="20 20 20 20", style='TFrame')
+        self.frame = main_frame # Packed and unpacked by show()/hide()
+        self.style.configure('TFrame', background='#e0f7fa')
+
+
+        # --- Title ---
+        title_label = ttk.Label(main_frame, text="Vaccination Management System", style='Header.TLabel', anchor=tk.CENTER)
+        title_label.pack(fill=tk.X, pady=(0, 20))
+
+        # --- Login Section ---
+        login_frame = ttk.LabelFrame(main_frame, text="User Login", padding="15 10", style='TLabelframe')
+        login_frame.pack(pady=10, padx=10, fill=tk.X)
+        self.style.configure('TLabelframe', background='#e0f7fa', bordercolor='#00796b')
+        self.style.configure('TLabelframe.Label', background='#e0f7fa', foreground='#00796b', font=('Arial', 12, 'bold'))
+
+
+        ttk.Label(login_frame, text="Email:").grid(row=0, column=0, padx=5, pady=8, sticky=tk.W)
+        self.email_entry = ttk.Entry(login_frame, width=30)
+        self.email_entry.grid(row=0, column=1, padx=5, pady=8, sticky=tk.EW)
+
+        ttk.Label(login_frame, text="Password:").grid(row=1, column=0, padx=5, pady=8, sticky=tk.W)
+        self.password_entry = ttk.Entry(login_frame, show="*", width=30)
+        self.password_entry.grid(row=1, column=1, padx=5, pady=8, sticky=tk.EW)
+
+        login_button = ttk.Button(login_frame, text="Login", command=self.login, style='Login.TButton')
+        login_button.grid(row=2, column=0, columnspan=2, padx=5, pady=15, sticky=tk.EW)
+
+        # --- Registration Button ---
+        register_button = ttk.Button(main_frame, text="Register New User (Doctor, Nurse, Admin)",
+                                     command=self.open_registration_window, style='Register.TButton')
+        register_button.pack(pady=15, padx=10, fill=tk.X)
+        
+        # Make grid columns in login_frame responsive
+        login_frame.grid_columnconfigure(1, weight=1)
+
+        self.show()
+        # The schema check opens the database, so it runs once the window is on screen
+        self.root.after_idle(self.check_database)
+
+    def show(self):
+        """Shows the (already built) login screen, e.g. after a logout."""
+        self.root.title("Vaccination System Login")
+        self.root.geometry("450x550") # Adjusted size for better layout
+        self.root.configure(bg='#e0f7fa') # Light cyan background
+        self.style.theme_use('clam')
+        self.password_entry.delete(0, tk.END) # Never leave the previous user's password behind
+        self.frame.pack(expand=True, fill=tk.BOTH)
+        self.email_entry.focus_set()
+
+    def hide(self):
+        self.frame.pack_forget()
+
+    def validate_email(self, email):
+        """Validates email format using a regular expression."""
+        if not email: return False
+        # Basic regex for email validation
+        pattern = r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
+        return re.match(pattern, email) is not None
+
+    def validate_password(self, password):
+        """Validates password (e.g., minimum length)."""
+        if not password or len(password) < 6: # Example: min 6 characters
+            messagebox.showerror("Validation Error", "Password must be at least 6 characters long.", parent=self.root)
+            return False
+        return True
+
+    def login(self):
+        email = self.email_entry.get()
+        password = self.password_entry.get()
+
+        if not email or not password:
+            messagebox.showerror("Login Error", "Please enter both email and password.", parent=self.root)
+            return
+
+        if not self.validate_email(email):
+            messagebox.showerror("Login Error", "Invalid email format.", parent=self.root)
+            return
+
+        session = self.authenticate_user(email, password)
+        if session:
+            user_role = session.user_type
+            first_name = session.firstname
+
+            messagebox.showinfo("Login Successful", f"Welcome, {first_name}!", parent=self.root)
+            # Load the role's dashboard module now that the role is known
+            try:
+                page_class = load_role_page(user_role)
+            except ImportError as e:
+                messagebox.showerror("Startup Error", f"Could not load the {user_role} dashboard: {e}", parent=self.root)
+                return
+
+            # Open the appropriate main page based on the user's role, in this same window
+            if page_class is not None:
+                self.shell.show_dashboard(page_class, session)
+            else:
+                # Fallback if role is unknown, though DB constraints should prevent this; stay on the login screen
+                messagebox.showerror("Role Error", f"Unknown user role: {user_role}", parent=self.root)
+        else:
+            messagebox.showerror("Login Failed", "Incorrect email or password.", parent=self.root)
+
+    def authenticate_user(self, email, password):
+        """
+        Authenticates user against the database and loads their session in the same query.
+        Returns:
+            session.Session or None: None if the credentials do not match (or on a database error).
+        """
+        try:
+            return load_session(email, password, pool=self.db)
+        except sqlite3.Error as e:
+            messagebox.showerror("Database Error", f"Authentication failed: {e}", parent=self.root)
+            return None
+
+    def open_registration_window(self):
+        self.registration_window = tk.Toplevel(self.root)
+        self.registration_window.title("User Registration")
+        self.registration_window.geometry("450x450")
+        self.registration_window.configure(bg='#e0f7fa')
+        self.registration_window.transient(self.root) # Keep on top of login
+        self.registration_window.grab_set() # Modal behavior
+
+        reg_main_frame = ttk.Frame(self.registration_window, padding="20", style='TFrame')
+        reg_main_frame.pack(expand=True, fill=tk.BOTH)
+
+        ttk.Label(reg_main_frame, text="Register New Staff", font=('Arial', 16, 'bold'), foreground='#00796b').pack(pady=(0,15))
+
+        fields = ["First Name:", "Last Name:", "Date of Birth (YYYY-MM-DD):", "Email:", "Password:", "Confirm Password:", "User Type:"]
+        self.reg_entries = {}
+
+        for i, field in enumerate(fields):
+            ttk.Label(reg_main_frame, text=field).grid(row=i, column=0, padx=5, pady=5, sticky=tk.W)
+            if field == "User Type:":
+                self.reg_entries[field] = ttk.Combobox(reg_main_frame, values=["doctor", "nurse", "center_admin"], state="readonly", width=28)
+                self.reg_entries[field].set("doctor") # Default selection
+            elif field == "Password:" or field == "Confirm Password:":
+                 self.reg_entries[field] = ttk.Entry(reg_main_frame, show="*", width=30)
+            else:
+                self.reg_entries[field] = ttk.Entry(reg_main_frame, width=30)
+            self.reg_entries[field].grid(row=i, column=1, padx=5, pady=5, sticky=tk.EW)
+
+        reg_main_frame.grid_columnconfigure(1, weight=1)
+
+        register_btn = ttk.Button(reg_main_frame, text="Register", command=self.register_user, style='Login.TButton')
+        register_btn.grid(row=len(fields), column=0, columnspan=2, padx=5, pady=20, sticky=tk.EW)
+
+    def register_user(self):
+        # Retrieve data from registration form
+        first_name = self.reg_entries["First Name:"].get()
+        last_name = self.reg_entries["Last Name:"].get()
+        dob = self.reg_entries["Date of Birth (YYYY-MM-DD):"].get() # TODO: Add date validation
+        email = self.reg_entries["Email:"].get()
+        password = self.reg_entries["Password:"].get()
+        confirm_password = self.reg_entries["Confirm Password:"].get()
+        user_type = self.reg_entries["User Type:"].get()
+
+        # --- Validations ---
+        if not all([first_name, last_name, dob, email, password, confirm_password, user_type]):
+            messagebox.showerror("Error", "All fields are required.", parent=self.registration_window)
+            return
+
+        if not self.validate_email(email):
+            messagebox.showerror("Error", "Invalid email format.", parent=self.registration_window)
+            return
+
+        if password != confirm_password:
+            messagebox.showerror("Error", "Passwords do not match.", parent=self.registration_window)
+            return
+
+        if not self.validate_password(password): # Uses the password validation from login
+            # Messagebox is shown by validate_password itself
+            return
+
+        # Validate DOB format (basic check)
+        if not re.match(r"^\d{4}-\d{2}-\d{2}$", dob):
+            messagebox.showerror("Error", "Invalid Date of Birth format. Please use YYYY-MM-DD.", parent=self.registration_window)
+            return
+
+        # Role table for the specific user type (Doctor, Nurse, CenterAdmin)
+        role_table_map = {
+            "doctor": "Doctor",
+            "nurse": "Nurse",
+            "center_admin": "CenterAdmin"
+        }
+        if user_type not in role_table_map:
+            messagebox.showerror("Error", "Invalid user type selected.", parent=self.registration_window)
+            return
+
+        try:
+            # Check if email already exists (the primary key still guards against races)
+            if self.db.fetchone("SELECT email FROM Credentials WHERE email = ?", (email,), label="login.register.email_check"):
+                messagebox.showerror("Error", "This email is already registered.", parent=self.registration_window)
+                return
+
+            def insert_user(cursor):
+                # Insert into Person table
+                cursor.execute("INSERT INTO Person (firstname, familyname, dateofbirth) VALUES (?, ?, ?)",
+                               (first_name, last_name, dob), label="login.register.person")
+                person_id = cursor.lastrowid # Get the ID of the newly inserted person
+
+                # Insert into the specific role table
+                role_table_name = role_table_map[user_type]
+                cursor.execute(f"INSERT INTO {role_table_name} (idperson) VALUES (?)", (person_id,), label="login.register.role")
+
+                # Insert into Credentials table
+                cursor.execute("INSERT INTO Credentials (email, password, user_type, person_id) VALUES (?, ?, ?, ?)",
+                               (email, password, user_type, person_id), label="login.register.credentials")
+
+            self.db.write(insert_user, label="login.register_user")
+
+            messagebox.showinfo("Success", "Registration successful! You can now log in.", parent=self.registration_window)
+            self.registration_window.destroy()
+
+        except sqlite3.IntegrityError as ie:
+            # This might happen if person_id is not unique in role tables (should be handled by UNIQUE constraint)
+            messagebox.showerror("Database Error", f"Registration failed due to a data conflict: {ie}. The email might already be in use.", parent=self.registration_window)
+        except sqlite3.Error as e: # The transaction has already been rolled back
+            messagebox.showerror("Database Error", f"Registration failed: {e}", parent=self.registration_window)
+
+    def check_database(self):
+        """
+        Checks that the database has been initialized. Runs after the window is shown (see main()),
+        so opening the database does not delay the first paint.
+        """
+        try:
+            credentials_table = self.db.fetchone("SELECT name FROM sqlite_master WHERE type='table' AND name='Credentials'",
+                                                 label="login.schema_check")
+            if not credentials_table:
+                messagebox.showerror("Database Error", "Table 'Credentials' not found. The database might be corrupted or not initialized correctly. Please run database.py.", parent=self.root)
+                self.shell.quit()
+        except sqlite3.Error as e:
+            messagebox.showerror("Database Error", f"Error connecting to database: {e}", parent=self.root)
+            self.shell.quit()
+
+
+
+def main():
+    # Initialize and run the database setup script first if it's not already done
+    # import database # You might run database.py separately once
+    
+    # One Tk root for the whole run: logins and logouts swap frames inside it
+    AppShell(tk.Tk()).run()
+
+def profile_imports():
+    """
+    Prints how long the login portal's own imports took and how long each role dashboard takes
+    to import on top of them (what the first login of that role pays).
+    For a per-module breakdown, run: python -X importtime login.py --profile-imports
+    """
+    # Incremental: modules shared with a row above (main_page, tkinter, ...) are only counted once
+    print(f"{'module':<26}{'import ms':>10}")
+    print(f"{'login portal':<26}{(_LOGIN_IMPORTED - _IMPORT_STARTED) * 1000:>10.1f}")
+    for user_type, (module_name, _) in ROLE_PAGES.items():
+        started = time.perf_counter()
+        load_role_page(user_type)
+        print(f"{module_name:<26}{(time.perf_counter() - started) * 1000:>10.1f}")
+
+_LOGIN_IMPORTED = time.perf_counter()
+
+if __name__ == "__main__":
+    if "--profile-imports" in sys.argv[1:]:
+        profile_imports()
+    # It's good practice to ensure the database exists and has tables.
+    # Running database.py manually once or having a check here is advisable.
+    elif not os.path.exists(DB_PATH):
+        messagebox.showerror("Database Error", f"Database file '{DB_PATH}' not found. Please run database.py first.")
+    else:
+        main() # The tables are checked by LoginPortal.check_database once the window is shown
+
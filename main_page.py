@@ -1,187 +1,266 @@
-# Vaccination Management System - Main Page (Base Class)
-import tkinter as tk
-from tkinter import ttk, Listbox, Scrollbar, Frame, Label, messagebox, END
-import sqlite3
-
-class MainPage:
-    """
-    Base class for the main pages of different user roles.
-    Provides a common structure, including a list of available vaccines.
-    """
-    def __init__(self, user_type_display_name, current_user_id, current_user_role):
-        """
-        Initializes the main page window.
-        Args:
-            user_type_display_name (str): The display name for the user role (e.g., "Doctor", "Patient").
-            current_user_id (int): The ID of the currently logged-in user (from Person table).
-            current_user_role (str): The role of the currently logged-in user (e.g., "doctor", "patient").
-        """
-        self.root = tk.Tk()
-        self.root.title(f"Vaccination System - {user_type_display_name} Dashboard")
-        self.root.geometry("800x600") # Adjusted default size
-        self.root.configure(bg='#f0f8ff') # Light AliceBlue background
-
-        self.current_user_id = current_user_id # This is the person_id
-        self.current_user_role = current_user_role
-        self.specific_role_id = self.get_specific_role_id() # e.g., doctor_id, patient_id
-
-        # --- Common Header ---
-        header_frame = Frame(self.root, bg='#4682b4', pady=10) # SteelBlue header
-        header_frame.pack(fill=tk.X)
-        Label(header_frame, text=f"{user_type_display_name} Dashboard", font=("Arial", 16, "bold"), fg='white', bg='#4682b4').pack()
-
-        # --- Main Content Frame ---
-        # This frame will be used by subclasses to add their specific widgets
-        self.main_content_frame = Frame(self.root, bg='#f0f8ff', padx=20, pady=20)
-        self.main_content_frame.pack(fill=tk.BOTH, expand=True)
-
-        # --- Common: Vaccine List Display (Optional for some roles, but good to have in base) ---
-        # Subclasses can decide whether to call create_vaccine_list_display
-        # self.create_vaccine_list_display() # Example: call if needed
-
-        # --- Footer ---
-        footer_frame = Frame(self.root, bg='#4682b4', pady=5) # SteelBlue footer
-        footer_frame.pack(fill=tk.X, side=tk.BOTTOM)
-        self.status_label = Label(footer_frame, text="Status: Ready", fg='white', bg='#4682b4', anchor=tk.W)
-        self.status_label.pack(fill=tk.X, padx=10)
-
-
-    def get_specific_role_id(self):
-        """
-        Fetches the specific role ID (e.g., doctor_id, patient_id) based on person_id and role.
-        Returns:
-            int or None: The specific role ID if found, otherwise None.
-        """
-        if not self.current_user_id or not self.current_user_role:
-            return None
-
-        db_path = "vaccinedatabase.db"
-        conn = None
-        try:
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            table_map = {
-                "doctor": "Doctor",
-                "patient": "Patient",
-                "nurse": "Nurse",
-                "center_admin": "CenterAdmin"
-            }
-            id_column_map = {
-                "doctor": "iddoctor",
-                "patient": "idpatient",
-                "nurse": "idnurse",
-                "center_admin": "idadmin"
-            }
-            if self.current_user_role in table_map:
-                table_name = table_map[self.current_user_role]
-                id_column = id_column_map[self.current_user_role]
-                query = f"SELECT {id_column} FROM {table_name} WHERE idperson = ?"
-                cursor.execute(query, (self.current_user_id,))
-                result = cursor.fetchone()
-                if result:
-                    return result[0]
-            return None
-        except sqlite3.Error as e:
-            messagebox.showerror("Database Error", f"Failed to fetch role ID: {e}", parent=self.root)
-            return None
-        finally:
-            if conn:
-                conn.close()
-
-
-    def create_vaccine_list_display(self, parent_frame, title="Available Vaccines"):
-        """
-        Creates and populates a listbox displaying available vaccines.
-        Args:
-            parent_frame (tk.Frame): The frame where the vaccine list will be placed.
-            title (str): The title for the vaccine list section.
-        """
-        vaccine_frame = ttk.LabelFrame(parent_frame, text=title, padding=(10, 5))
-        vaccine_frame.pack(pady=10, padx=5, fill=tk.X, expand=False) # Changed to not expand by default
-
-        listbox_frame = Frame(vaccine_frame)
-        listbox_frame.pack(fill=tk.BOTH, expand=True)
-
-        scrollbar = Scrollbar(listbox_frame, orient=tk.VERTICAL)
-        self.vaccine_listbox = Listbox(listbox_frame, yscrollcommand=scrollbar.set, height=8, bg='#ffffff', selectbackground='#a6caf0')
-        scrollbar.config(command=self.vaccine_listbox.yview)
-
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.vaccine_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-
-        self.populate_vaccine_list()
-        return self.vaccine_listbox # Return the listbox for binding events if needed
-
-    def populate_vaccine_list(self):
-        """Populates the vaccine listbox from the Medicine table."""
-        if not hasattr(self, 'vaccine_listbox'): # Check if listbox exists
-            return
-
-        self.vaccine_listbox.delete(0, END)
-        db_path = "vaccinedatabase.db"
-        conn = None
-        try:
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            cursor.execute("SELECT id, Med_name FROM Medicine ORDER BY Med_name")
-            vaccines = cursor.fetchall()
-            if vaccines:
-                for vaccine_id, med_name in vaccines:
-                    self.vaccine_listbox.insert(END, f"{med_name} (ID: {vaccine_id})")
-            else:
-                self.vaccine_listbox.insert(END, "No vaccines listed in the database.")
-        except sqlite3.Error as e:
-            messagebox.showerror("Database Error", f"Failed to load vaccines: {e}", parent=self.root)
-            self.vaccine_listbox.insert(END, "Error loading vaccines.")
-        finally:
-            if conn:
-                conn.close()
-
-    def run(self):
-        """Starts the Tkinter main event loop for this window."""
-        self.root.mainloop()
-
-    def close_and_open_login(self):
-        """Closes the current window and re-opens the login portal."""
-        self.root.destroy()
-        # This import is here to avoid circular dependency at the module level
-        from login import LoginPortal # Re-import LoginPortal
-        login_root = tk.Tk()
-        LoginPortal(login_root) # Create a new instance of LoginPortal
-        login_root.mainloop()
-
-    def add_logout_button(self):
-        """Adds a logout button to the main content frame."""
-        logout_button = ttk.Button(self.main_content_frame, text="Logout", command=self.close_and_open_login, style="Accent.TButton")
-        logout_button.pack(pady=20, side=tk.BOTTOM)
-
-        # Style for the logout button
-        style = ttk.Style(self.root)
-        style.configure("Accent.TButton", foreground="white", background="red", font=('Arial', 10, 'bold'))
-
-
-# Example of how a subclass might use it (for testing purposes)
-if __name__ == "__main__":
-    # This is just for testing MainPage directly.
-    # In the actual application, subclasses (DoctorMainPage, PatientMainPage, etc.) will be instantiated.
-    # We need to mock current_user_id and current_user_role for this test.
-    # For a real run, these would come from the login process.
-
-    # Mocking a user login for testing
-    mock_person_id = 1 # Assuming person with ID 1 is a doctor
-    mock_user_role = "doctor"
-
-    # To get the specific role ID (e.g., iddoctor), we'd normally query the DB.
-    # For this direct test, let's assume we know iddoctor for person_id 1 is 1.
-    # The get_specific_role_id method in MainPage handles this.
-
-    app = MainPage(user_type_display_name="Test User", current_user_id=mock_person_id, current_user_role=mock_user_role)
-    
-    # Example of adding a simple label to the main_content_frame
-    Label(app.main_content_frame, text="This is the main content area.", font=("Arial", 12)).pack(pady=10)
-    
-    # Example of adding the vaccine list to the main_content_frame
-    app.create_vaccine_list_display(app.main_content_frame, title="System Vaccines")
-    
-    app.add_logout_button()
-    app.run()
+# Vaccination Management System - Main Page (Base Class)
+import tkinter as tk
+from tkinter import ttk, Listbox, Scrollbar, Frame, Label, messagebox
+import sqlite3
+from data_access import get_pool
+from background import BackgroundExecutor
+from change_watcher import ChangeWatcher
+from list_model import ListboxModel
+from vaccine_catalogue import get_vaccine_catalogue, vaccine_display_name
+
+class MainPage:
+    """
+    Base class for the main pages of different user roles.
+    Provides a common structure, including a list of available vaccines.
+    """
+    def __init__(self, user_type_display_name, current_user_id, current_user_role, session=None, shell=None):
+        """
+        Initializes the main page window.
+        Args:
+            user_type_display_name (str): The display name for the user role (e.g., "Doctor", "Patient").
+            current_user_id (int): The ID of the currently logged-in user (from Person table).
+            current_user_role (str): The role of the currently logged-in user (e.g., "doctor", "patient").
+            session (session.Session): Loaded at login; provides the role ID and the role's starting
+                                       context without querying again. Looked up if omitted.
+            shell (login.AppShell): The application window to build the page into. Without one, the
+                                    page opens its own window (used when running a page directly).
+        """
+        self.shell = shell
+        self.closed = False
+        # Dialogs, message boxes and the window title still refer to self.root, the toplevel window
+        self.root = shell.root if shell is not None else tk.Tk()
+        self.root.title(f"Vaccination System - {user_type_display_name} Dashboard")
+        self.root.geometry("800x600") # Adjusted default size
+        self.root.configure(bg='#f0f8ff') # Light AliceBlue background
+        # All of the page's widgets live in this frame, so logging out removes them in one go
+        self.frame = Frame(self.root, bg='#f0f8ff')
+        self.frame.pack(fill=tk.BOTH, expand=True)
+
+        self.db = get_pool() # Shared pooled data-access layer
+        self.vaccine_catalogue = get_vaccine_catalogue(self.db) # Medicine, cached for all pages
+        self.current_user_id = current_user_id # This is the person_id
+        self.current_user_role = current_user_role
+        if session is not None and (session.person_id, session.user_type) != (current_user_id, current_user_role):
+            session = None # Not this user's session, don't trust its context
+        self.session = session
+        if session is not None:
+            self.specific_role_id = session.role_id # Already resolved by the login query
+        else:
+            self.specific_role_id = self.get_specific_role_id() # e.g., doctor_id, patient_id
+
+        # --- Common Header ---
+        header_frame = Frame(self.frame, bg='#4682b4', pady=10) # SteelBlue header
+        header_frame.pack(fill=tk.X)
+        Label(header_frame, text=f"{user_type_display_name} Dashboard", font=("Arial", 16, "bold"), fg='white', bg='#4682b4').pack()
+
+        # --- Main Content Frame ---
+        # This frame will be used by subclasses to add their specific widgets
+        self.main_content_frame = Frame(self.frame, bg='#f0f8ff', padx=20, pady=20)
+        self.main_content_frame.pack(fill=tk.BOTH, expand=True)
+
+        # --- Common: Vaccine List Display (Optional for some roles, but good to have in base) ---
+        # Subclasses can decide whether to call create_vaccine_list_display
+        # self.create_vaccine_list_display() # Example: call if needed
+
+        # --- Footer ---
+        footer_frame = Frame(self.frame, bg='#4682b4', pady=5) # SteelBlue footer
+        footer_frame.pack(fill=tk.X, side=tk.BOTTOM)
+        self.status_label = Label(footer_frame, text="Status: Ready", fg='white', bg='#4682b4', anchor=tk.W)
+        self.status_label.pack(fill=tk.X, padx=10)
+
+        # --- Background queries ---
+        # Slow reads run on worker threads; the status label shows what is loading meanwhile
+        self._status_before_busy = None # Status text to restore once nothing is loading
+        self._busy_status = None # Status text currently shown by the busy indicator
+        self.background = BackgroundExecutor(self.frame, pool=self.db, on_busy_change=self._show_busy)
+        # --- Changes made elsewhere ---
+        # Pages subscribe their panels with self.changes.watch(tables, refresh); polled on a timer
+        self.changes = ChangeWatcher(self.frame, self.db.db_path)
+        try:
+            self.changes.start()
+        except sqlite3.Error as e: # The dashboard still works, it just won't refresh by itself
+            self.status_label.config(text=f"Status: Live updates unavailable ({e})")
+        if shell is None: # Otherwise the shell handles closing the window
+            self.root.protocol("WM_DELETE_WINDOW", self.close_window)
+
+
+    def get_specific_role_id(self):
+        """
+        Fetches the specific role ID (e.g., doctor_id, patient_id) based on person_id and role.
+        Returns:
+            int or None: The specific role ID if found, otherwise None.
+        """
+        if not self.current_user_id or not self.current_user_role:
+            return None
+
+        try:
+            table_map = {
+                "doctor": "Doctor",
+                "patient": "Patient",
+                "nurse": "Nurse",
+                "center_admin": "CenterAdmin"
+            }
+            id_column_map = {
+                "doctor": "iddoctor",
+                "patient": "idpatient",
+                "nurse": "idnurse",
+                "center_admin": "idadmin"
+            }
+            if self.current_user_role in table_map:
+                table_name = table_map[self.current_user_role]
+                id_column = id_column_map[self.current_user_role]
+                query = f"SELECT {id_column} FROM {table_name} WHERE idperson = ?"
+                result = self.db.fetchone(query, (self.current_user_id,), label="main_page.role_id")
+                if result:
+                    return result[0]
+            return None
+        except sqlite3.Error as e:
+            messagebox.showerror("Database Error", f"Failed to fetch role ID: {e}", parent=self.root)
+            return None
+
+
+    def run_in_background(self, function, *args, on_success, on_error=None, key=None, busy_text="Loading..."):
+        """
+        Runs function(*args) on a worker thread and passes its result to on_success on the Tk thread.
+        The function must not touch any widget. A function that writes must do so in one transaction
+        (e.g. ConnectionPool.write()), so that cancelling the task rolls the whole write back.
+        Args:
+            on_error (callable): Receives the exception; defaults to a "Database Error" message box.
+            key (str): Submitting again with the same key cancels the previous task (e.g. the file of
+                       the previously selected patient), see cancel_background().
+            busy_text (str): Shown in the status bar while the task runs.
+        """
+        if on_error is None:
+            on_error = lambda e: messagebox.showerror("Database Error", f"{busy_text.rstrip('.')} failed: {e}", parent=self.root)
+        return self.background.submit(function, *args, on_success=on_success, on_error=on_error, key=key, busy_text=busy_text)
+
+    def cancel_background(self, key):
+        """Cancels the background task with the given key, if one is running."""
+        self.background.cancel(key)
+
+    def _show_busy(self, busy_text):
+        """Busy indicator: status text and a watch cursor while background tasks run."""
+        current = self.status_label.cget("text")
+        if busy_text is not None:
+            if current != self._busy_status: # A page set its own status meanwhile, keep that one for later
+                self._status_before_busy = current
+            self._busy_status = f"Status: {busy_text}"
+            self.status_label.config(text=self._busy_status)
+            self.root.config(cursor="watch")
+        elif self._busy_status is not None:
+            if current == self._busy_status:
+                self.status_label.config(text=self._status_before_busy)
+            self._status_before_busy = self._busy_status = None
+            self.root.config(cursor="")
+
+    def create_vaccine_list_display(self, parent_frame, title="Available Vaccines"):
+        """
+        Creates and populates a listbox displaying available vaccines.
+        Args:
+            parent_frame (tk.Frame): The frame where the vaccine list will be placed.
+            title (str): The title for the vaccine list section.
+        """
+        vaccine_frame = ttk.LabelFrame(parent_frame, text=title, padding=(10, 5))
+        vaccine_frame.pack(pady=10, padx=5, fill=tk.X, expand=False) # Changed to not expand by default
+
+        listbox_frame = Frame(vaccine_frame)
+        listbox_frame.pack(fill=tk.BOTH, expand=True)
+
+        scrollbar = Scrollbar(listbox_frame, orient=tk.VERTICAL)
+        self.vaccine_listbox = Listbox(listbox_frame, yscrollcommand=scrollbar.set, height=8, bg='#ffffff', selectbackground='#a6caf0')
+        scrollbar.config(command=self.vaccine_listbox.yview)
+
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.vaccine_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.vaccine_list = ListboxModel(self.vaccine_listbox) # Rows keyed by Vaccine.id
+
+        self.populate_vaccine_list()
+        return self.vaccine_listbox # Return the listbox for binding events if needed
+
+    def selected_vaccine(self):
+        """Returns the Vaccine selected in the vaccine listbox, or None."""
+        return self.vaccine_list.selected_value() if hasattr(self, 'vaccine_list') else None
+
+    def populate_vaccine_list(self):
+        """Populates the vaccine listbox from the vaccine catalogue; the selected vaccine stays selected."""
+        if not hasattr(self, 'vaccine_list'): # Check if listbox exists
+            return
+
+        try:
+            vaccines = self.vaccine_catalogue.vaccines()
+            self.vaccine_list.update([(vaccine.id, vaccine_display_name(vaccine), vaccine) for vaccine in vaccines],
+                                     empty_text="No vaccines listed in the database.")
+        except sqlite3.Error as e:
+            messagebox.showerror("Database Error", f"Failed to load vaccines: {e}", parent=self.root)
+            self.vaccine_list.clear(empty_text="Error loading vaccines.")
+
+    def run(self):
+        """Starts the Tkinter main event loop for a page with its own window (the shell runs its own)."""
+        if self.shell is None:
+            self.root.mainloop()
+
+    def teardown(self):
+        """Stops background work and removes the page's widgets. The window itself stays."""
+        if self.closed:
+            return
+        self.closed = True
+        self.changes.stop()
+        self.background.shutdown()
+        self.root.config(cursor="")
+        self.frame.destroy()
+
+    def close_window(self):
+        """Closes the page: back to the login screen in the shell, otherwise the window is destroyed."""
+        if self.closed:
+            return
+        self.teardown()
+        if self.shell is not None:
+            self.shell.page_closed(self)
+        else:
+            self.root.destroy()
+
+    def close_and_open_login(self):
+        """Closes the current page and shows the login portal."""
+        if self.shell is not None:
+            self.close_window() # The shell shows its login screen again, in the same window
+            return
+        self.close_window()
+        # This import is here to avoid circular dependency at the module level
+        from login import AppShell
+        AppShell(tk.Tk()).run()
+
+    def add_logout_button(self):
+        """Adds a logout button to the main content frame."""
+        logout_button = ttk.Button(self.main_content_frame, text="Logout", command=self.close_and_open_login, style="Accent.TButton")
+        logout_button.pack(pady=20, side=tk.BOTTOM)
+
+        # Style for the logout button
+        style = ttk.Style(self.root)
+        style.configure("Accent.TButton", foreground="white", background="red", font=('Arial', 10, 'bold'))
+
+
+# Example of how a subclass might use it (for testing purposes)
+if __name__ == "__main__":
+    # This is just for testing MainPage directly.
+    # In the actual application, subclasses (DoctorMainPage, PatientMainPage, etc.) will be instantiated.
+    # We need to mock current_user_id and current_user_role for this test.
+    # For a real run, these would come from the login process.
+
+    # Mocking a user login for testing
+    mock_person_id = 1 # Assuming person with ID 1 is a doctor
+    mock_user_role = "doctor"
+
+    # To get the specific role ID (e.g., iddoctor), we'd normally query the DB.
+    # For this direct test, let's assume we know iddoctor for person_id 1 is 1.
+    # The get_specific_role_id method in MainPage handles this.
+
+    app = MainPage(user_type_display_name="Test User", current_user_id=mock_person_id, current_user_role=mock_user_role)
+    
+    # Example of adding a simple label to the main_content_frame
+    Label(app.main_content_frame, text="This is the main content area.", font=("Arial", 12)).pack(pady=10)
+    
+    # Example of adding the vaccine list to the main_content_frame
+    app.create_vaccine_list_display(app.main_content_frame, title="System Vaccines")
+    
+    app.add_logout_button()
+    app.run()
@@ -1,376 +1,409 @@
-# nurse_main_page.py
-import tkinter as tk
-from tkinter import ttk, messagebox, Frame, Label, Listbox, Scrollbar, END, Toplevel, Text
-import sqlite3
-from main_page import MainPage # Base class
-import os
-DB_PATH = 'vaccinedatabase.db'
-
-class NurseMainPage(MainPage):
-    def __init__(self, current_user_id, current_user_role):
-        super().__init__(user_type_display_name="Nurse", current_user_id=current_user_id, current_user_role=current_user_role)
-        # self.nurse_id is now self.specific_role_id from MainPage
-        if self.specific_role_id is None:
-             messagebox.showerror("Error", "Nurse ID not found. Cannot load Nurse dashboard.", parent=self.root)
-             self.root.destroy()
-             return
-
-        self.selected_patient_info = None # Stores {'name': display_name, 'idpatient': patient_id, 'idperson': person_id}
-        self.selected_prescription_info = None # Stores {'id_prescription': id, 'vaccine_name': name, ...}
-        
-        self.patients_data = [] # To store patient details for combobox
-        self.prescriptions_data = [] # To store prescription details for listbox
-
-        self._setup_nurse_ui()
-        self.add_logout_button()
-
-    def _setup_nurse_ui(self):
-        """Sets up the UI elements specific to the Nurse's dashboard."""
-        # --- Patient Selection and Prescription Management Frame ---
-        main_interaction_frame = ttk.LabelFrame(self.main_content_frame, text="Patient Vaccine Administration", padding=(15,10))
-        main_interaction_frame.pack(pady=10, padx=10, fill=tk.BOTH, expand=True)
-
-        # Patient Selection
-        Label(main_interaction_frame, text="Select Patient:", font=("Arial", 10)).pack(anchor=tk.W, padx=5, pady=(5,0))
-        self.patient_combobox = ttk.Combobox(main_interaction_frame, width=40, state="readonly", font=("Arial", 10))
-        self.patient_combobox.pack(fill=tk.X, padx=5, pady=5)
-        self.patient_combobox.bind("<<ComboboxSelected>>", self.on_patient_select)
-        self.load_all_patients() # Nurses can typically see all patients for administration
-
-        # Prescriptions List for Selected Patient
-        Label(main_interaction_frame, text="Pending Prescriptions for Selected Patient:", font=("Arial", 10)).pack(anchor=tk.W, padx=5, pady=(10,0))
-        
-        prescription_list_frame = Frame(main_interaction_frame)
-        prescription_list_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-
-        pres_scrollbar = Scrollbar(prescription_list_frame, orient=tk.VERTICAL)
-        self.prescription_listbox = Listbox(prescription_list_frame, yscrollcommand=pres_scrollbar.set, height=8, font=("Arial", 10), selectbackground="#a6caf0")
-        pres_scrollbar.config(command=self.prescription_listbox.yview)
-        pres_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.prescription_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        self.prescription_listbox.bind("<<ListboxSelect>>", self.on_prescription_select)
-
-        # Administer Vaccine Button
-        ttk.Button(main_interaction_frame, text="Administer Selected Vaccine", command=self.administer_vaccine, style="Accent.TButton").pack(pady=10, padx=5, fill=tk.X)
-        
-        # --- View Patient File Section (Similar to Doctor's) ---
-        view_patient_frame = ttk.LabelFrame(self.main_content_frame, text="View Patient Records", padding=(10,5))
-        view_patient_frame.pack(pady=10, padx=10, fill=tk.BOTH, expand=True)
-
-        ttk.Button(view_patient_frame, text="View Selected Patient's File", command=self.view_patient_file_nurse).pack(pady=5, fill=tk.X)
-
-        self.patient_file_display_nurse = tk.Text(view_patient_frame, height=8, width=80, wrap=tk.WORD, state=tk.DISABLED, bg="#f5f5f5", font=("Arial", 9))
-        self.patient_file_display_nurse.pack(pady=5, fill=tk.BOTH, expand=True)
-        
-        patient_file_scrollbar = ttk.Scrollbar(view_patient_frame, orient=tk.VERTICAL, command=self.patient_file_display_nurse.yview)
-        patient_file_scrollbar.pack(side=tk.RIGHT, fill=tk.Y, before=self.patient_file_display_nurse)
-        self.patient_file_display_nurse.config(yscrollcommand=patient_file_scrollbar.set)
-
-
-    def load_all_patients(self):
-        """Populates the combobox with all patients in the system."""
-        self.patient_combobox.set('')
-        self.patient_combobox['values'] = []
-        self.patients_data = [] 
-
-        conn = None
-        try:
-            conn = sqlite3.connect(DB_PATH)
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT P.idpatient, Person.firstname, Person.familyname, Person.idperson
-                FROM Patient P
-                JOIN Person ON P.idperson = Person.idperson
-                ORDER BY Person.familyname, Person.firstname
-            """)
-            patients = cursor.fetchall()
-            if patients:
-                patient_display_names = []
-                for patient_id, first, last, person_id in patients:
-                    display_name = f"{last}, {first} (ID: {patient_id})"
-                    patient_display_names.append(display_name)
-                    self.patients_data.append({'name': display_name, 'idpatient': patient_id, 'idperson': person_id})
-                self.patient_combobox['values'] = patient_display_names
-            else:
-                self.patient_combobox['values'] = ["No patients found in system."]
-        except sqlite3.Error as e:
-            messagebox.showerror("Database Error", f"Failed to load patients: {e}", parent=self.root)
-            self.patient_combobox['values'] = ["Error loading patients."]
-        finally:
-            if conn:
-                conn.close()
-
-    def on_patient_select(self, event=None):
-        """Handles patient selection and loads their pending prescriptions."""
-        selected_display_name = self.patient_combobox.get()
-        self.selected_prescription_info = None # Reset selected prescription
-        self.prescription_listbox.delete(0, END) # Clear prescription list
-        self.clear_patient_file_display_nurse() # Clear patient file display
-
-        if selected_display_name and selected_display_name not in ["No patients found in system.", "Error loading patients."]:
-            for patient_info in self.patients_data:
-                if patient_info['name'] == selected_display_name:
-                    self.selected_patient_info = patient_info
-                    self.status_label.config(text=f"Selected Patient: {self.selected_patient_info['name']}")
-                    self.load_pending_prescriptions_for_patient(self.selected_patient_info['idpatient'])
-                    return
-        self.selected_patient_info = None
-        self.status_label.config(text="No patient selected.")
-
-
-    def load_pending_prescriptions_for_patient(self, patient_id):
-        """Loads pending prescriptions for the given patient ID into the listbox."""
-        self.prescription_listbox.delete(0, END)
-        self.prescriptions_data = []
-
-        conn = None
-        try:
-            conn = sqlite3.connect(DB_PATH)
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT pr.id_prescription, m.Med_name, pr.quantity, pr.prescription_date,
-                       p_doc.familyname AS doctor_name, m.id AS medicine_id
-                FROM Prescription pr
-                JOIN Medicine m ON pr.id_medicine = m.id
-                JOIN Doctor doc ON pr.iddoctor = doc.iddoctor
-                JOIN Person p_doc ON doc.idperson = p_doc.idperson
-                WHERE pr.idpatient = ? AND pr.status = 'pending'
-                ORDER BY pr.prescription_date DESC
-            """, (patient_id,))
-            prescriptions = cursor.fetchall()
-            if prescriptions:
-                for pres_id, med_name, qty, pres_date, doc_name, med_id in prescriptions:
-                    display_text = f"{med_name} (Qty: {qty}) - Prescribed by Dr. {doc_name} on {pres_date}"
-                    self.prescription_listbox.insert(END, display_text)
-                    self.prescriptions_data.append({
-                        'id_prescription': pres_id,
-                        'vaccine_name': med_name,
-                        'vaccine_id': med_id, # Medicine.id
-                        'quantity': qty,
-                        'display_text': display_text
-                    })
-            else:
-                self.prescription_listbox.insert(END, "No pending prescriptions for this patient.")
-        except sqlite3.Error as e:
-            messagebox.showerror("Database Error", f"Failed to load prescriptions: {e}", parent=self.root)
-            self.prescription_listbox.insert(END, "Error loading prescriptions.")
-        finally:
-            if conn:
-                conn.close()
-
-    def on_prescription_select(self, event=None):
-        """Handles prescription selection from the listbox."""
-        selection = self.prescription_listbox.curselection()
-        if selection:
-            selected_index = selection[0]
-            # Ensure the selected index is valid for prescriptions_data
-            if 0 <= selected_index < len(self.prescriptions_data):
-                self.selected_prescription_info = self.prescriptions_data[selected_index]
-                self.status_label.config(text=f"Selected Prescription: {self.selected_prescription_info['vaccine_name']}")
-                return
-            else: # Index out of bounds, likely "No pending..." or "Error..." message was clicked
-                self.selected_prescription_info = None
-                self.status_label.config(text="Please select a valid prescription.")
-                return
-
-        self.selected_prescription_info = None
-        # Do not change status if nothing valid is selected or list is empty.
-        # Keep current patient status or "No patient selected."
-
-    def administer_vaccine(self):
-        """Administers the selected vaccine to the selected patient."""
-        if not self.selected_patient_info:
-            messagebox.showerror("Error", "Please select a patient first.", parent=self.root)
-            return
-        if not self.selected_prescription_info:
-            messagebox.showerror("Error", "Please select a prescription to administer.", parent=self.root)
-            return
-
-        patient_name = self.selected_patient_info['name']
-        vaccine_name = self.selected_prescription_info['vaccine_name']
-        vaccine_id = self.selected_prescription_info['vaccine_id'] # Medicine.id
-        prescription_id = self.selected_prescription_info['id_prescription']
-        nurse_id = self.specific_role_id # This is Nurse.idnurse
-
-        # Ask for confirmation
-        confirm = messagebox.askyesno("Confirm Administration",
-                                      f"Administer {vaccine_name} to {patient_name}?",
-                                      parent=self.root)
-        if not confirm:
-            return
-
-        conn = None
-        try:
-            conn = sqlite3.connect(DB_PATH)
-            cursor = conn.cursor()
-
-            # 1. Find an available stock for this vaccine.
-            # For simplicity, let's assume the nurse administers from any center that has stock.
-            # A more complex system might link nurses to specific centers or ask for center selection.
-            cursor.execute("""
-                SELECT cs.id AS stock_id, cs.center_id, cs.quantity
-                FROM CenterStock cs
-                WHERE cs.vaccine_id = ? AND cs.quantity > 0
-                ORDER BY cs.quantity DESC -- Pick from center with most stock, or any other logic
-                LIMIT 1 
-            """, (vaccine_id,))
-            stock_info = cursor.fetchone()
-
-            if not stock_info:
-                messagebox.showerror("Stock Error", f"No available stock found for {vaccine_name} in any center.", parent=self.root)
-                return
-            
-            stock_id, center_id_for_administration, current_stock_quantity = stock_info
-
-            # Start transaction
-            conn.execute("BEGIN TRANSACTION")
-
-            # 2. Update Prescription status to 'administered'
-            cursor.execute("UPDATE Prescription SET status = 'administered' WHERE id_prescription = ?", (prescription_id,))
-
-            # 3. Decrement stock in CenterStock
-            cursor.execute("UPDATE CenterStock SET quantity = quantity - 1 WHERE id = ?", (stock_id,))
-            
-            # 4. Log the administration in AdministrationLog
-            cursor.execute("""
-                INSERT INTO AdministrationLog (prescription_id, nurse_id, center_id, administered_at)
-                VALUES (?, ?, ?, datetime('now'))
-            """, (prescription_id, nurse_id, center_id_for_administration, ))
-
-            conn.commit()
-            messagebox.showinfo("Success", f"{vaccine_name} administered successfully to {patient_name}.", parent=self.root)
-            
-            # Refresh the prescription list for the current patient
-            self.load_pending_prescriptions_for_patient(self.selected_patient_info['idpatient'])
-            self.selected_prescription_info = None # Clear selection
-            self.status_label.config(text=f"Administered {vaccine_name} to {patient_name}.")
-            # Optionally, refresh patient file if it's currently displayed
-            if self.patient_file_display_nurse.get("1.0", tk.END).strip():
-                self.view_patient_file_nurse()
-
-
-        except sqlite3.Error as e:
-            if conn: conn.rollback()
-            messagebox.showerror("Database Error", f"Failed to administer vaccine: {e}", parent=self.root)
-        finally:
-            if conn:
-                conn.close()
-
-    def view_patient_file_nurse(self):
-        """Displays the selected patient's file (details, prescriptions, history) in the nurse's UI."""
-        if not self.selected_patient_info:
-            messagebox.showinfo("Info", "Please select a patient to view their file.", parent=self.root)
-            self.clear_patient_file_display_nurse()
-            return
-
-        patient_id = self.selected_patient_info['idpatient'] 
-        patient_person_id = self.selected_patient_info['idperson']
-        
-        display_widget = self.patient_file_display_nurse
-        display_widget.config(state=tk.NORMAL)
-        display_widget.delete("1.0", tk.END)
-
-        conn = None
-        try:
-            conn = sqlite3.connect(DB_PATH)
-            cursor = conn.cursor()
-
-            # Fetch Patient Details
-            cursor.execute("""
-                SELECT p.firstname, p.familyname, p.dateofbirth, c.email
-                FROM Person p
-                LEFT JOIN Credentials c ON p.idperson = c.person_id /* Use LEFT JOIN in case credentials somehow missing */
-                WHERE p.idperson = ?
-            """, (patient_person_id,))
-            details = cursor.fetchone()
-
-            if details:
-                display_widget.insert(tk.END, f"--- Patient Details ---\n", "header_nurse")
-                display_widget.insert(tk.END, f"Name: {details[0] or 'N/A'} {details[1] or 'N/A'}\n")
-                display_widget.insert(tk.END, f"DOB: {details[2] or 'N/A'}\n")
-                display_widget.insert(tk.END, f"Email: {details[3] or 'N/A'}\n\n")
-
-            # Fetch All Prescriptions (Pending and Administered)
-            cursor.execute("""
-                SELECT m.Med_name, pr.quantity, pr.status, pr.prescription_date, d_person.familyname AS doctor_name
-                FROM Prescription pr
-                JOIN Medicine m ON pr.id_medicine = m.id
-                JOIN Doctor doc ON pr.iddoctor = doc.iddoctor
-                JOIN Person d_person ON doc.idperson = d_person.idperson
-                WHERE pr.idpatient = ?
-                ORDER BY pr.prescription_date DESC
-            """, (patient_id,))
-            prescriptions = cursor.fetchall()
-
-            display_widget.insert(tk.END, "--- All Vaccine Prescriptions ---\n", "header_nurse")
-            if prescriptions:
-                for med_name, qty, status, pres_date, doc_name in prescriptions:
-                    display_widget.insert(tk.END, f"- {med_name} (Qty: {qty}) | Status: {status.upper()} | Prescribed: {pres_date} by Dr. {doc_name}\n")
-            else:
-                display_widget.insert(tk.END, "No prescriptions found for this patient.\n")
-            display_widget.insert(tk.END, "\n")
-
-            # Fetch Vaccination History (from AdministrationLog)
-            cursor.execute("""
-                SELECT m.Med_name, pr.quantity, al.administered_at, vc.name AS center_name, n_person.familyname AS admin_nurse_name
-                FROM AdministrationLog al
-                JOIN Prescription pr ON al.prescription_id = pr.id_prescription
-                JOIN Medicine m ON pr.id_medicine = m.id
-                JOIN Nurse n ON al.nurse_id = n.idnurse
-                JOIN Person n_person ON n.idperson = n_person.idperson
-                JOIN VaccinationCenter vc ON al.center_id = vc.idcenter
-                WHERE pr.idpatient = ?
-                ORDER BY al.administered_at DESC
-            """, (patient_id,))
-            history = cursor.fetchall()
-
-            display_widget.insert(tk.END, "--- Vaccination History ---\n", "header_nurse")
-            if history:
-                for med_name, qty, admin_date, center, admin_nurse in history:
-                    display_widget.insert(tk.END, f"- {med_name} (Qty: {qty}) | Administered: {admin_date} at {center} by Nurse {admin_nurse}\n")
-            else:
-                display_widget.insert(tk.END, "No vaccination history found for this patient.\n")
-
-            display_widget.tag_configure("header_nurse", font=("Arial", 10, "bold", "underline"), foreground="#005b96")
-
-        except sqlite3.Error as e:
-            display_widget.insert(tk.END, f"Error loading patient file: {e}")
-            messagebox.showerror("Database Error", f"Could not load patient file: {e}", parent=self.root)
-        finally:
-            if conn:
-                conn.close()
-            display_widget.config(state=tk.DISABLED)
-
-    def clear_patient_file_display_nurse(self):
-        self.patient_file_display_nurse.config(state=tk.NORMAL)
-        self.patient_file_display_nurse.delete("1.0", tk.END)
-        self.patient_file_display_nurse.config(state=tk.DISABLED)
-
-
-# This is for standalone testing of the NurseMainPage
-if __name__ == "__main__":
-    # Ensure the database exists and is populated. Run database.py first.
-    # For testing, we need a valid person_id for a nurse from the database.
-    # Let's assume person_id 5 is 'nurse1@example.com' (Michael Nurse)
-    mock_nurse_person_id = 5
-    mock_nurse_role = "nurse"
-    
-    if not os.path.exists(DB_PATH):
-        print(f"Database file '{DB_PATH}' not found. Please run database.py to create and populate it.")
-    else:
-        conn_test = None
-        try:
-            conn_test = sqlite3.connect(DB_PATH)
-            cursor_test = conn_test.cursor()
-            cursor_test.execute("SELECT person_id FROM Credentials WHERE person_id = ? AND user_type = 'nurse'", (mock_nurse_person_id,))
-            if cursor_test.fetchone():
-                app = NurseMainPage(current_user_id=mock_nurse_person_id, current_user_role=mock_nurse_role)
-                app.run()
-            else:
-                print(f"Test nurse with person_id {mock_nurse_person_id} not found.")
-                print("Please ensure 'database.py' has been run and contains this nurse.")
-        except sqlite3.Error as e:
-            print(f"Database error during test setup: {e}")
-        finally:
-            if conn_test:
-                conn_test.close()
+# nurse_main_page.py
+import tkinter as tk
+from tkinter import ttk, messagebox, Frame, Label, Listbox, Scrollbar, END, Toplevel, Text
+import sqlite3
+from main_page import MainPage # Base class
+import queries # Shared SQL for the hot paths
+from patient_search import PatientSearchBox
+from patient_file import get_patient_file_service, PatientFileView
+import administration
+from list_model import ListboxModel
+import os
+DB_PATH = 'vaccinedatabase.db'
+
+class NurseMainPage(MainPage):
+    def __init__(self, current_user_id, current_user_role, session=None, shell=None):
+        super().__init__(user_type_display_name="Nurse", current_user_id=current_user_id, current_user_role=current_user_role, session=session, shell=shell)
+        # self.nurse_id is now self.specific_role_id from MainPage
+        if self.specific_role_id is None:
+             messagebox.showerror("Error", "Nurse ID not found. Cannot load Nurse dashboard.", parent=self.root)
+             self.close_window()
+             return
+
+        self.selected_patient_info = None # Stores {'name': display_name, 'idpatient': patient_id, 'idperson': person_id}
+        self.selected_prescription_info = None # Stores {'id_prescription': id, 'vaccine_name': name, ...}
+        self.patient_files = get_patient_file_service(self.db) # Shared with the doctor dashboard
+        
+        self.batch_queue = [] # Batch mode: {'id_prescription', 'vaccine_id', 'idpatient', 'label', 'reason'} per queued item
+        self.batch_window = None
+
+        self._setup_nurse_ui()
+        self.add_logout_button()
+        # Refresh only the panels whose tables another station (or this one) changed
+        self.changes.watch(("Person",), lambda tables: self.patient_search_box.refresh())
+        self.changes.watch(("Prescription",), self.on_prescriptions_changed)
+        self.changes.watch(("Person", "Prescription", "AdministrationLog"), self.on_patient_records_changed)
+
+    def _setup_nurse_ui(self):
+        """Sets up the UI elements specific to the Nurse's dashboard."""
+        # --- Patient Selection and Prescription Management Frame ---
+        main_interaction_frame = ttk.LabelFrame(self.main_content_frame, text="Patient Vaccine Administration", padding=(15,10))
+        main_interaction_frame.pack(pady=10, padx=10, fill=tk.BOTH, expand=True)
+
+        # Patient Selection: nurses can administer to any patient, found with the type-ahead search
+        Label(main_interaction_frame, text="Search Patient (name, date of birth or ID):", font=("Arial", 10)).pack(anchor=tk.W, padx=5, pady=(5,0))
+        self.patient_search_box = PatientSearchBox(main_interaction_frame, self, self.on_patient_select, height=5, font=("Arial", 10))
+        self.patient_search_box.pack(fill=tk.X, padx=5, pady=5)
+
+        # Prescriptions List for Selected Patient
+        Label(main_interaction_frame, text="Pending Prescriptions for Selected Patient:", font=("Arial", 10)).pack(anchor=tk.W, padx=5, pady=(10,0))
+        
+        prescription_list_frame = Frame(main_interaction_frame)
+        prescription_list_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+        pres_scrollbar = Scrollbar(prescription_list_frame, orient=tk.VERTICAL)
+        self.prescription_listbox = Listbox(prescription_list_frame, yscrollcommand=pres_scrollbar.set, height=8, font=("Arial", 10), selectbackground="#a6caf0")
+        pres_scrollbar.config(command=self.prescription_listbox.yview)
+        pres_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.prescription_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.prescription_listbox.bind("<<ListboxSelect>>", self.on_prescription_select)
+        # Rows keyed by Prescription.id_prescription, values {'id_prescription', 'vaccine_name', 'vaccine_id', ...}
+        self.prescription_list = ListboxModel(self.prescription_listbox)
+
+        # Administer Vaccine Button
+        ttk.Button(main_interaction_frame, text="Administer Selected Vaccine", command=self.administer_vaccine, style="Accent.TButton").pack(pady=10, padx=5, fill=tk.X)
+        # Mass-vaccination days: queue many prescriptions (e.g. scanned) and administer them together
+        ttk.Button(main_interaction_frame, text="Batch Mode...", command=self.open_batch_window).pack(pady=(0,10), padx=5, fill=tk.X)
+        
+        # --- View Patient File Section (Similar to Doctor's) ---
+        view_patient_frame = ttk.LabelFrame(self.main_content_frame, text="View Patient Records", padding=(10,5))
+        view_patient_frame.pack(pady=10, padx=10, fill=tk.BOTH, expand=True)
+
+        ttk.Button(view_patient_frame, text="View Selected Patient's File", command=self.view_patient_file_nurse).pack(pady=5, fill=tk.X)
+
+        self.patient_file_view_nurse = PatientFileView(view_patient_frame, self, prescriptions_title="All Vaccine Prescriptions",
+                                                       height=5, header_font=("Arial", 10, "bold"))
+        self.patient_file_view_nurse.pack(pady=5, fill=tk.BOTH, expand=True)
+
+
+    def on_patient_select(self, patient_info=None):
+        """Handles patient selection from the search results and loads their pending prescriptions."""
+        self.cancel_background("patient_file") # Still loading for the previous patient
+        self.cancel_background("pending_prescriptions")
+        self.selected_prescription_info = None # Reset selected prescription
+        self.prescription_list.clear() # Clear prescription list
+        self.clear_patient_file_display_nurse() # Clear patient file display
+
+        if patient_info:
+            self.selected_patient_info = patient_info
+            self.status_label.config(text=f"Selected Patient: {self.selected_patient_info['name']}")
+            self.load_pending_prescriptions_for_patient(self.selected_patient_info['idpatient'])
+            return
+        self.selected_patient_info = None
+        self.status_label.config(text="No patient selected.")
+
+
+    def load_pending_prescriptions_for_patient(self, patient_id, clear=True):
+        """
+        Loads pending prescriptions for the given patient ID into the listbox (in the background).
+        Args:
+            clear (bool): Empty the list while loading; a refresh keeps showing the old list instead.
+        """
+        if clear:
+            self.prescription_list.clear()
+        # Keyed, so the list of a previously selected patient can never replace this one
+        self.run_in_background(self.db.fetchall, queries.PENDING_PRESCRIPTIONS, (patient_id,), "nurse.pending_prescriptions",
+                               on_success=self._show_pending_prescriptions, on_error=self._show_pending_prescriptions_error,
+                               key="pending_prescriptions", busy_text="Loading prescriptions...")
+
+    def _show_pending_prescriptions(self, prescriptions):
+        rows = []
+        for pres_id, med_name, qty, pres_date, doc_name, med_id in prescriptions:
+            display_text = f"{med_name} (Qty: {qty}) - Prescribed by Dr. {doc_name} on {pres_date}"
+            rows.append((pres_id, display_text, {
+                'id_prescription': pres_id,
+                'vaccine_name': med_name,
+                'vaccine_id': med_id, # Medicine.id
+                'quantity': qty,
+                'display_text': display_text
+            }))
+        # Only the rows that changed are touched; the selected prescription stays selected while it is pending
+        self.prescription_list.update(rows, empty_text="No pending prescriptions for this patient.")
+        if self.selected_prescription_info:
+            self.selected_prescription_info = self.prescription_list.selected_value()
+
+    def _show_pending_prescriptions_error(self, e):
+        messagebox.showerror("Database Error", f"Failed to load prescriptions: {e}", parent=self.root)
+        self.prescription_list.clear(empty_text="Error loading prescriptions.")
+
+    def on_prescriptions_changed(self, tables):
+        """Prescriptions changed somewhere (prescribed, administered): re-read the selected patient's list."""
+        if self.selected_patient_info:
+            self.load_pending_prescriptions_for_patient(self.selected_patient_info['idpatient'], clear=False)
+
+    def on_patient_records_changed(self, tables):
+        """
+        Prescriptions, administrations or names changed somewhere: the file on display is re-read in
+        the background and replaces that patient's cached file. The other cached files are now stale
+        and are re-read when next viewed (PatientFileService checks the change counters).
+        """
+        if self.selected_patient_info and self.patient_file_view_nurse.is_showing():
+            # Keyed like a normal load, so selecting another patient meanwhile cancels it
+            self.run_in_background(self.patient_files.get, self.selected_patient_info['idpatient'], True,
+                                   on_success=self._show_patient_file_nurse, on_error=self._show_patient_file_error_nurse,
+                                   key="patient_file", busy_text="Refreshing patient file...")
+
+    def on_prescription_select(self, event=None):
+        """Handles prescription selection from the listbox."""
+        if self.prescription_listbox.curselection():
+            # Looked up by key, so it is the prescription shown in that row even after a refresh
+            self.selected_prescription_info = self.prescription_list.selected_value()
+            if self.selected_prescription_info:
+                self.status_label.config(text=f"Selected Prescription: {self.selected_prescription_info['vaccine_name']}")
+                return
+            # The "No pending..." or "Error..." message was clicked
+            self.status_label.config(text="Please select a valid prescription.")
+            return
+
+        self.selected_prescription_info = None
+        # Do not change status if nothing valid is selected or list is empty.
+        # Keep current patient status or "No patient selected."
+
+    def administer_vaccine(self):
+        """Administers the selected vaccine to the selected patient."""
+        if not self.selected_patient_info:
+            messagebox.showerror("Error", "Please select a patient first.", parent=self.root)
+            return
+        if not self.selected_prescription_info:
+            messagebox.showerror("Error", "Please select a prescription to administer.", parent=self.root)
+            return
+
+        patient_name = self.selected_patient_info['name']
+        vaccine_name = self.selected_prescription_info['vaccine_name']
+        vaccine_id = self.selected_prescription_info['vaccine_id'] # Medicine.id
+        prescription_id = self.selected_prescription_info['id_prescription']
+        nurse_id = self.specific_role_id # This is Nurse.idnurse
+
+        # Ask for confirmation
+        confirm = messagebox.askyesno("Confirm Administration",
+                                      f"Administer {vaccine_name} to {patient_name}?",
+                                      parent=self.root)
+        if not confirm:
+            return
+
+        try:
+            # One transaction: the prescription is marked administered, a dose is taken from the
+            # center with the most stock (checked and decremented in the same statement) and logged.
+            # For simplicity, the nurse administers from any center that has stock.
+            result = administration.administer(self.db, prescription_id, vaccine_id, nurse_id)
+
+            if result.status == administration.OUT_OF_STOCK:
+                messagebox.showerror("Stock Error", f"No available stock found for {vaccine_name} in any center.", parent=self.root)
+                return
+            if result.status == administration.NOT_PENDING:
+                messagebox.showerror("Error", "This prescription is no longer pending; it may have been administered at another workstation.", parent=self.root)
+                self.load_pending_prescriptions_for_patient(self.selected_patient_info['idpatient'])
+                return
+            self.patient_files.invalidate(self.selected_patient_info['idpatient']) # Drop the now outdated cached file
+            self.selected_prescription_info = None # Clear selection
+            # Refreshes the prescription list and, if it is displayed, the patient file
+            self.changes.poll()
+
+            messagebox.showinfo("Success", f"{vaccine_name} administered successfully to {patient_name}.", parent=self.root)
+            self.status_label.config(text=f"Administered {vaccine_name} to {patient_name}.")
+
+
+        except sqlite3.Error as e: # The transaction has already been rolled back
+            messagebox.showerror("Database Error", f"Failed to administer vaccine: {e}", parent=self.root)
+
+    # --- Batch mode ---
+
+    def open_batch_window(self):
+        """Opens the batch administration window (or brings it to the front)."""
+        if self.batch_window is not None and self.batch_window.winfo_exists():
+            self.batch_window.lift()
+            self.batch_entry.focus_set()
+            return
+
+        self.batch_window = Toplevel(self.root)
+        self.batch_window.title("Batch Administration")
+        self.batch_window.geometry("520x480")
+        self.batch_window.transient(self.root)
+
+        frame = ttk.Frame(self.batch_window, padding="10")
+        frame.pack(expand=True, fill=tk.BOTH)
+
+        # A barcode scanner types the ID followed by Enter, so every scan adds one item
+        ttk.Label(frame, text="Scan or type a prescription ID and press Enter:").pack(anchor=tk.W)
+        self.batch_entry = ttk.Entry(frame, font=("Arial", 12))
+        self.batch_entry.pack(fill=tk.X, pady=5)
+        self.batch_entry.bind("<Return>", self.add_scanned_prescription_to_batch)
+        self.batch_entry.focus_set()
+
+        ttk.Button(frame, text="Add Selected Prescription", command=self.add_selected_prescription_to_batch).pack(fill=tk.X)
+        self.batch_hint_label = ttk.Label(frame, text="", foreground="#555555")
+        self.batch_hint_label.pack(anchor=tk.W, pady=5)
+
+        list_frame = Frame(frame)
+        list_frame.pack(fill=tk.BOTH, expand=True)
+        batch_scrollbar = Scrollbar(list_frame, orient=tk.VERTICAL)
+        self.batch_listbox = Listbox(list_frame, yscrollcommand=batch_scrollbar.set, height=12, font=("Arial", 10),
+                                     selectbackground="#a6caf0", selectmode=tk.EXTENDED)
+        batch_scrollbar.config(command=self.batch_listbox.yview)
+        batch_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.batch_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.batch_list = ListboxModel(self.batch_listbox) # Rows keyed by Prescription.id_prescription
+
+        buttons = ttk.Frame(frame)
+        buttons.pack(fill=tk.X, pady=(5,0))
+        ttk.Button(buttons, text="Remove Selected", command=self.remove_selected_from_batch).pack(side=tk.LEFT)
+        ttk.Button(buttons, text="Clear", command=self.clear_batch).pack(side=tk.LEFT, padx=5)
+        self.batch_commit_button = ttk.Button(buttons, command=self.administer_batch, style="Accent.TButton")
+        self.batch_commit_button.pack(side=tk.RIGHT)
+        self._refresh_batch_list()
+
+    def add_scanned_prescription_to_batch(self, event=None):
+        """Adds the prescription whose ID was scanned/typed into the batch entry."""
+        text = self.batch_entry.get().strip()
+        self.batch_entry.delete(0, END)
+        if not text.isdigit():
+            self._batch_hint(f"'{text}' is not a prescription ID.", error=True)
+            return
+        try:
+            row = self.db.fetchone(queries.BATCH_PRESCRIPTION, (int(text),), label="nurse.batch.prescription")
+        except sqlite3.Error as e:
+            messagebox.showerror("Database Error", f"Failed to look up prescription: {e}", parent=self.batch_window)
+            return
+        if not row:
+            self._batch_hint(f"Prescription {text} not found.", error=True)
+            return
+        pres_id, med_id, med_name, status, patient_id, firstname, familyname = row
+        if status != 'pending':
+            self._batch_hint(f"Prescription {pres_id} ({med_name} for {familyname}, {firstname}) is {status}.", error=True)
+            return
+        self._add_to_batch(pres_id, med_id, patient_id, f"#{pres_id}  {familyname}, {firstname}  –  {med_name}")
+
+    def add_selected_prescription_to_batch(self):
+        """Adds the prescription selected on the dashboard."""
+        if not self.selected_patient_info or not self.selected_prescription_info:
+            self._batch_hint("Select a patient and a pending prescription on the dashboard first.", error=True)
+            return
+        info = self.selected_prescription_info
+        self._add_to_batch(info['id_prescription'], info['vaccine_id'], self.selected_patient_info['idpatient'],
+                           f"#{info['id_prescription']}  {self.selected_patient_info['name']}  –  {info['vaccine_name']}")
+
+    def _add_to_batch(self, prescription_id, vaccine_id, patient_id, label):
+        if any(item['id_prescription'] == prescription_id for item in self.batch_queue):
+            self._batch_hint(f"Prescription {prescription_id} is already queued.", error=True)
+            return
+        self.batch_queue.append({'id_prescription': prescription_id, 'vaccine_id': vaccine_id,
+                                 'idpatient': patient_id, 'label': label, 'reason': None})
+        self._refresh_batch_list()
+        self.batch_listbox.see(END)
+        self._batch_hint(f"Queued: {label}")
+
+    def remove_selected_from_batch(self):
+        selected = set(self.batch_list.selected_keys())
+        self.batch_queue = [item for item in self.batch_queue if item['id_prescription'] not in selected]
+        self._refresh_batch_list()
+
+    def clear_batch(self):
+        self.batch_queue = []
+        self._refresh_batch_list()
+        self._batch_hint("")
+
+    def _refresh_batch_list(self):
+        # A scan appends one row instead of redrawing the whole queue
+        self.batch_list.update((item['id_prescription'], f"{item['label']}  [{item['reason']}]" if item['reason'] else item['label'], item)
+                               for item in self.batch_queue)
+        self.batch_commit_button.config(text=f"Administer All ({len(self.batch_queue)})",
+                                        state=tk.NORMAL if self.batch_queue else tk.DISABLED)
+
+    def _batch_hint(self, text, error=False):
+        self.batch_hint_label.config(text=text, foreground="#b00020" if error else "#555555")
+        if error:
+            self.batch_window.bell()
+
+    def administer_batch(self):
+        """Administers every queued prescription. Failed items stay queued with the reason."""
+        if not self.batch_queue:
+            return
+        if not messagebox.askyesno("Confirm Batch Administration",
+                                   f"Administer {len(self.batch_queue)} queued vaccine(s)?", parent=self.batch_window):
+            return
+
+        items = [(item['id_prescription'], item['vaccine_id']) for item in self.batch_queue]
+        def show_progress(done, total):
+            self._batch_hint(f"Administering... {done}/{total}")
+            self.batch_window.update_idletasks()
+        try:
+            results = administration.administer_batch(self.db, items, self.specific_role_id, progress=show_progress)
+        except sqlite3.Error as e:
+            messagebox.showerror("Database Error", f"Batch administration failed: {e}", parent=self.batch_window)
+            return
+
+        reasons = {administration.OUT_OF_STOCK: "out of stock",
+                   administration.NOT_PENDING: "no longer pending"}
+        remaining = []
+        administered = 0
+        for item, result in zip(self.batch_queue, results):
+            if result.status == administration.ADMINISTERED:
+                administered += 1
+                self.patient_files.invalidate(item['idpatient'])
+                continue
+            remaining.append(dict(item, reason=reasons.get(result.status) or f"failed: {result.error}"))
+        self.batch_queue = remaining
+        self._refresh_batch_list()
+        self._batch_hint(f"{administered} administered, {len(remaining)} not administered (left in the queue).",
+                         error=bool(remaining))
+        self.status_label.config(text=f"Batch: administered {administered} vaccine(s).")
+
+        # The dashboard's lists may show patients from the batch
+        self.changes.poll()
+
+    def view_patient_file_nurse(self):
+        """Displays the selected patient's file (details, prescriptions, history), loading it in the background if needed."""
+        if not self.selected_patient_info:
+            messagebox.showinfo("Info", "Please select a patient to view their file.", parent=self.root)
+            self.clear_patient_file_display_nurse()
+            return
+
+        patient_id = self.selected_patient_info['idpatient'] 
+        patient_file = self.patient_files.cached(patient_id)
+        if patient_file is not None:
+            self.cancel_background("patient_file")
+            self._show_patient_file_nurse(patient_file)
+            return
+
+        self.run_in_background(self.patient_files.get, patient_id,
+                               on_success=self._show_patient_file_nurse, on_error=self._show_patient_file_error_nurse,
+                               key="patient_file", busy_text="Loading patient file...")
+
+    def _show_patient_file_nurse(self, patient_file):
+        self.patient_file_view_nurse.show(patient_file)
+
+    def _show_patient_file_error_nurse(self, e):
+        self.patient_file_view_nurse.show_error(e)
+        messagebox.showerror("Database Error", f"Could not load patient file: {e}", parent=self.root)
+
+    def clear_patient_file_display_nurse(self):
+        self.patient_file_view_nurse.clear()
+
+
+# This is for standalone testing of the NurseMainPage
+if __name__ == "__main__":
+    # Ensure the database exists and is populated. Run database.py first.
+    # For testing, we need a valid person_id for a nurse from the database.
+    # Let's assume person_id 5 is 'nurse1@example.com' (Michael Nurse)
+    mock_nurse_person_id = 5
+    mock_nurse_role = "nurse"
+    
+    if not os.path.exists(DB_PATH):
+        print(f"Database file '{DB_PATH}' not found. Please run database.py to create and populate it.")
+    else:
+        conn_test = None
+        try:
+            conn_test = sqlite3.connect(DB_PATH)
+            cursor_test = conn_test.cursor()
+            cursor_test.execute("SELECT person_id FROM Credentials WHERE person_id = ? AND user_type = 'nurse'", (mock_nurse_person_id,))
+            if cursor_test.fetchone():
+                app = NurseMainPage(current_user_id=mock_nurse_person_id, current_user_role=mock_nurse_role)
+                app.run()
+            else:
+                print(f"Test nurse with person_id {mock_nurse_person_id} not found.")
+                print("Please ensure 'database.py' has been run and contains this nurse.")
+        except sqlite3.Error as e:
+            print(f"Database error during test setup: {e}")
+        finally:
+            if conn_test:
+                conn_test.close()
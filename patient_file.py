@@ -0,0 +1,227 @@
+# patient_file.py – Vaccination System
+"""
+The patient file shown on the doctor and nurse dashboards: personal details, the prescriptions
+and the vaccination history.
+
+PatientFileService loads the details and the first page of both lists with a single statement
+(queries.PATIENT_FILE) into an immutable PatientFile, and keeps the most recently viewed files in
+an LRU cache. Each cached file remembers the change counters (TableVersion, bumped by triggers) of
+the tables it was read from, and is only served while they are unchanged: a prescription or an
+administration committed by any station makes it stale. Pages also call invalidate(patient_id)
+after committing for that patient, so the next view reads the new state even before that check.
+
+PatientFileView shows a file with the lists in VirtualTables: further pages are only read when
+the user scrolls to them, so a long history costs no more to open than a short one.
+"""
+import threading
+from collections import OrderedDict, namedtuple
+
+import tkinter as tk
+from tkinter import ttk, Frame
+
+import data_access
+import queries
+from virtual_table import PAGE_SIZE, KeysetPager, VirtualTable
+
+# Tables a patient file is read from; a change to any of them makes the cached files stale
+SOURCE_TABLES = ("Person", "Prescription", "AdministrationLog", "Medicine", "VaccinationCenter")
+
+# The rows of queries.PATIENT_PRESCRIPTIONS_PAGE / PATIENT_HISTORY_PAGE; the first two fields are the sort key
+PrescriptionEntry = namedtuple("PrescriptionEntry", ["prescribed_on", "id_prescription", "vaccine", "quantity", "status", "doctor"])
+AdministrationEntry = namedtuple("AdministrationEntry", ["administered_at", "log_id", "vaccine", "quantity", "center", "nurse"])
+
+# Immutable, so one instance can be shared by every page and thread that views the patient.
+# `prescriptions` and `history` are the first page of each list (tuples, newest first);
+# `more_prescriptions` / `more_history` tell whether further pages exist.
+# Details are None if the patient has no Person row.
+PatientFile = namedtuple("PatientFile", ["patient_id", "firstname", "familyname", "dateofbirth", "email",
+                                         "prescriptions", "history", "more_prescriptions", "more_history"])
+
+
+def _build_patient_file(patient_id, rows, page_size):
+    """Splits the rows of queries.PATIENT_FILE (read with :limit = page_size + 1) into a PatientFile."""
+    details = (None, None, None, None)
+    prescriptions = []
+    history = []
+    for part, *columns in rows:
+        if part == 0:
+            details = tuple(columns[2:])
+        elif part == 1:
+            prescriptions.append(PrescriptionEntry(*columns))
+        else:
+            history.append(AdministrationEntry(*columns))
+    return PatientFile(patient_id, *details, tuple(prescriptions[:page_size]), tuple(history[:page_size]),
+                       len(prescriptions) > page_size, len(history) > page_size)
+
+
+def prescription_pager(pool, patient_id):
+    """KeysetPager over all of the patient's prescriptions, newest first."""
+    return KeysetPager(pool, queries.PATIENT_PRESCRIPTIONS_PAGE, queries.PATIENT_PRESCRIPTIONS_NEXT_PAGE,
+                       {"patient": patient_id}, ("after_date", "after_id"), label="patient_file.prescriptions_page")
+
+def history_pager(pool, patient_id):
+    """KeysetPager over the patient's vaccination history, most recent first."""
+    return KeysetPager(pool, queries.PATIENT_HISTORY_PAGE, queries.PATIENT_HISTORY_NEXT_PAGE,
+                       {"patient": patient_id}, ("after_date", "after_id"), label="patient_file.history_page")
+
+
+class PatientFileService:
+    """Loads patient files and caches them per patient (thread-safe)."""
+    def __init__(self, pool, cache_size=64, page_size=PAGE_SIZE):
+        """
+        Args:
+            pool (data_access.ConnectionPool): Where the file is read from.
+            cache_size (int): Number of patient files kept; least recently viewed are dropped.
+            page_size (int): Prescriptions and history entries read with the file; the rest is paged.
+        """
+        self.pool = pool
+        self.cache_size = cache_size
+        self.page_size = page_size
+        self._cache = OrderedDict() # patient_id -> (PatientFile, SOURCE_TABLES versions it was read at)
+        # Bumped by invalidate() (per patient) and clear() (all): a file read before a bump may miss
+        # the commit that caused it, so it is returned but not cached
+        self._generations = {} # patient_id -> int
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    def _current(self, patient_id, versions):
+        """The cached file if it was read at `versions`, else None (a stale one is dropped). Called with the lock held."""
+        entry = self._cache.get(patient_id)
+        if entry is None:
+            return None
+        patient_file, read_at = entry
+        if read_at != versions or None in versions:
+            del self._cache[patient_id]
+            return None
+        self._cache.move_to_end(patient_id)
+        return patient_file
+
+    def cached(self, patient_id):
+        """Returns the cached PatientFile if nothing it was read from changed since, else None (only reads the change counters)."""
+        versions = data_access.read_table_versions(self.pool, SOURCE_TABLES)
+        with self._lock:
+            return self._current(patient_id, versions)
+
+    def _generation(self, patient_id):
+        return self._epoch, self._generations.get(patient_id, 0)
+
+    def get(self, patient_id, reload=False):
+        """
+        Returns the patient's file, from the cache or read in one statement.
+        Args:
+            reload (bool): Read it even if cached, and replace the cached file (e.g. when another
+                           station changed the patient being displayed).
+        """
+        # Read before the file: a change committed while it is read leaves it stale, never the reverse
+        versions = data_access.read_table_versions(self.pool, SOURCE_TABLES)
+        with self._lock:
+            patient_file = None if reload else self._current(patient_id, versions)
+            if patient_file is not None:
+                return patient_file
+            generation = self._generation(patient_id)
+        rows = self.pool.fetchall(queries.PATIENT_FILE, {"patient": patient_id, "limit": self.page_size + 1},
+                                  label="patient_file.load")
+        patient_file = _build_patient_file(patient_id, rows, self.page_size)
+        with self._lock:
+            if self._generation(patient_id) == generation: # Not invalidated while it was being read
+                self._cache[patient_id] = (patient_file, versions)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return patient_file
+
+    def invalidate(self, patient_id):
+        """Drops the patient's cached file. Call after a prescription or administration for them commits."""
+        with self._lock:
+            self._cache.pop(patient_id, None)
+            self._generations[patient_id] = self._generations.get(patient_id, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._generations.clear() # The epoch alone tells every load in progress apart
+            self._epoch += 1
+
+
+def get_patient_file_service(pool=None):
+    """Returns the process-wide PatientFileService for the given pool (default: the shared pool)."""
+    return (pool or data_access.get_pool()).shared("patient_files", PatientFileService)
+
+
+PRESCRIPTION_COLUMNS = (("Vaccine", 160), ("Qty", 40), ("Status", 90), ("Prescribed", 90), ("Doctor", 120))
+HISTORY_COLUMNS = (("Vaccine", 160), ("Qty", 40), ("Administered", 130), ("Center", 150), ("Nurse", 120))
+
+def _prescription_values(row):
+    entry = PrescriptionEntry(*row)
+    return (entry.vaccine, entry.quantity, (entry.status or "").upper(), entry.prescribed_on, f"Dr. {entry.doctor}")
+
+def _history_values(row):
+    entry = AdministrationEntry(*row)
+    return (entry.vaccine, entry.quantity, entry.administered_at, entry.center, f"Nurse {entry.nurse}")
+
+def prescription_table(parent, page, height=6, empty_text="No prescriptions found for this patient."):
+    """VirtualTable for prescription_pager() rows."""
+    return VirtualTable(parent, page, PRESCRIPTION_COLUMNS, format_row=_prescription_values, height=height, empty_text=empty_text)
+
+def history_table(parent, page, height=6, empty_text="No vaccination history found for this patient."):
+    """VirtualTable for history_pager() rows."""
+    return VirtualTable(parent, page, HISTORY_COLUMNS, format_row=_history_values, height=height, empty_text=empty_text)
+
+
+class PatientFileView(Frame):
+    """
+    A patient file on a dashboard: the details above, the prescriptions and the vaccination history
+    below in one paged table each (a tab per list).
+    Args:
+        page (MainPage): Runs the page fetches in the background.
+        height (int): Rows visible in each table.
+    """
+    def __init__(self, parent, page, prescriptions_title="Vaccine Prescriptions", height=6,
+                 header_font=("Arial", 11, "bold")):
+        super().__init__(parent)
+        self.page = page
+        self.patient_file = None # The file shown, None when the view is empty
+
+        self.details_label = ttk.Label(self, font=header_font, foreground="#005b96", anchor=tk.W)
+        self.details_label.pack(fill=tk.X, pady=(0, 5))
+        notebook = ttk.Notebook(self)
+        notebook.pack(fill=tk.BOTH, expand=True)
+        self.prescriptions = prescription_table(notebook, page, height=height)
+        self.history = history_table(notebook, page, height=height)
+        notebook.add(self.prescriptions, text=prescriptions_title)
+        notebook.add(self.history, text="Vaccination History")
+
+    def show(self, patient_file):
+        """
+        Shows a PatientFile. If the same patient is already shown, the loaded rows are refreshed in
+        place instead, keeping the scroll position of both tables.
+        """
+        if patient_file is self.patient_file:
+            return
+        same_patient = self.patient_file is not None and self.patient_file.patient_id == patient_file.patient_id
+        self.patient_file = patient_file
+        if patient_file.familyname is not None:
+            self.details_label.config(text=f"{patient_file.firstname or 'N/A'} {patient_file.familyname or 'N/A'}   |   "
+                                           f"DOB: {patient_file.dateofbirth or 'N/A'}   |   Email: {patient_file.email or 'N/A'}")
+        else:
+            self.details_label.config(text="")
+        if same_patient:
+            self.prescriptions.refresh()
+            self.history.refresh()
+            return
+        pool = self.page.db
+        self.prescriptions.show(prescription_pager(pool, patient_file.patient_id),
+                                patient_file.prescriptions, patient_file.more_prescriptions)
+        self.history.show(history_pager(pool, patient_file.patient_id), patient_file.history, patient_file.more_history)
+
+    def show_error(self, error):
+        self.clear()
+        self.details_label.config(text=f"Error loading patient file: {error}")
+
+    def clear(self):
+        self.patient_file = None
+        self.details_label.config(text="")
+        self.prescriptions.reset()
+        self.history.reset()
+
+    def is_showing(self):
+        return self.patient_file is not None
@@ -0,0 +1,242 @@
+# patient_import.py – Vaccination System
+"""
+Bulk import of patients from a CSV file, e.g. when a practice is onboarded.
+
+The file is streamed: rows are read, validated and inserted in chunks, each chunk in one write
+transaction with one executemany() per table (Person, Patient, Credentials, DoctorPatient), as
+DoctorMainPage.register_new_patient does for a single patient. The emails of a chunk are checked
+against Credentials with one query. Rejected rows are written to a rejects file (the original
+columns plus the line number and the reason), so they can be fixed and imported again; a
+re-import of the whole file is harmless, since already registered emails are rejected.
+
+Expected columns (header row, any order; further columns are ignored):
+    firstname, familyname, dateofbirth (YYYY-MM-DD), email, password
+
+Usage:
+    python patient_import.py patients.csv --doctor 12
+    python patient_import.py patients.csv --doctor 12 --db other.db --rejects rejected.csv
+"""
+import argparse
+import csv
+import datetime
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from collections import namedtuple
+
+import data_access
+import queries
+
+COLUMNS = ("firstname", "familyname", "dateofbirth", "email", "password")
+# Header spellings accepted for the columns (compared lowercase, without spaces and underscores)
+COLUMN_ALIASES = {
+    "firstname": "firstname", "givenname": "firstname",
+    "familyname": "familyname", "lastname": "familyname", "surname": "familyname",
+    "dateofbirth": "dateofbirth", "dob": "dateofbirth", "birthdate": "dateofbirth",
+    "email": "email",
+    "password": "password",
+}
+
+EMAIL_PATTERN = re.compile(r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$") # Same rule as the registration forms
+MIN_PASSWORD_LENGTH = 6
+IMPORT_CHUNK_SIZE = 5000 # Rows per transaction
+
+# imported/rejected: row counts; rejects_path: None if no row was rejected
+ImportResult = namedtuple("ImportResult", ["imported", "rejected", "rejects_path"])
+
+
+def default_rejects_path(csv_path):
+    """patients.csv -> patients.rejects.csv"""
+    root, ext = os.path.splitext(csv_path)
+    return f"{root}.rejects{ext or '.csv'}"
+
+
+def _header_columns(fieldnames):
+    """Maps each expected column to its name in the file's header. Raises ValueError if one is missing."""
+    found = {}
+    for name in fieldnames or ():
+        column = COLUMN_ALIASES.get(re.sub(r"[\s_]", "", name.lower()))
+        if column and column not in found:
+            found[column] = name
+    missing = [column for column in COLUMNS if column not in found]
+    if missing:
+        raise ValueError(f"Missing column(s): {', '.join(missing)}")
+    return found
+
+
+def validate_patient(firstname, familyname, dateofbirth, email, password, today=None):
+    """
+    Checks one patient's fields as the registration form does.
+    Returns:
+        str or None: Why the patient cannot be registered, None if the fields are valid.
+    """
+    if not all([firstname, familyname, dateofbirth, email, password]):
+        return "missing field(s)"
+    if not EMAIL_PATTERN.match(email):
+        return "invalid email"
+    if len(password) < MIN_PASSWORD_LENGTH:
+        return f"password shorter than {MIN_PASSWORD_LENGTH} characters"
+    try:
+        if not re.match(r"^\d{4}-\d{2}-\d{2}$", dateofbirth):
+            raise ValueError
+        born = datetime.date.fromisoformat(dateofbirth)
+    except ValueError:
+        return "invalid date of birth (use YYYY-MM-DD)"
+    if born > (today or datetime.date.today()):
+        return "date of birth in the future"
+    return None
+
+
+def _insert_chunk(cursor, doctor_id, chunk):
+    """
+    One import transaction. `chunk` holds (line, patient fields, raw row) for rows that passed
+    validate_patient(). Returns (imported count, [(line, raw row, reason)] rejected here).
+    """
+    emails = [fields[3] for _, fields, _ in chunk]
+    registered = {row[0] for row in cursor.execute(queries.REGISTERED_EMAILS, (json.dumps(emails),),
+                                                   label="patient_import.registered_emails").fetchall()}
+    rejected = [(line, raw, "email already registered") for line, fields, raw in chunk if fields[3] in registered]
+    accepted = [fields for _, fields, _ in chunk if fields[3] not in registered]
+    if not accepted:
+        return 0, rejected
+
+    # IDs are assigned up front so the four tables can be filled with executemany(); this
+    # transaction holds the write lock, so nobody else can take them meanwhile
+    person_id = cursor.execute(queries.NEXT_PERSON_ID, label="patient_import.next_person_id").fetchone()[0]
+    patient_id = cursor.execute(queries.NEXT_PATIENT_ID, label="patient_import.next_patient_id").fetchone()[0]
+    person_ids = range(person_id, person_id + len(accepted))
+    patient_ids = range(patient_id, patient_id + len(accepted))
+
+    cursor.executemany(queries.IMPORT_PERSON, [(idperson, firstname, familyname, dateofbirth)
+                                               for idperson, (firstname, familyname, dateofbirth, _, _) in zip(person_ids, accepted)],
+                       label="patient_import.person")
+    cursor.executemany(queries.IMPORT_PATIENT, zip(patient_ids, person_ids), label="patient_import.patient")
+    cursor.executemany(queries.IMPORT_CREDENTIALS, [(email, password, idperson)
+                                                    for idperson, (_, _, _, email, password) in zip(person_ids, accepted)],
+                       label="patient_import.credentials")
+    cursor.executemany(queries.IMPORT_DOCTOR_PATIENT, [(doctor_id, idpatient) for idpatient in patient_ids],
+                       label="patient_import.doctor_patient")
+    return len(accepted), rejected
+
+
+def import_patients(csv_path, doctor_id, pool=None, rejects_path=None, chunk_size=IMPORT_CHUNK_SIZE, progress=None,
+                    stop=None):
+    """
+    Imports the patients of a CSV file and assigns them to a doctor.
+    Chunks are committed as they go: if the import stops (e.g. on a database error), the chunks
+    before are kept and the file can simply be imported again.
+    Args:
+        doctor_id (int): Doctor.iddoctor the patients are assigned to.
+        rejects_path (str): Where rejected rows are written (default: default_rejects_path()).
+                            Only created if a row is rejected.
+        progress (callable): Called with (imported, rejected) after each chunk.
+        stop (callable): Checked before each chunk is written; when it returns True the import
+                         ends there, keeping the chunks already committed (e.g. the page was closed).
+    Returns:
+        ImportResult
+    Raises:
+        ValueError: The file lacks a required column.
+        OSError: The file cannot be read, or the rejects file cannot be written.
+        sqlite3.Error: A chunk failed; it was rolled back.
+    """
+    pool = pool or data_access.get_pool()
+    rejects_path = rejects_path or default_rejects_path(csv_path)
+    imported = rejected = 0
+    rejects_file = rejects_writer = None
+    today = datetime.date.today()
+
+    with open(csv_path, newline="", encoding="utf-8-sig") as source: # utf-8-sig: spreadsheet exports start with a BOM
+        reader = csv.DictReader(source)
+        columns = _header_columns(reader.fieldnames)
+
+        def reject(line, raw, reason):
+            nonlocal rejects_file, rejects_writer
+            if rejects_writer is None:
+                rejects_file = open(rejects_path, "w", newline="", encoding="utf-8")
+                rejects_writer = csv.writer(rejects_file)
+                rejects_writer.writerow(list(reader.fieldnames) + ["line", "reason"])
+            rejects_writer.writerow([raw.get(name, "") for name in reader.fieldnames] + [line, reason])
+
+        def flush(chunk):
+            nonlocal imported, rejected
+            if chunk:
+                count, chunk_rejects = pool.write(lambda cursor: _insert_chunk(cursor, doctor_id, chunk),
+                                                  label="patient_import.chunk")
+                imported += count
+                for line, raw, reason in chunk_rejects:
+                    reject(line, raw, reason)
+                rejected += len(chunk_rejects)
+            if progress:
+                progress(imported, rejected)
+
+        try:
+            chunk = []
+            seen_emails = set() # Duplicates within the file: the first occurrence wins
+            stopped = False
+            for raw in reader:
+                line = reader.line_num
+                fields = tuple((raw.get(columns[column]) or "").strip() for column in COLUMNS)
+                reason = validate_patient(*fields, today=today)
+                if reason is None and fields[3] in seen_emails:
+                    reason = "duplicate email in file"
+                if reason is not None:
+                    reject(line, raw, reason)
+                    rejected += 1
+                    continue
+                seen_emails.add(fields[3])
+                chunk.append((line, fields, raw))
+                if len(chunk) >= chunk_size:
+                    if stop is not None and stop():
+                        stopped = True
+                        break
+                    flush(chunk)
+                    chunk = []
+            if not stopped:
+                flush(chunk)
+        finally:
+            if rejects_file is not None:
+                rejects_file.close()
+
+    return ImportResult(imported, rejected, rejects_path if rejects_writer is not None else None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import patients from a CSV file and assign them to a doctor.")
+    parser.add_argument("csv", help="CSV file with the columns " + ", ".join(COLUMNS))
+    parser.add_argument("--doctor", type=int, required=True, help="Doctor.iddoctor the patients are assigned to")
+    parser.add_argument("--db", default=data_access.DB_PATH, help="Database file (default: %(default)s)")
+    parser.add_argument("--rejects", help="Rejects file (default: <csv>.rejects.csv)")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE, help="Rows per transaction (default: %(default)s)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        parser.error(f"Database file '{args.db}' not found. Run database.py first.")
+    pool = data_access.configure_pool(db_path=args.db)
+    try:
+        if not pool.fetchone("SELECT 1 FROM Doctor WHERE iddoctor = ?", (args.doctor,), label="patient_import.doctor"):
+            parser.error(f"No doctor with iddoctor {args.doctor}.")
+
+        started = time.perf_counter()
+        def show_progress(imported, rejected):
+            print(f"\r  {imported:,} imported, {rejected:,} rejected", end="", flush=True)
+        try:
+            result = import_patients(args.csv, args.doctor, pool, rejects_path=args.rejects,
+                                     chunk_size=args.chunk_size, progress=show_progress)
+        except (OSError, ValueError) as e:
+            print(f"\n❌ Cannot import '{args.csv}': {e}")
+            sys.exit(1)
+        except sqlite3.Error as e:
+            print(f"\n❌ Database error, the current chunk was rolled back: {e}")
+            sys.exit(1)
+        print(f"\n✅ {result.imported:,} patient(s) imported in {time.perf_counter() - started:.1f} s.")
+        if result.rejects_path:
+            print(f"⚠️ {result.rejected:,} row(s) rejected, see '{result.rejects_path}'.")
+    finally:
+        pool.close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+# patient_search.py – Vaccination System
+"""
+Type-ahead patient search for the doctor and nurse dashboards.
+
+Instead of loading every patient into a combobox, the pages show a search box. Each keystroke
+(debounced) runs one query against the PersonSearch full-text index (names and date of birth,
+see database.py) and shows the first matches; a number is also tried as a patient ID. Results
+are cached per search text for a short time, so going back and forth while typing does not hit
+the database again.
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import tkinter as tk
+from tkinter import ttk, Frame, Listbox, Scrollbar
+
+import queries
+from list_model import ListboxModel
+
+MIN_QUERY_LENGTH = 2 # Shorter prefixes match too much of the table to be useful
+_WORD = re.compile(r"\w+")
+
+
+def build_match_expression(text):
+    """
+    Turns free text into an FTS5 query: every word must match the start of a name or date part.
+    "smi jo" -> '"smi"* "jo"*'. Returns None when the text has no words.
+    """
+    words = _WORD.findall(text) # \w never contains a double quote, so the words can be quoted as they are
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
+
+def patient_display_name(idpatient, firstname, familyname):
+    """The label the dashboards have always used for a patient."""
+    return f"{familyname}, {firstname} (ID: {idpatient})"
+
+
+class SearchResult:
+    """
+    Matches for one search text.
+    Attributes:
+        patients (list): {'name', 'idpatient', 'idperson', 'dateofbirth'} dicts, sorted by name.
+        truncated (bool): More patients match than were returned; typing more narrows them down.
+        too_short (bool): Nothing was searched because the text is shorter than MIN_QUERY_LENGTH.
+    """
+    def __init__(self, patients, truncated=False, too_short=False):
+        self.patients = patients
+        self.truncated = truncated
+        self.too_short = too_short
+
+
+class PatientSearch:
+    """
+    Runs and caches patient searches. Thread-safe: search() is usually called on a worker thread
+    (see MainPage.run_in_background) while cached() is checked on the Tk thread.
+    """
+    def __init__(self, pool, limit=50, cache_size=256, cache_seconds=30.0):
+        """
+        Args:
+            pool (data_access.ConnectionPool): Where the queries run.
+            limit (int): Maximum number of patients per search.
+            cache_size (int): Number of search texts kept (least recently used are dropped).
+            cache_seconds (float): How long a cached result is trusted; patients registered at
+                                   another workstation show up after at most this long.
+        """
+        self.pool = pool
+        self.limit = limit
+        self.cache_size = cache_size
+        self.cache_seconds = cache_seconds
+        self._cache = OrderedDict() # (normalized text, doctor_id) -> (time stored, SearchResult)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _cache_key(text, doctor_id):
+        return (" ".join(_WORD.findall(text.lower())), doctor_id)
+
+    def cached(self, text, doctor_id=None):
+        """Returns the cached SearchResult for this text, or None."""
+        key = self._cache_key(text, doctor_id)
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] > self.cache_seconds:
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return entry[1]
+
+    def search(self, text, doctor_id=None):
+        """
+        Finds patients whose names or date of birth start with the words in `text`.
+        Args:
+            doctor_id (int): Only search this doctor's patients. With too little text, the doctor's
+                             patients are listed instead (a doctor's list is short enough).
+        Returns:
+            SearchResult
+        """
+        result = self.cached(text, doctor_id)
+        if result is not None:
+            return result
+
+        match = build_match_expression(text)
+        if match is None or len(text.strip()) < MIN_QUERY_LENGTH:
+            if doctor_id is None:
+                return SearchResult([], too_short=True)
+            with self.pool.cursor() as cursor:
+                rows = cursor.execute(queries.DOCTOR_PATIENTS, (doctor_id,), label="patient_search.doctor_patients").fetchmany(self.limit + 1)
+        else:
+            params = {"match": match, "doctor": doctor_id, "limit": self.limit + 1} # One extra row tells whether there are more
+            sql = queries.PATIENT_SEARCH if doctor_id is None else queries.PATIENT_SEARCH_FOR_DOCTOR
+            rows = self.pool.fetchall(sql, params, label="patient_search.match")
+            rows.sort(key=lambda row: (row[2].lower(), row[1].lower(), row[0]))
+            if text.strip().isdigit(): # Also an exact patient ID, shown first
+                by_id = self.pool.fetchone(queries.PATIENT_BY_ID, {"idpatient": int(text.strip()), "doctor": doctor_id}, label="patient_search.by_id")
+                if by_id:
+                    rows = [by_id] + [row for row in rows if row[0] != by_id[0]]
+
+        patients = [{'name': patient_display_name(idpatient, first, last), 'idpatient': idpatient,
+                     'idperson': idperson, 'dateofbirth': dob}
+                    for idpatient, first, last, idperson, dob in rows[:self.limit]]
+        result = SearchResult(patients, truncated=len(rows) > self.limit)
+        self._store(text, doctor_id, result)
+        return result
+
+    def _store(self, text, doctor_id, result):
+        with self._lock:
+            self._cache[self._cache_key(text, doctor_id)] = (time.monotonic(), result)
+            self._cache.move_to_end(self._cache_key(text, doctor_id))
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def invalidate(self):
+        """Drops all cached results, e.g. after a patient was registered."""
+        with self._lock:
+            self._cache.clear()
+
+
+class PatientSearchBox(Frame):
+    """
+    Search entry with a result list, replacing the patient comboboxes.
+    Calls on_select(patient_info) when a patient is picked, or on_select(None) when the selection
+    goes away because the results changed.
+    """
+    def __init__(self, parent, page, on_select, doctor_id=None, search=None, height=6, debounce_ms=150, font=None):
+        """
+        Args:
+            page (MainPage): Runs the searches in the background (run_in_background).
+            doctor_id (int): Restrict the search to this doctor's patients.
+            search (PatientSearch): Shared search service; one is created on the page's pool if omitted.
+            debounce_ms (int): Quiet time after the last keystroke before searching.
+        """
+        super().__init__(parent)
+        self.page = page
+        self.on_select = on_select
+        self.doctor_id = doctor_id
+        self.search = search or PatientSearch(page.db)
+        self.debounce_ms = debounce_ms
+        self.results = []
+        self._pending_after = None
+
+        self.text_var = tk.StringVar(master=self)
+        self.entry = ttk.Entry(self, textvariable=self.text_var, font=font)
+        self.entry.pack(fill=tk.X)
+        self.text_var.trace_add("write", self._on_text_change)
+
+        self.hint_label = ttk.Label(self, foreground="#555555")
+        self.hint_label.pack(anchor=tk.W)
+
+        list_frame = Frame(self)
+        list_frame.pack(fill=tk.BOTH, expand=True)
+        scrollbar = Scrollbar(list_frame, orient=tk.VERTICAL)
+        self.listbox = Listbox(list_frame, yscrollcommand=scrollbar.set, height=height, font=font,
+                               selectbackground="#a6caf0", exportselection=False)
+        scrollbar.config(command=self.listbox.yview)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.listbox.bind("<<ListboxSelect>>", self._on_listbox_select)
+        self.result_list = ListboxModel(self.listbox) # Rows keyed by idpatient
+        self.bind("<Destroy>", self._on_destroy)
+
+        self._run_search()
+
+    def _on_text_change(self, *args):
+        if self._pending_after is not None:
+            self.after_cancel(self._pending_after)
+        self._pending_after = self.after(self.debounce_ms, self._run_search)
+
+    def _run_search(self):
+        self._pending_after = None
+        text = self.text_var.get()
+        result = self.search.cached(text, self.doctor_id)
+        if result is not None: # Cache hit: no database round trip, no background task
+            self.page.cancel_background("patient_search")
+            self._show_result(text, result)
+            return
+        self.page.run_in_background(self.search.search, text, self.doctor_id,
+                                    on_success=lambda result: self._show_result(text, result),
+                                    key="patient_search", busy_text="Searching patients...")
+
+    def _show_result(self, text, result):
+        if text != self.text_var.get(): # The user has typed on since; a newer search is on its way
+            return
+        selected_id = self.selected_patient_id()
+        self.results = result.patients
+        # Typing on or a refresh only inserts and deletes the rows that differ; the selection is kept by idpatient
+        self.result_list.update((patient['idpatient'], f"{patient['name']}  –  born {patient['dateofbirth']}", patient)
+                                for patient in self.results)
+
+        if result.too_short:
+            self.hint_label.config(text=f"Type at least {MIN_QUERY_LENGTH} characters of a name, a date of birth or a patient ID.")
+        elif not self.results:
+            self.hint_label.config(text="No matching patients.")
+        elif result.truncated:
+            self.hint_label.config(text=f"Showing the first {len(self.results)} matches, type more to narrow down.")
+        else:
+            self.hint_label.config(text=f"{len(self.results)} patient(s) found.")
+
+        # The selected patient stays selected if they are still in the results
+        index = self.result_list.index_of(selected_id)
+        if index is not None:
+            self.listbox.see(index)
+        elif selected_id is not None:
+            self.on_select(None)
+
+    def _on_listbox_select(self, event=None):
+        patient = self.result_list.selected_value()
+        if patient:
+            self.on_select(patient)
+
+    def selected_patient_id(self):
+        return self.result_list.selected_key()
+
+    def refresh(self):
+        """Re-runs the current search against fresh data (e.g. after registering a patient)."""
+        self.search.invalidate()
+        self._run_search()
+
+    def _on_destroy(self, event):
+        if event.widget is self and self._pending_after is not None:
+            self.after_cancel(self._pending_after)
+            self._pending_after = None
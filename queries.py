@@ -0,0 +1,419 @@
+# queries.py – Vaccination System
+"""
+SQL for the dashboards' hot paths.
+
+Kept in one place so the pages, the query-plan check in database.py and the benchmarks
+all run exactly the same statements.
+"""
+
+# LoginPortal.login (session.load_session): credentials, person, role-specific ID and the role's
+# starting context in one round trip. Every join is on a unique column, so it is a handful of index lookups whatever the role.
+LOGIN_SESSION = """
+    SELECT c.person_id, c.user_type, p.firstname, p.familyname,
+           CASE c.user_type
+               WHEN 'doctor' THEN d.iddoctor
+               WHEN 'patient' THEN pa.idpatient
+               WHEN 'nurse' THEN n.idnurse
+               WHEN 'center_admin' THEN a.idadmin
+           END AS role_id,
+           vc.idcenter AS center_id, vc.name AS center_name,
+           CASE WHEN d.iddoctor IS NOT NULL
+                THEN (SELECT COUNT(*) FROM DoctorPatient dp WHERE dp.iddoctor = d.iddoctor)
+           END AS patient_count
+    FROM Credentials c
+    JOIN Person p ON c.person_id = p.idperson
+    LEFT JOIN Doctor d ON c.user_type = 'doctor' AND d.idperson = c.person_id
+    LEFT JOIN Patient pa ON c.user_type = 'patient' AND pa.idperson = c.person_id
+    LEFT JOIN Nurse n ON c.user_type = 'nurse' AND n.idperson = c.person_id
+    LEFT JOIN CenterAdmin a ON c.user_type = 'center_admin' AND a.idperson = c.person_id
+    LEFT JOIN VaccinationCenter vc ON vc.admin_id = a.idadmin
+    WHERE c.email = ? AND c.password = ?
+"""
+
+# patient_search.PatientSearch: type-ahead search over the PersonSearch full-text index.
+# No ORDER BY: the first :limit matches are returned as soon as they are found and sorted by the
+# caller. Ranking would have to visit every match, which for a two-letter prefix is a large part
+# of the table.
+PATIENT_SEARCH = """
+    SELECT P.idpatient, Person.firstname, Person.familyname, Person.idperson, Person.dateofbirth
+    FROM PersonSearch s
+    JOIN Patient P ON P.idperson = s.rowid
+    JOIN Person ON Person.idperson = P.idperson
+    WHERE PersonSearch MATCH :match
+    LIMIT :limit
+"""
+
+# Same, restricted to one doctor's patients
+PATIENT_SEARCH_FOR_DOCTOR = """
+    SELECT P.idpatient, Person.firstname, Person.familyname, Person.idperson, Person.dateofbirth
+    FROM PersonSearch s
+    JOIN Patient P ON P.idperson = s.rowid
+    JOIN DoctorPatient DP ON DP.idpatient = P.idpatient AND DP.iddoctor = :doctor
+    JOIN Person ON Person.idperson = P.idperson
+    WHERE PersonSearch MATCH :match
+    LIMIT :limit
+"""
+
+# Search text that is a number is also tried as a patient ID
+PATIENT_BY_ID = """
+    SELECT P.idpatient, Person.firstname, Person.familyname, Person.idperson, Person.dateofbirth
+    FROM Patient P
+    JOIN Person ON Person.idperson = P.idperson
+    WHERE P.idpatient = :idpatient
+      AND (:doctor IS NULL OR EXISTS (SELECT 1 FROM DoctorPatient DP WHERE DP.iddoctor = :doctor AND DP.idpatient = P.idpatient))
+"""
+
+# DoctorMainPage: the doctor's patients before anything is typed into the search box
+DOCTOR_PATIENTS = """
+    SELECT P.idpatient, Person.firstname, Person.familyname, Person.idperson, Person.dateofbirth
+    FROM Patient P
+    JOIN Person ON P.idperson = Person.idperson
+    JOIN DoctorPatient DP ON P.idpatient = DP.idpatient
+    WHERE DP.iddoctor = ?
+    ORDER BY Person.familyname, Person.firstname
+"""
+
+# NurseMainPage.load_pending_prescriptions_for_patient, PatientMainPage._fetch_new_prescriptions
+PENDING_PRESCRIPTIONS = """
+    SELECT pr.id_prescription, m.Med_name, pr.quantity, pr.prescription_date,
+           p_doc.familyname AS doctor_name, m.id AS medicine_id
+    FROM Prescription pr
+    JOIN Medicine m ON pr.id_medicine = m.id
+    JOIN Doctor doc ON pr.iddoctor = doc.iddoctor
+    JOIN Person p_doc ON doc.idperson = p_doc.idperson
+    WHERE pr.idpatient = ? AND pr.status = 'pending'
+    ORDER BY pr.prescription_date DESC
+"""
+
+# The lists of a patient file, read a page at a time (virtual_table.KeysetPager), newest first.
+# The first two columns are the sort key: the *_NEXT_PAGE queries continue after the last row
+# shown (:after_date, :after_id) instead of skipping rows with OFFSET.
+#   prescriptions: prescription_date, id_prescription, vaccine, quantity, status, doctor_name
+#   history: administered_at, AdministrationLog.id, vaccine, quantity, center_name, nurse_name
+_PATIENT_PRESCRIPTIONS = """
+    SELECT pr.prescription_date, pr.id_prescription, m.Med_name, pr.quantity, pr.status, d_person.familyname
+    FROM Prescription pr
+    JOIN Medicine m ON pr.id_medicine = m.id
+    JOIN Doctor doc ON pr.iddoctor = doc.iddoctor
+    JOIN Person d_person ON doc.idperson = d_person.idperson
+    WHERE pr.idpatient = :patient
+"""
+_PATIENT_PRESCRIPTIONS_ORDER = "ORDER BY pr.prescription_date DESC, pr.id_prescription DESC LIMIT :limit"
+
+PATIENT_PRESCRIPTIONS_PAGE = f"{_PATIENT_PRESCRIPTIONS} {_PATIENT_PRESCRIPTIONS_ORDER}"
+PATIENT_PRESCRIPTIONS_NEXT_PAGE = f"""{_PATIENT_PRESCRIPTIONS}
+      AND (pr.prescription_date, pr.id_prescription) < (:after_date, :after_id)
+    {_PATIENT_PRESCRIPTIONS_ORDER}"""
+
+_PATIENT_HISTORY = """
+    SELECT al.administered_at, al.id, m.Med_name, pr.quantity, vc.name, n_person.familyname
+    FROM Prescription pr
+    JOIN AdministrationLog al ON al.prescription_id = pr.id_prescription
+    JOIN Medicine m ON pr.id_medicine = m.id
+    JOIN Nurse n ON al.nurse_id = n.idnurse
+    JOIN Person n_person ON n.idperson = n_person.idperson
+    JOIN VaccinationCenter vc ON al.center_id = vc.idcenter
+    WHERE pr.idpatient = :patient
+"""
+_PATIENT_HISTORY_ORDER = "ORDER BY al.administered_at DESC, al.id DESC LIMIT :limit"
+
+PATIENT_HISTORY_PAGE = f"{_PATIENT_HISTORY} {_PATIENT_HISTORY_ORDER}"
+PATIENT_HISTORY_NEXT_PAGE = f"""{_PATIENT_HISTORY}
+      AND (al.administered_at, al.id) < (:after_date, :after_id)
+    {_PATIENT_HISTORY_ORDER}"""
+
+# patient_file.PatientFileService: the patient's details and the first page of both lists in one
+# statement. Every row starts with its part (0 = details, 1 = prescription, 2 = administration);
+# the details row is: part, NULL, NULL, firstname, familyname, dateofbirth, email.
+PATIENT_FILE = f"""
+    SELECT 0 AS part, NULL AS sort_key, NULL AS row_id, p.firstname, p.familyname, p.dateofbirth, c.email
+    FROM Patient pt
+    JOIN Person p ON p.idperson = pt.idperson
+    LEFT JOIN Credentials c ON p.idperson = c.person_id /* Use LEFT JOIN in case credentials somehow missing */
+    WHERE pt.idpatient = :patient
+    UNION ALL
+    SELECT 1, * FROM ({PATIENT_PRESCRIPTIONS_PAGE})
+    UNION ALL
+    SELECT 2, * FROM ({PATIENT_HISTORY_PAGE})
+    ORDER BY part, sort_key DESC, row_id DESC
+"""
+
+# PatientMainPage._fetch_vaccine_availability
+PENDING_VACCINES_FOR_PATIENT = """
+    SELECT DISTINCT m.id AS vaccine_id, m.Med_name
+    FROM Prescription pr
+    JOIN Medicine m ON pr.id_medicine = m.id
+    WHERE pr.idpatient = ? AND pr.status = 'pending'
+"""
+
+# availability.VaccineAvailability: every center's stock of every vaccine, in one pass
+# (reads all available stock, so it is not in HOT_QUERIES)
+VACCINE_AVAILABILITY = """
+    SELECT cs.vaccine_id, vc.name AS center_name, cs.quantity
+    FROM CenterStock cs
+    JOIN VaccinationCenter vc ON cs.center_id = vc.idcenter
+    WHERE cs.quantity > 0
+    ORDER BY cs.vaccine_id, vc.name
+"""
+
+# NurseMainPage.administer_vaccine (administration.administer), all in one write transaction.
+# Takes one dose from the center with the most stock of the vaccine, by appending an
+# 'administration' movement to the stock ledger (its trigger decrements CenterStock), and only if
+# the prescription is still pending. Choosing the center and taking the dose is one statement
+# under the write lock, so stock can never go negative, and a prescription administered meanwhile
+# at another workstation takes nothing. Returns no row when nothing was allocated.
+ALLOCATE_STOCK = """
+    INSERT INTO StockMovement (center_id, vaccine_id, change, balance_after, kind, reference)
+    SELECT center_id, vaccine_id, -1, quantity - 1, 'administration', :prescription
+    FROM CenterStock
+    WHERE vaccine_id = :vaccine AND quantity > 0
+      AND EXISTS (SELECT 1 FROM Prescription WHERE id_prescription = :prescription AND status = 'pending')
+    ORDER BY quantity DESC -- Pick from center with most stock
+    LIMIT 1
+    RETURNING center_id, balance_after
+"""
+
+# Why ALLOCATE_STOCK allocated nothing: the prescription's status (or no row)
+PRESCRIPTION_STATUS = "SELECT status FROM Prescription WHERE id_prescription = ?"
+
+MARK_PRESCRIPTION_ADMINISTERED = "UPDATE Prescription SET status = 'administered' WHERE id_prescription = ? AND status = 'pending'"
+
+LOG_ADMINISTRATION = """
+    INSERT INTO AdministrationLog (prescription_id, nurse_id, center_id, administered_at)
+    VALUES (?, ?, ?, datetime('now'))
+"""
+
+# cohort.py: a doctor's patients matching a cohort filter. A NULL parameter switches its condition
+# off. Dates are 'YYYY-MM-DD' text, so they compare correctly as strings.
+_COHORT_PATIENTS = """
+    FROM DoctorPatient dp
+    JOIN Patient pa ON pa.idpatient = dp.idpatient
+    JOIN Person p ON p.idperson = pa.idperson
+    WHERE dp.iddoctor = :doctor
+      AND (:born_on_or_before IS NULL OR p.dateofbirth <= :born_on_or_before)
+      AND (:born_after IS NULL OR p.dateofbirth > :born_after)
+      AND (:vaccinated_since IS NULL OR NOT EXISTS (
+            SELECT 1 FROM Prescription pr
+            JOIN AdministrationLog al ON al.prescription_id = pr.id_prescription
+            WHERE pr.idpatient = dp.idpatient AND pr.id_medicine = :vaccine
+              AND al.administered_at >= :vaccinated_since))
+"""
+
+_HAS_PENDING = """EXISTS (SELECT 1 FROM Prescription pr
+                WHERE pr.idpatient = dp.idpatient AND pr.status = 'pending' AND pr.id_medicine = :vaccine)"""
+
+# Preview: patients matching the filter, and how many of them already have a pending prescription
+COHORT_PREVIEW = f"""
+    SELECT count(*), coalesce(sum({_HAS_PENDING}), 0)
+    {_COHORT_PATIENTS}
+"""
+
+# One chunk of the bulk prescription: the next :chunk matching patients (by idpatient, after
+# :after) without a pending prescription of the vaccine. RETURNING drives the next chunk.
+COHORT_PRESCRIBE = f"""
+    INSERT INTO Prescription (idpatient, id_medicine, iddoctor, quantity, status, prescription_date)
+    SELECT dp.idpatient, :vaccine, :doctor, :quantity, 'pending', date('now')
+    {_COHORT_PATIENTS}
+      AND dp.idpatient > :after
+      AND NOT {_HAS_PENDING}
+    ORDER BY dp.idpatient
+    LIMIT :chunk
+    RETURNING idpatient
+"""
+
+# NurseMainPage batch mode: a scanned (or typed) prescription ID
+BATCH_PRESCRIPTION = """
+    SELECT pr.id_prescription, pr.id_medicine, m.Med_name, pr.status, pr.idpatient, p.firstname, p.familyname
+    FROM Prescription pr
+    JOIN Medicine m ON m.id = pr.id_medicine
+    JOIN Patient pa ON pa.idpatient = pr.idpatient
+    JOIN Person p ON p.idperson = pa.idperson
+    WHERE pr.id_prescription = ?
+"""
+
+# patient_import.py: which emails of an import chunk (a JSON array) are already registered
+REGISTERED_EMAILS = "SELECT email FROM Credentials WHERE email IN (SELECT value FROM json_each(?))"
+
+# Next free IDs; AUTOINCREMENT never reuses the IDs of deleted rows, so sqlite_sequence counts too
+NEXT_PERSON_ID = """
+    SELECT max(coalesce((SELECT max(idperson) FROM Person), 0),
+               coalesce((SELECT seq FROM sqlite_sequence WHERE name = 'Person'), 0)) + 1
+"""
+NEXT_PATIENT_ID = """
+    SELECT max(coalesce((SELECT max(idpatient) FROM Patient), 0),
+               coalesce((SELECT seq FROM sqlite_sequence WHERE name = 'Patient'), 0)) + 1
+"""
+
+# One imported patient, the four rows DoctorMainPage.register_new_patient inserts (IDs assigned up front)
+IMPORT_PERSON = "INSERT INTO Person (idperson, firstname, familyname, dateofbirth) VALUES (?, ?, ?, ?)"
+IMPORT_PATIENT = "INSERT INTO Patient (idpatient, idperson) VALUES (?, ?)"
+IMPORT_CREDENTIALS = "INSERT INTO Credentials (email, password, user_type, person_id) VALUES (?, ?, 'patient', ?)"
+IMPORT_DOCTOR_PATIENT = "INSERT INTO DoctorPatient (iddoctor, idpatient) VALUES (?, ?)"
+
+# CenterAdminMainPage._modify_stock
+CENTER_STOCK_ENTRY = "SELECT id, quantity FROM CenterStock WHERE center_id = ? AND vaccine_id = ?"
+
+# stock_ledger.py: appends one movement; the ledger's triggers check it and apply it to CenterStock
+RECORD_STOCK_MOVEMENT = """
+    INSERT INTO StockMovement (center_id, vaccine_id, change, balance_after, kind, reference)
+    VALUES (:center, :vaccine, :change,
+            coalesce((SELECT quantity FROM CenterStock WHERE center_id = :center AND vaccine_id = :vaccine), 0) + :change,
+            :kind, :reference)
+"""
+
+# Balance of one center's vaccine at a point in time: the balance left by its last movement until then
+STOCK_BALANCE_AT = """
+    SELECT balance_after FROM StockMovement
+    WHERE center_id = :center AND vaccine_id = :vaccine AND moved_at <= :at
+    ORDER BY moved_at DESC, id DESC
+    LIMIT 1
+"""
+
+# The last snapshot taken at or before a point in time, and the movement the next one starts from
+STOCK_SNAPSHOT_BEFORE = """
+    SELECT movement_id,
+           coalesce((SELECT min(movement_id) FROM StockSnapshot WHERE movement_id > s.movement_id),
+                    (SELECT max(id) FROM StockMovement)) AS next_movement_id
+    FROM StockSnapshot s
+    WHERE taken_at <= :at
+    ORDER BY taken_at DESC, movement_id DESC
+    LIMIT 1
+"""
+
+STOCK_SNAPSHOT_BALANCES = "SELECT center_id, vaccine_id, quantity FROM StockSnapshotBalance WHERE movement_id = ?"
+
+# Movements after a snapshot (by id, so at most one snapshot interval is read) up to a point in time
+STOCK_MOVEMENTS_AFTER_SNAPSHOT = """
+    SELECT center_id, vaccine_id, sum(change)
+    FROM StockMovement
+    WHERE id > :after AND id <= :until AND moved_at <= :at
+    GROUP BY center_id, vaccine_id
+"""
+
+# CenterAdminMainPage.load_center_stock_overview
+_CENTER_STOCK = """
+    SELECT m.Med_name, cs.quantity, cs.last_updated
+    FROM CenterStock cs
+    JOIN Medicine m ON cs.vaccine_id = m.id
+    WHERE cs.center_id = :center
+"""
+CENTER_STOCK_OVERVIEW = f"{_CENTER_STOCK} ORDER BY m.Med_name LIMIT :limit"
+# Next page of the overview (virtual_table.KeysetPager): Med_name is unique, so it is the sort key
+CENTER_STOCK_OVERVIEW_NEXT_PAGE = f"{_CENTER_STOCK} AND m.Med_name > :after_name ORDER BY m.Med_name LIMIT :limit"
+
+
+# reporting.py: doses administered from :start to :end (days, inclusive), grouped by day, center
+# or vaccine, optionally for one :center and/or one :vaccine. Rows: key, label, administrations, doses.
+# Read from the rollups (database.py, migration 8), never from AdministrationLog: each variant sums
+# the smallest rollup that has the columns it filters and groups by. Totals per center or per
+# vaccine over all of them read whole months from the monthly rollups, from :months_from up to
+# :months_to (excluded), and only the days before and after from the daily ones
+# (see reporting.report_params), so a range of years reads a few thousand rows.
+REPORT_GROUPS = ("day", "center", "vaccine")
+
+_REPORT_GROUP_COLUMNS = {
+    # group -> (rollup column, label), the label looked up once per group
+    "day": ("day", "day"),
+    "center": ("center_id", "coalesce((SELECT name FROM VaccinationCenter WHERE idcenter = center_id), 'Center ' || center_id)"),
+    "vaccine": ("vaccine_id", "coalesce((SELECT Med_name FROM Medicine WHERE id = vaccine_id), 'Vaccine ' || vaccine_id)"),
+}
+
+def _report_query(group_by, center, vaccine):
+    column, label = _REPORT_GROUP_COLUMNS[group_by]
+    order = "day" if group_by == "day" else "4 DESC, 2"
+    if group_by != "day" and not center and not vaccine:
+        rollup = "Center" if group_by == "center" else "Vaccine"
+        return f"""
+    SELECT {column}, {label}, sum(administrations), sum(doses)
+    FROM (SELECT {column}, administrations, doses FROM Daily{rollup}Doses WHERE day >= :start AND day < :months_from AND day <= :end
+          UNION ALL
+          SELECT {column}, administrations, doses FROM Monthly{rollup}Doses WHERE month >= :months_from AND month < :months_to
+          UNION ALL
+          SELECT {column}, administrations, doses FROM Daily{rollup}Doses WHERE day >= :months_to AND day >= :start AND day <= :end)
+    GROUP BY {column}
+    ORDER BY {order}
+"""
+    if center or (vaccine and group_by == "center"):
+        rollup = "DailyDoses" # Per day, center and vaccine
+    else:
+        rollup = "DailyVaccineDoses"
+    filters = (" AND center_id = :center" if center else "") + (" AND vaccine_id = :vaccine" if vaccine else "")
+    return f"""
+    SELECT {column}, {label}, sum(administrations), sum(doses)
+    FROM {rollup}
+    WHERE day BETWEEN :start AND :end{filters}
+    GROUP BY {column}
+    ORDER BY {order}
+"""
+
+# (group, filtered by center, filtered by vaccine) -> sql
+REPORT_QUERIES = {(group_by, center, vaccine): _report_query(group_by, center, vaccine)
+                  for group_by in REPORT_GROUPS for center in (False, True) for vaccine in (False, True)}
+
+# Pending prescriptions and doses per vaccine, largest backlog first (PendingBacklog has one row per vaccine)
+PENDING_BACKLOG = """
+    SELECT PendingBacklog.vaccine_id, coalesce(m.Med_name, 'Vaccine ' || PendingBacklog.vaccine_id), prescriptions, doses
+    FROM PendingBacklog
+    LEFT JOIN Medicine m ON m.id = PendingBacklog.vaccine_id
+    WHERE prescriptions > 0
+    ORDER BY doses DESC, 2
+"""
+
+
+# audit_export.py: one batch of the administration extract, in (administered_at, id) order after
+# the last row written (:after_at, :after_id), up to :end (excluded). LEFT JOINs, so an
+# administration whose prescription, patient or nurse is missing is still exported.
+# Columns: audit_export.COLUMNS
+_AUDIT_EXPORT = """
+    SELECT al.id, al.administered_at, al.center_id, vc.name, al.nurse_id, n_person.firstname, n_person.familyname,
+           pr.idpatient, p.firstname, p.familyname, p.dateofbirth, pr.id_medicine, m.Med_name, pr.quantity,
+           al.prescription_id, pr.prescription_date
+    FROM AdministrationLog al
+    LEFT JOIN Prescription pr ON pr.id_prescription = al.prescription_id
+    LEFT JOIN Patient pt ON pt.idpatient = pr.idpatient
+    LEFT JOIN Person p ON p.idperson = pt.idperson
+    LEFT JOIN Nurse n ON n.idnurse = al.nurse_id
+    LEFT JOIN Person n_person ON n_person.idperson = n.idperson
+    LEFT JOIN VaccinationCenter vc ON vc.idcenter = al.center_id
+    LEFT JOIN Medicine m ON m.id = pr.id_medicine
+    WHERE (al.administered_at, al.id) > (:after_at, :after_id) AND al.administered_at < :end
+"""
+_AUDIT_EXPORT_ORDER = "ORDER BY al.administered_at, al.id LIMIT :batch"
+
+AUDIT_EXPORT = f"{_AUDIT_EXPORT} {_AUDIT_EXPORT_ORDER}"
+AUDIT_EXPORT_FOR_CENTER = f"{_AUDIT_EXPORT} AND al.center_id = :center {_AUDIT_EXPORT_ORDER}"
+
+
+# name -> (sql, sample parameters) for every query that must be served by an index.
+# database.check_query_plans() fails when one of these falls back to a full table scan.
+HOT_QUERIES = {
+    "login_session": (LOGIN_SESSION, ("someone@example.com", "password")),
+    "doctor_patients": (DOCTOR_PATIENTS, (1,)),
+    "patient_search": (PATIENT_SEARCH, {"match": '"smi"*', "limit": 50}),
+    "patient_search_for_doctor": (PATIENT_SEARCH_FOR_DOCTOR, {"match": '"smi"*', "doctor": 1, "limit": 50}),
+    "patient_by_id": (PATIENT_BY_ID, {"idpatient": 1, "doctor": 1}),
+    "pending_prescriptions": (PENDING_PRESCRIPTIONS, (1,)),
+    "patient_file": (PATIENT_FILE, {"patient": 1, "limit": 51}),
+    "patient_prescriptions_next_page": (PATIENT_PRESCRIPTIONS_NEXT_PAGE, {"patient": 1, "after_date": "2025-01-01", "after_id": 1000, "limit": 51}),
+    "patient_history_next_page": (PATIENT_HISTORY_NEXT_PAGE, {"patient": 1, "after_date": "2025-01-01 00:00:00", "after_id": 1000, "limit": 51}),
+    "pending_vaccines_for_patient": (PENDING_VACCINES_FOR_PATIENT, (1,)),
+    "allocate_stock": (ALLOCATE_STOCK, {"vaccine": 1, "prescription": 1}),
+    "batch_prescription": (BATCH_PRESCRIPTION, (1,)),
+    "cohort_preview": (COHORT_PREVIEW, {"doctor": 1, "vaccine": 1, "born_on_or_before": "1960-01-01", "born_after": None, "vaccinated_since": "2024-09-01"}),
+    "cohort_prescribe": (COHORT_PRESCRIBE, {"doctor": 1, "vaccine": 1, "born_on_or_before": "1960-01-01", "born_after": None, "vaccinated_since": "2024-09-01", "quantity": 1, "after": 0, "chunk": 1000}),
+    "registered_emails": (REGISTERED_EMAILS, ('["someone@example.com"]',)),
+    "center_stock_entry": (CENTER_STOCK_ENTRY, (1, 1)),
+    "record_stock_movement": (RECORD_STOCK_MOVEMENT, {"center": 1, "vaccine": 1, "change": 1, "kind": "intake", "reference": None}),
+    "stock_balance_at": (STOCK_BALANCE_AT, {"center": 1, "vaccine": 1, "at": "2025-01-01 00:00:00"}),
+    "stock_snapshot_before": (STOCK_SNAPSHOT_BEFORE, {"at": "2025-01-01 00:00:00"}),
+    "stock_snapshot_balances": (STOCK_SNAPSHOT_BALANCES, (1,)),
+    "stock_movements_after_snapshot": (STOCK_MOVEMENTS_AFTER_SNAPSHOT, {"after": 0, "until": 10000, "at": "2025-01-01 00:00:00"}),
+    "center_stock_overview": (CENTER_STOCK_OVERVIEW, {"center": 1, "limit": 51}),
+    "center_stock_overview_next_page": (CENTER_STOCK_OVERVIEW_NEXT_PAGE, {"center": 1, "after_name": "M", "limit": 51}),
+    "pending_backlog": (PENDING_BACKLOG, ()),
+    "audit_export": (AUDIT_EXPORT, {"after_at": "2024-01-01", "after_id": 0, "end": "2025-01-01", "batch": 10000}),
+    "audit_export_for_center": (AUDIT_EXPORT_FOR_CENTER, {"after_at": "2024-01-01", "after_id": 0, "end": "2025-01-01", "center": 1, "batch": 10000}),
+}
+for (_group_by, _center, _vaccine), _sql in REPORT_QUERIES.items():
+    HOT_QUERIES[f"report_{_group_by}" + ("_center" if _center else "") + ("_vaccine" if _vaccine else "")] = (
+        _sql, {"start": "2015-01-15", "end": "2024-12-15", "months_from": "2015-02-01", "months_to": "2024-12-01", "center": 1, "vaccine": 1})
@@ -0,0 +1,369 @@
+# reporting.py – Vaccination System
+"""
+Vaccination reports: doses administered per day, per center or per vaccine over a range of days,
+and the pending backlog per vaccine.
+
+Reports never aggregate AdministrationLog. Triggers keep daily and monthly rollups current as
+prescriptions are written and administered (database.py, migration 8), and each report sums the
+smallest rollup that answers it (queries.REPORT_QUERIES): totals over years read whole months
+plus the days at both ends, so any range costs a few thousand rows at most.
+
+ReportWindow shows the reports on a dashboard; the same reports are exported from the command line.
+
+Usage:
+    python reporting.py --report center --from 2024-01-01 --to 2024-12-31 --output centers.csv
+    python reporting.py --report day --center 3 --vaccine 2      # This year, to standard output
+    python reporting.py --report backlog
+    python reporting.py --verify                                 # Compare the rollups with AdministrationLog
+    python reporting.py --rebuild                                # Recompute the rollups
+"""
+import argparse
+import calendar
+import csv
+import datetime
+import os
+import sqlite3
+import sys
+from collections import namedtuple
+
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog, Toplevel
+
+import data_access
+import database
+import queries
+from list_model import ComboboxModel
+from vaccine_catalogue import get_vaccine_catalogue
+
+BACKLOG = "backlog" # The report that is not over a range of days
+REPORT_KINDS = queries.REPORT_GROUPS + (BACKLOG,)
+REPORT_TITLES = {
+    "day": "Doses administered per day",
+    "center": "Doses administered per center",
+    "vaccine": "Doses administered per vaccine",
+    BACKLOG: "Pending backlog per vaccine",
+}
+REPORT_HEADERS = {
+    "day": ("Day", "Administrations", "Doses"),
+    "center": ("Center ID", "Center", "Administrations", "Doses"),
+    "vaccine": ("Vaccine ID", "Vaccine", "Administrations", "Doses"),
+    BACKLOG: ("Vaccine ID", "Vaccine", "Pending prescriptions", "Pending doses"),
+}
+
+# kind: one of REPORT_KINDS; start, end: datetime.date, both included (ignored by the backlog);
+# center_id, vaccine_id: optional filters (None: all)
+ReportRequest = namedtuple("ReportRequest", ["kind", "start", "end", "center_id", "vaccine_id"], defaults=[None, None])
+# header: column names; rows: tuples in that order
+Report = namedtuple("Report", ["request", "header", "rows"])
+
+
+def _month_start(day):
+    return day.replace(day=1)
+
+def _next_month_start(day):
+    return day.replace(day=calendar.monthrange(day.year, day.month)[1]) + datetime.timedelta(days=1)
+
+def report_params(start, end, center_id=None, vaccine_id=None):
+    """
+    Named parameters of queries.REPORT_QUERIES for the days `start` to `end` (datetime.date, included).
+    The whole months in the range, from months_from to months_to (excluded), are read from the
+    monthly rollups; when there are none, months_from = months_to = the day after the range.
+    """
+    months_from = start if start.day == 1 else _next_month_start(start)
+    months_to = _next_month_start(end) if end.month != (end + datetime.timedelta(days=1)).month else _month_start(end)
+    if months_from >= months_to:
+        months_from = months_to = end + datetime.timedelta(days=1)
+    return {"start": start.isoformat(), "end": end.isoformat(), "center": center_id, "vaccine": vaccine_id,
+            "months_from": months_from.isoformat(), "months_to": months_to.isoformat()}
+
+
+def run_report(pool, request):
+    """
+    Reads one report from the rollups.
+    Returns:
+        Report
+    Raises:
+        ValueError: Unknown report kind, or a range that ends before it starts.
+    """
+    if request.kind == BACKLOG:
+        rows = pool.fetchall(queries.PENDING_BACKLOG, label="reporting.backlog")
+    elif request.kind in queries.REPORT_GROUPS:
+        if request.end < request.start:
+            raise ValueError("The report range ends before it starts.")
+        sql = queries.REPORT_QUERIES[(request.kind, request.center_id is not None, request.vaccine_id is not None)]
+        rows = pool.fetchall(sql, report_params(request.start, request.end, request.center_id, request.vaccine_id),
+                             label=f"reporting.{request.kind}")
+        if request.kind == "day": # The key is the label
+            rows = [(day, administrations, doses) for day, _, administrations, doses in rows]
+    else:
+        raise ValueError(f"Unknown report '{request.kind}'.")
+    return Report(request, REPORT_HEADERS[request.kind], [tuple(row) for row in rows])
+
+
+def write_csv(report, target):
+    """Writes a Report as CSV, header first, to an open text file."""
+    writer = csv.writer(target)
+    writer.writerow(report.header)
+    writer.writerows(report.rows)
+
+
+def centers(pool):
+    """(idcenter, name) of every vaccination center, by name."""
+    return pool.fetchall("SELECT idcenter, name FROM VaccinationCenter ORDER BY name", label="reporting.centers")
+
+
+def rebuild(pool):
+    """Recomputes every rollup from AdministrationLog and Prescription, in one transaction."""
+    pool.write(lambda cursor: database.run_script(cursor, database.REPORTING_BACKFILL), label="reporting.rebuild")
+
+
+def verify(pool):
+    """
+    Compares the rollups with AdministrationLog and Prescription (reads both whole).
+    Returns:
+        list: (table, key, expected (administrations, doses), stored (administrations, doses)) per mismatch.
+    """
+    mismatches = []
+    with pool.cursor() as cursor: # One connection, so the rollups and the logs are read at the same state
+        cursor.execute("""
+            SELECT date(al.administered_at), al.center_id, pr.id_medicine, count(*), ifnull(sum(pr.quantity), 0)
+            FROM AdministrationLog al
+            JOIN Prescription pr ON pr.id_prescription = al.prescription_id
+            WHERE date(al.administered_at) IS NOT NULL AND al.center_id IS NOT NULL AND pr.id_medicine IS NOT NULL
+            GROUP BY 1, 2, 3
+        """, label="reporting.verify")
+        base = [{"day": day, "month": day[:8] + "01", "center_id": center, "vaccine_id": vaccine,
+                 "counts": (administrations, doses)} for day, center, vaccine, administrations, doses in cursor.fetchall()]
+        for table, keys in database.DOSE_ROLLUPS:
+            expected = {}
+            for row in base:
+                key = tuple(row[column] for column in keys)
+                counts = expected.get(key, (0, 0))
+                expected[key] = (counts[0] + row["counts"][0], counts[1] + row["counts"][1])
+            cursor.execute(f"SELECT {', '.join(keys)}, administrations, doses FROM {table}", label="reporting.verify")
+            stored = {tuple(row[:-2]): tuple(row[-2:]) for row in cursor.fetchall()}
+            for key in expected.keys() | stored.keys():
+                if expected.get(key, (0, 0)) != stored.get(key, (0, 0)): # Rows counted down to zero may stay
+                    mismatches.append((table, key, expected.get(key), stored.get(key)))
+
+        cursor.execute("""
+            SELECT id_medicine, count(*), ifnull(sum(quantity), 0) FROM Prescription
+            WHERE status = 'pending' AND id_medicine IS NOT NULL GROUP BY id_medicine
+        """, label="reporting.verify")
+        expected = {(vaccine,): (prescriptions, doses) for vaccine, prescriptions, doses in cursor.fetchall()}
+        cursor.execute("SELECT vaccine_id, prescriptions, doses FROM PendingBacklog", label="reporting.verify")
+        stored = {(vaccine,): (prescriptions, doses) for vaccine, prescriptions, doses in cursor.fetchall()}
+        for key in expected.keys() | stored.keys():
+            if expected.get(key, (0, 0)) != stored.get(key, (0, 0)):
+                mismatches.append(("PendingBacklog", key, expected.get(key), stored.get(key)))
+    return mismatches
+
+
+class ReportWindow:
+    """
+    Report view opened from a dashboard: choose a report, a range of days and optional filters, run it
+    in the background and export the result as CSV. While the window is open, the report is re-run
+    whenever a prescription or an administration is committed.
+    Args:
+        page (MainPage): The dashboard (background tasks and change notifications).
+        center_id (int): Center preselected as the filter (e.g. the one a center admin manages).
+    """
+    def __init__(self, page, center_id=None):
+        self.page = page
+        self.report = None # The Report shown
+        today = datetime.date.today()
+
+        self.window = Toplevel(page.root)
+        self.window.title("Vaccination Reports")
+        self.window.geometry("720x520")
+        self.window.transient(page.root)
+
+        frame = ttk.Frame(self.window, padding="10")
+        frame.pack(expand=True, fill=tk.BOTH)
+        controls = ttk.Frame(frame)
+        controls.pack(fill=tk.X)
+
+        ttk.Label(controls, text="Report:").grid(row=0, column=0, sticky=tk.W, padx=(0, 5), pady=2)
+        self.kind_combobox = ttk.Combobox(controls, state="readonly", width=32,
+                                          values=[REPORT_TITLES[kind] for kind in REPORT_KINDS])
+        self.kind_combobox.current(0)
+        self.kind_combobox.grid(row=0, column=1, columnspan=3, sticky=tk.W, pady=2)
+
+        ttk.Label(controls, text="From (YYYY-MM-DD):").grid(row=1, column=0, sticky=tk.W, padx=(0, 5), pady=2)
+        self.start_entry = ttk.Entry(controls, width=12)
+        self.start_entry.insert(0, today.replace(month=1, day=1).isoformat())
+        self.start_entry.grid(row=1, column=1, sticky=tk.W, pady=2)
+        ttk.Label(controls, text="To:").grid(row=1, column=2, sticky=tk.W, padx=5, pady=2)
+        self.end_entry = ttk.Entry(controls, width=12)
+        self.end_entry.insert(0, today.isoformat())
+        self.end_entry.grid(row=1, column=3, sticky=tk.W, pady=2)
+
+        ttk.Label(controls, text="Center:").grid(row=2, column=0, sticky=tk.W, padx=(0, 5), pady=2)
+        center_combobox = ttk.Combobox(controls, state="readonly", width=32)
+        center_combobox.grid(row=2, column=1, columnspan=3, sticky=tk.W, pady=2)
+        self.center_choices = ComboboxModel(center_combobox)
+        ttk.Label(controls, text="Vaccine:").grid(row=3, column=0, sticky=tk.W, padx=(0, 5), pady=2)
+        vaccine_combobox = ttk.Combobox(controls, state="readonly", width=32)
+        vaccine_combobox.grid(row=3, column=1, columnspan=3, sticky=tk.W, pady=2)
+        self.vaccine_choices = ComboboxModel(vaccine_combobox)
+        self._load_choices(center_id)
+
+        buttons = ttk.Frame(frame)
+        buttons.pack(fill=tk.X, pady=(8, 5))
+        ttk.Button(buttons, text="Run Report", command=self.run).pack(side=tk.LEFT)
+        ttk.Button(buttons, text="Export CSV...", command=self.export).pack(side=tk.LEFT, padx=5)
+
+        table_frame = ttk.Frame(frame)
+        table_frame.pack(expand=True, fill=tk.BOTH)
+        self.tree = ttk.Treeview(table_frame, show="headings", height=14)
+        scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.config(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, expand=True, fill=tk.BOTH)
+        self.summary_label = ttk.Label(frame, text="", font=("Arial", 10, "bold"))
+        self.summary_label.pack(anchor=tk.W, pady=(5, 0))
+
+        # Keep the report current while the window is open
+        subscription = page.changes.watch(("AdministrationLog", "Prescription"), lambda tables: self.run(quiet=True))
+        def stop_watching(event):
+            if event.widget is self.window: # <Destroy> also fires for each child widget
+                page.changes.unwatch(subscription)
+                page.cancel_background("report")
+        self.window.bind("<Destroy>", stop_watching)
+        self.run()
+
+    def _load_choices(self, center_id):
+        try:
+            center_rows = centers(self.page.db)
+            vaccines = get_vaccine_catalogue(self.page.db).vaccines()
+        except sqlite3.Error as e:
+            messagebox.showerror("Database Error", f"Failed to load centers and vaccines: {e}", parent=self.window)
+            center_rows, vaccines = [], ()
+        # Key None: no filter
+        self.center_choices.update([(None, "All centers", None)] + [(idcenter, name, None) for idcenter, name in center_rows])
+        self.vaccine_choices.update([(None, "All vaccines", None)] + [(vaccine.id, vaccine.name, None) for vaccine in vaccines])
+        self.center_choices.combobox.current(0)
+        self.vaccine_choices.combobox.current(0)
+        if center_id is not None:
+            self.center_choices.select(center_id)
+
+    def _request(self):
+        """The ReportRequest of the controls, or None (after telling the user) if a date is invalid."""
+        try:
+            start = datetime.date.fromisoformat(self.start_entry.get().strip())
+            end = datetime.date.fromisoformat(self.end_entry.get().strip())
+        except ValueError:
+            messagebox.showerror("Input Error", "Dates must be in YYYY-MM-DD format.", parent=self.window)
+            return None
+        if end < start:
+            messagebox.showerror("Input Error", "The 'To' date must not be before the 'From' date.", parent=self.window)
+            return None
+        return ReportRequest(REPORT_KINDS[self.kind_combobox.current()], start, end,
+                             self.center_choices.selected_key(), self.vaccine_choices.selected_key())
+
+    def run(self, quiet=False):
+        """Runs the report chosen in the controls in the background (quiet: on a change notification, no dialogs)."""
+        request = self.report.request if quiet and self.report else self._request()
+        if request is None:
+            return
+        self.page.run_in_background(run_report, self.page.db, request, on_success=self._show,
+                                    on_error=lambda e: self._show_error(e, quiet), key="report",
+                                    busy_text="Running report...")
+
+    def _show(self, report):
+        if not self.window.winfo_exists():
+            return
+        self.report = report
+        column_ids = [f"c{index}" for index in range(len(report.header))]
+        self.tree.delete(*self.tree.get_children())
+        self.tree.config(columns=column_ids)
+        for column_id, heading in zip(column_ids, report.header):
+            numeric = heading not in ("Day", "Center", "Vaccine")
+            self.tree.heading(column_id, text=heading, anchor=tk.E if numeric else tk.W)
+            self.tree.column(column_id, width=110 if numeric else 240, anchor=tk.E if numeric else tk.W, stretch=not numeric)
+        for row in report.rows:
+            self.tree.insert("", tk.END, values=row)
+        request = report.request
+        if request.kind == BACKLOG:
+            self.summary_label.config(text=f"{sum(row[2] for row in report.rows)} pending prescription(s), "
+                                           f"{sum(row[3] for row in report.rows)} dose(s)")
+        else:
+            self.summary_label.config(text=f"{REPORT_TITLES[request.kind]}, {request.start} to {request.end}: "
+                                           f"{sum(row[-1] for row in report.rows)} dose(s) in "
+                                           f"{sum(row[-2] for row in report.rows)} administration(s)")
+
+    def _show_error(self, error, quiet):
+        if not self.window.winfo_exists():
+            return
+        self.summary_label.config(text=f"Error running report: {error}")
+        if not quiet:
+            messagebox.showerror("Report Error", f"Could not run the report: {error}", parent=self.window)
+
+    def export(self):
+        """Saves the report shown as a CSV file."""
+        if self.report is None:
+            messagebox.showinfo("Info", "Run a report first.", parent=self.window)
+            return
+        path = filedialog.asksaveasfilename(parent=self.window, title="Export Report", defaultextension=".csv",
+                                            initialfile=f"{self.report.request.kind}_report.csv",
+                                            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")])
+        if not path:
+            return
+        try:
+            with open(path, "w", newline="", encoding="utf-8") as target:
+                write_csv(self.report, target)
+        except OSError as e:
+            messagebox.showerror("Export Error", f"Cannot write '{os.path.basename(path)}': {e}", parent=self.window)
+            return
+        messagebox.showinfo("Report Exported", f"{len(self.report.rows)} row(s) written to:\n{path}", parent=self.window)
+
+
+def main():
+    today = datetime.date.today()
+    parser = argparse.ArgumentParser(description="Vaccination reports from the daily rollups.")
+    parser.add_argument("--db", default=data_access.DB_PATH, help="Database file (default: %(default)s)")
+    parser.add_argument("--report", choices=REPORT_KINDS, help="Report to export as CSV")
+    parser.add_argument("--from", dest="start", type=datetime.date.fromisoformat, default=today.replace(month=1, day=1),
+                        metavar="YYYY-MM-DD", help="First day (default: January 1st of this year)")
+    parser.add_argument("--to", dest="end", type=datetime.date.fromisoformat, default=today,
+                        metavar="YYYY-MM-DD", help="Last day, included (default: today)")
+    parser.add_argument("--center", type=int, help="Only this center (VaccinationCenter.idcenter)")
+    parser.add_argument("--vaccine", type=int, help="Only this vaccine (Medicine.id)")
+    parser.add_argument("--output", help="CSV file to write (default: standard output)")
+    parser.add_argument("--verify", action="store_true", help="Check the rollups against AdministrationLog and Prescription")
+    parser.add_argument("--rebuild", action="store_true", help="Recompute the rollups")
+    args = parser.parse_args()
+    if not (args.report or args.verify or args.rebuild):
+        parser.error("Nothing to do: give --report, --verify or --rebuild.")
+
+    if not os.path.exists(args.db):
+        parser.error(f"Database file '{args.db}' not found. Run database.py first.")
+    pool = data_access.configure_pool(db_path=args.db)
+    try:
+        if args.rebuild:
+            rebuild(pool)
+            print("✅ Reporting rollups rebuilt.", file=sys.stderr)
+        if args.report:
+            try:
+                report = run_report(pool, ReportRequest(args.report, args.start, args.end, args.center, args.vaccine))
+            except ValueError as e:
+                parser.error(str(e))
+            if args.output:
+                with open(args.output, "w", newline="", encoding="utf-8") as target:
+                    write_csv(report, target)
+                print(f"✅ {len(report.rows)} row(s) written to {args.output}.", file=sys.stderr)
+            else:
+                write_csv(report, sys.stdout)
+        if args.verify:
+            mismatches = verify(pool)
+            for table, key, expected, stored in mismatches:
+                print(f"❌ {table} {key}: expected {expected}, stored {stored}")
+            if mismatches:
+                sys.exit(1)
+            print("✅ The reporting rollups match the logs.")
+    finally:
+        pool.close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# session.py – Vaccination System
+"""
+The logged-in user's session.
+
+load_session() checks the credentials and, in the same query (queries.LOGIN_SESSION), reads
+everything a dashboard needs before it can show anything: the person, the role-specific ID
+(iddoctor, idpatient, ...) and the role's starting context. The Session is then handed to the
+dashboard, so opening it does not go back to the database for the same facts.
+"""
+import data_access
+import queries
+
+
+class Session:
+    """
+    Attributes:
+        person_id (int): Person.idperson of the user.
+        user_type (str): 'doctor', 'patient', 'nurse' or 'center_admin'.
+        firstname, familyname (str)
+        role_id (int): iddoctor / idpatient / idnurse / idadmin, or None if the role row is missing.
+        center_id, center_name: The center managed by a center admin (None otherwise, or if not assigned yet).
+        patient_count (int): Number of patients of a doctor (None for other roles).
+    """
+    def __init__(self, person_id, user_type, firstname, familyname, role_id,
+                 center_id=None, center_name=None, patient_count=None):
+        self.person_id = person_id
+        self.user_type = user_type
+        self.firstname = firstname
+        self.familyname = familyname
+        self.role_id = role_id
+        self.center_id = center_id
+        self.center_name = center_name
+        self.patient_count = patient_count
+
+    def __repr__(self):
+        return f"Session({self.user_type} person_id={self.person_id} role_id={self.role_id})"
+
+
+def load_session(email, password, pool=None):
+    """
+    Authenticates the user and loads their session in one query.
+    Returns:
+        Session or None: None if the email and password do not match.
+    Raises:
+        sqlite3.Error
+    """
+    pool = pool or data_access.get_pool()
+    row = pool.fetchone(queries.LOGIN_SESSION, (email, password), label="login.session")
+    return Session(*row) if row else None
@@ -0,0 +1,139 @@
+# stock_intake.py – Vaccination System
+"""
+Stock intake from a delivery manifest: every line of the delivery is added to a center's stock at
+once, instead of one vaccine at a time.
+
+read_manifest() parses the file and checks every vaccine name against the vaccine catalogue;
+receive() then appends all lines to the stock ledger as 'intake' movements with one
+executemany() in a single transaction (the ledger's trigger upserts each into CenterStock), so a
+delivery is either taken in completely or not at all.
+
+Manifest: a CSV file with a vaccine name and a number of doses per line, e.g.
+    vaccine,quantity
+    Influenza Vaccine (Flu Shot),400
+    Hepatitis B Vaccine,120
+The header row is optional. A vaccine listed twice is received twice.
+
+Usage:
+    python stock_intake.py delivery.csv --center 3
+    python stock_intake.py delivery.csv --center 3 --db other.db --dry-run
+"""
+import argparse
+import csv
+import os
+import sqlite3
+import sys
+from collections import namedtuple
+
+import data_access
+import stock_ledger
+from vaccine_catalogue import get_vaccine_catalogue
+
+# Header spellings of the two columns (lowercase); without a header, the vaccine comes first
+VACCINE_HEADERS = ("vaccine", "name", "med_name", "medicine")
+QUANTITY_HEADERS = ("quantity", "qty", "doses")
+
+# vaccine: vaccine_catalogue.Vaccine; line: line number in the file
+ManifestLine = namedtuple("ManifestLine", ["line", "vaccine", "quantity"])
+ManifestError = namedtuple("ManifestError", ["line", "text", "reason"])
+# lines: the valid lines; errors: why the other lines cannot be received
+Manifest = namedtuple("Manifest", ["lines", "errors"])
+
+
+def read_manifest(path, catalogue=None):
+    """
+    Parses and validates a delivery manifest. Vaccine names are matched exactly, then ignoring case.
+    Returns:
+        Manifest
+    Raises:
+        OSError: The file cannot be read.
+    """
+    catalogue = catalogue or get_vaccine_catalogue()
+    by_folded_name = {vaccine.name.casefold(): vaccine for vaccine in catalogue.vaccines()}
+    lines, errors = [], []
+    with open(path, newline="", encoding="utf-8-sig") as source: # utf-8-sig: spreadsheet exports start with a BOM
+        reader = csv.reader(source)
+        vaccine_column, quantity_column = 0, 1
+        for row in reader:
+            line = reader.line_num
+            cells = [cell.strip() for cell in row]
+            if not any(cells):
+                continue
+            headers = [cell.lower() for cell in cells]
+            if line == 1 and any(header in VACCINE_HEADERS for header in headers):
+                vaccine_column = next(i for i, header in enumerate(headers) if header in VACCINE_HEADERS)
+                quantity_column = next((i for i, header in enumerate(headers) if header in QUANTITY_HEADERS), None)
+                if quantity_column is None:
+                    errors.append(ManifestError(line, ",".join(row), "no quantity column"))
+                    break
+                continue
+
+            text = ",".join(row)
+            if len(cells) <= max(vaccine_column, quantity_column):
+                errors.append(ManifestError(line, text, "expected a vaccine and a quantity"))
+                continue
+            name, quantity = cells[vaccine_column], cells[quantity_column]
+            vaccine = catalogue.find_by_name(name) or by_folded_name.get(name.casefold())
+            if vaccine is None:
+                errors.append(ManifestError(line, text, f"unknown vaccine '{name}'"))
+                continue
+            if not quantity.isdigit() or int(quantity) <= 0:
+                errors.append(ManifestError(line, text, f"invalid quantity '{quantity}'"))
+                continue
+            lines.append(ManifestLine(line, vaccine, int(quantity)))
+    return Manifest(lines, errors)
+
+
+def receive(pool, center_id, lines):
+    """
+    Adds the manifest lines to the center's stock in one transaction.
+    Returns:
+        int: Doses received.
+    Raises:
+        sqlite3.Error: Nothing was received.
+    """
+    movements = [(center_id, line.vaccine.id, line.quantity) for line in lines]
+    pool.write(lambda cursor: stock_ledger.record_movements(cursor, movements, stock_ledger.INTAKE),
+               label="stock_intake.receive")
+    return sum(line.quantity for line in lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Add a delivery manifest to a vaccination center's stock.")
+    parser.add_argument("manifest", help="CSV file with a vaccine name and a quantity per line")
+    parser.add_argument("--center", type=int, required=True, help="VaccinationCenter.idcenter receiving the delivery")
+    parser.add_argument("--db", default=data_access.DB_PATH, help="Database file (default: %(default)s)")
+    parser.add_argument("--dry-run", action="store_true", help="Only validate the manifest")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        parser.error(f"Database file '{args.db}' not found. Run database.py first.")
+    pool = data_access.configure_pool(db_path=args.db)
+    try:
+        if not pool.fetchone("SELECT 1 FROM VaccinationCenter WHERE idcenter = ?", (args.center,), label="stock_intake.center"):
+            parser.error(f"No vaccination center with idcenter {args.center}.")
+        try:
+            manifest = read_manifest(args.manifest, get_vaccine_catalogue(pool))
+        except OSError as e:
+            print(f"❌ Cannot read '{args.manifest}': {e}")
+            sys.exit(1)
+        for error in manifest.errors:
+            print(f"  line {error.line}: {error.reason}  ({error.text})")
+        if manifest.errors:
+            print(f"❌ {len(manifest.errors)} invalid line(s); nothing was received.")
+            sys.exit(1)
+        if args.dry_run:
+            print(f"✅ {len(manifest.lines)} line(s), {sum(line.quantity for line in manifest.lines)} dose(s) valid.")
+            return
+        try:
+            doses = receive(pool, args.center, manifest.lines)
+        except sqlite3.Error as e:
+            print(f"❌ Database error, nothing was received: {e}")
+            sys.exit(1)
+        print(f"✅ {len(manifest.lines)} line(s), {doses} dose(s) received.")
+    finally:
+        pool.close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+# stock_ledger.py – Vaccination System
+"""
+The stock ledger: every change to a center's stock is a movement appended to StockMovement
+(intake, removal, administration, transfer), never an in-place overwrite.
+
+CenterStock remains the current balance. The ledger's triggers (database.py, migration 6) check
+each movement against it and apply it, so recording a movement is one INSERT plus one indexed
+update, and reading a balance is one CenterStock row, however long the ledger grows. Each movement
+stores the balance it left (balance_after), and every database.STOCK_SNAPSHOT_INTERVAL movements
+all balances are copied into a snapshot: the stock at any past time is the last snapshot before
+it plus the few movements since, never a replay of the whole ledger.
+
+Usage:
+    python stock_ledger.py --verify                        # Compare CenterStock with the ledger
+    python stock_ledger.py --balances-at "2025-01-01 00:00:00" --center 3
+"""
+import argparse
+import os
+import sys
+
+import data_access
+import queries
+
+# StockMovement.kind
+OPENING = "opening" # Balance found when the ledger was introduced
+INTAKE = "intake"
+REMOVAL = "removal"
+ADMINISTRATION = "administration" # Written by administration.py (queries.ALLOCATE_STOCK)
+TRANSFER = "transfer" # Between two centers; `reference` is the other center
+
+
+def record_movement(cursor, center_id, vaccine_id, change, kind, reference=None):
+    """
+    Appends one movement inside a write transaction; CenterStock follows automatically.
+    Raises:
+        sqlite3.IntegrityError: The movement would make the stock negative (nothing was recorded).
+    """
+    cursor.execute(queries.RECORD_STOCK_MOVEMENT, {"center": center_id, "vaccine": vaccine_id, "change": change,
+                                                   "kind": kind, "reference": reference},
+                   label=f"stock_ledger.{kind}")
+
+def record_movements(cursor, movements, kind):
+    """Appends many movements of one kind with executemany(). `movements`: (center_id, vaccine_id, change) tuples."""
+    cursor.executemany(queries.RECORD_STOCK_MOVEMENT,
+                       [{"center": center_id, "vaccine": vaccine_id, "change": change, "kind": kind, "reference": None}
+                        for center_id, vaccine_id, change in movements],
+                       label=f"stock_ledger.{kind}")
+
+
+def transfer(pool, vaccine_id, from_center_id, to_center_id, quantity):
+    """
+    Moves doses from one center to another in one transaction.
+    Raises:
+        sqlite3.IntegrityError: Not enough stock at the sending center (nothing was moved).
+    """
+    def move(cursor):
+        record_movement(cursor, from_center_id, vaccine_id, -quantity, TRANSFER, reference=to_center_id)
+        record_movement(cursor, to_center_id, vaccine_id, quantity, TRANSFER, reference=from_center_id)
+    pool.write(move, label="stock_ledger.transfer")
+
+
+def take_snapshot(pool):
+    """
+    Snapshots all balances now, in addition to the periodic ones (e.g. at the end of a day).
+    Returns:
+        int or None: The last movement included, None if the ledger is empty.
+    """
+    def snapshot(cursor):
+        movement_id = cursor.execute("SELECT max(id) FROM StockMovement", label="stock_ledger.snapshot").fetchone()[0]
+        if movement_id is None:
+            return None
+        cursor.execute("INSERT OR IGNORE INTO StockSnapshot (movement_id, taken_at) VALUES (?, datetime('now'))",
+                       (movement_id,), label="stock_ledger.snapshot")
+        cursor.execute("""INSERT OR IGNORE INTO StockSnapshotBalance (movement_id, center_id, vaccine_id, quantity)
+                          SELECT ?, center_id, vaccine_id, quantity FROM CenterStock""",
+                       (movement_id,), label="stock_ledger.snapshot")
+        return movement_id
+    return pool.write(snapshot, label="stock_ledger.snapshot")
+
+
+def balance_at(pool, center_id, vaccine_id, at):
+    """Stock of one vaccine at one center at `at` ('YYYY-MM-DD HH:MM:SS', UTC like datetime('now'))."""
+    row = pool.fetchone(queries.STOCK_BALANCE_AT, {"center": center_id, "vaccine": vaccine_id, "at": at},
+                        label="stock_ledger.balance_at")
+    return row[0] if row else 0
+
+
+def balances_at(pool, at, center_id=None):
+    """
+    All stock balances at `at`, rebuilt from the last snapshot before it.
+    Returns:
+        dict: (center_id, vaccine_id) -> quantity, for every pair with movements by then.
+    """
+    with pool.cursor() as cursor: # One connection, so all reads see the same ledger
+        snapshot = cursor.execute(queries.STOCK_SNAPSHOT_BEFORE, {"at": at}, label="stock_ledger.snapshot_before").fetchone()
+        balances = {}
+        if snapshot is None: # Before the first snapshot: replay from the start of the ledger
+            after, until = 0, cursor.execute("SELECT coalesce(min(movement_id), (SELECT max(id) FROM StockMovement), 0) FROM StockSnapshot",
+                                             label="stock_ledger.first_snapshot").fetchone()[0]
+        else:
+            after, until = snapshot
+            cursor.execute(queries.STOCK_SNAPSHOT_BALANCES, (after,), label="stock_ledger.snapshot_balances")
+            balances = {(center, vaccine): quantity for center, vaccine, quantity in cursor.fetchall()}
+        cursor.execute(queries.STOCK_MOVEMENTS_AFTER_SNAPSHOT, {"after": after, "until": until, "at": at},
+                       label="stock_ledger.movements_after_snapshot")
+        for center, vaccine, change in cursor.fetchall():
+            balances[(center, vaccine)] = balances.get((center, vaccine), 0) + change
+    if center_id is not None:
+        balances = {key: quantity for key, quantity in balances.items() if key[0] == center_id}
+    return balances
+
+
+def verify(pool):
+    """
+    Compares every CenterStock balance with the sum of its movements (reads the whole ledger).
+    Returns:
+        list: (center_id, vaccine_id, CenterStock quantity, ledger sum) for every mismatch.
+    """
+    return pool.fetchall("""
+        SELECT center_id, vaccine_id, quantity, total
+        FROM (SELECT center_id, vaccine_id, quantity,
+                     (SELECT coalesce(sum(change), 0) FROM StockMovement m
+                      WHERE m.center_id = cs.center_id AND m.vaccine_id = cs.vaccine_id) AS total
+              FROM CenterStock cs)
+        WHERE coalesce(quantity, 0) != total
+        UNION ALL -- Movements of pairs that have no CenterStock row
+        SELECT center_id, vaccine_id, NULL, sum(change)
+        FROM StockMovement m
+        WHERE NOT EXISTS (SELECT 1 FROM CenterStock cs WHERE cs.center_id = m.center_id AND cs.vaccine_id = m.vaccine_id)
+        GROUP BY center_id, vaccine_id
+    """, label="stock_ledger.verify")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect the stock ledger.")
+    parser.add_argument("--db", default=data_access.DB_PATH, help="Database file (default: %(default)s)")
+    parser.add_argument("--verify", action="store_true", help="Check that CenterStock matches the ledger")
+    parser.add_argument("--balances-at", metavar="TIME", help="Print the balances at TIME ('YYYY-MM-DD HH:MM:SS', UTC)")
+    parser.add_argument("--center", type=int, help="Only this center (with --balances-at)")
+    parser.add_argument("--snapshot", action="store_true", help="Take a snapshot of the current balances")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        parser.error(f"Database file '{args.db}' not found. Run database.py first.")
+    pool = data_access.configure_pool(db_path=args.db)
+    try:
+        if args.snapshot:
+            print(f"✅ Snapshot up to movement {take_snapshot(pool)}.")
+        if args.balances_at:
+            for (center, vaccine), quantity in sorted(balances_at(pool, args.balances_at, args.center).items()):
+                print(f"  center {center:>5}  vaccine {vaccine:>4}  {quantity:>8}")
+        if args.verify:
+            mismatches = verify(pool)
+            for center, vaccine, quantity, total in mismatches:
+                print(f"❌ center {center}, vaccine {vaccine}: CenterStock {quantity}, ledger {total}")
+            if mismatches:
+                sys.exit(1)
+            print("✅ CenterStock matches the ledger.")
+    finally:
+        pool.close_all()
+
+
+if __name__ == "__main__":
+    main()
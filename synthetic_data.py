@@ -0,0 +1,278 @@
+# synthetic_data.py – Vaccination System
+"""
+Builds a large, deterministic synthetic database for load and benchmark testing.
+
+The data follows the real schema (it is created by the migrations in database.py): persons with
+doctor/nurse/admin/patient roles and credentials, a skewed doctor-patient fan-out, vaccination
+centers with stock, and prescriptions with their administration log. The same --seed always
+produces the same database.
+
+To load quickly, only the base tables are created first and filled with executemany() in large
+chunks on a connection with journaling and fsync disabled; the remaining migrations (indexes and
+derived tables) are applied afterwards, so they are built in one pass over the finished data.
+
+Usage:
+    python synthetic_data.py --db bench.db --patients 1000000 --prescriptions 10000000
+"""
+import argparse
+import bisect
+import datetime
+import itertools
+import os
+import random
+import sqlite3
+import time
+from array import array
+
+import database
+
+FIRST_NAMES = ["James", "Mary", "John", "Patricia", "Robert", "Jennifer", "Michael", "Linda", "William", "Elizabeth",
+               "David", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah", "Charles", "Karen",
+               "Daniel", "Nancy", "Matthew", "Lisa", "Anthony", "Betty", "Mark", "Margaret", "Paul", "Sandra",
+               "Laura", "Emma", "Lucas", "Sofia", "Noah", "Mia", "Liam", "Chloe", "Hugo", "Lea"]
+FAMILY_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+                "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin",
+                "Lee", "Perez", "Thompson", "White", "Harris", "Sanchez", "Clark", "Ramirez", "Lewis", "Robinson",
+                "Walker", "Young", "Allen", "King", "Wright", "Scott", "Torres", "Nguyen", "Hill", "Flores",
+                "Dubois", "Bernard", "Petit", "Durand", "Leroy", "Moreau", "Simon", "Laurent", "Lefebvre", "Michel"]
+VACCINES = ["COVID-19 Vaccine (Pfizer)", "COVID-19 Vaccine (Moderna)", "Influenza Vaccine (Flu Shot)",
+            "Hepatitis A Vaccine", "Hepatitis B Vaccine", "MMR Vaccine (Measles, Mumps, Rubella)",
+            "Tetanus-Diphtheria (Td)", "Tdap Vaccine", "Polio Vaccine (IPV)", "HPV Vaccine",
+            "Pneumococcal Vaccine (PCV20)", "Meningococcal Vaccine (MenACWY)", "Meningococcal B Vaccine",
+            "Varicella Vaccine (Chickenpox)", "Shingles Vaccine (Recombinant)", "Rotavirus Vaccine",
+            "Hib Vaccine", "Yellow Fever Vaccine", "Typhoid Vaccine", "Rabies Vaccine",
+            "Japanese Encephalitis Vaccine", "Tick-Borne Encephalitis Vaccine", "BCG Vaccine", "RSV Vaccine"]
+
+# Share of prescriptions per status
+STATUS_WEIGHTS = (("administered", 0.85), ("pending", 0.12), ("cancelled", 0.03))
+
+# Pragmas for the bulk load: no rollback journal, no fsync, one big exclusive transaction.
+# A crash during generation leaves a corrupt file, which is acceptable for throw-away test data.
+BULK_LOAD_PRAGMAS = {
+    "journal_mode": "OFF",
+    "synchronous": "OFF",
+    "locking_mode": "EXCLUSIVE",
+    "cache_size": -512000, # ~512 MB
+    "temp_store": "MEMORY",
+}
+
+CHUNK_SIZE = 50000
+
+
+def _chunks(rows, size=CHUNK_SIZE):
+    """Groups an iterator of rows into lists for executemany()."""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class SyntheticDataGenerator:
+    """
+    Generates the synthetic rows. All ids are assigned explicitly, so related rows can be
+    generated without reading anything back from the database.
+    """
+    def __init__(self, conn, seed=42, patients=100000, doctors=500, nurses=300, centers=100,
+                 prescriptions=1000000, years=10, verbose=True):
+        self.conn = conn
+        self.rng = random.Random(seed)
+        self.n_patients = patients
+        self.n_doctors = doctors
+        self.n_nurses = nurses
+        self.n_admins = centers # One administrator per center
+        self.n_centers = centers
+        self.n_prescriptions = prescriptions
+        self.verbose = verbose
+
+        today = datetime.date(2025, 1, 1) # Fixed, so the output does not depend on the day it is generated
+        self.days = [(today - datetime.timedelta(days=offset)).isoformat() for offset in range(years * 365, 0, -1)]
+        self.primary_doctor = array('I') # patient index -> iddoctor
+
+    def _log(self, text):
+        if self.verbose:
+            print(text, flush=True)
+
+    def _insert(self, label, sql, rows):
+        started = time.perf_counter()
+        count = 0
+        for chunk in _chunks(rows):
+            self.conn.executemany(sql, chunk)
+            count += len(chunk)
+        elapsed = time.perf_counter() - started
+        self._log(f"  {label:<20} {count:>11,} rows  {elapsed:7.1f} s  ({count / elapsed if elapsed else 0:,.0f} rows/s)")
+        return count
+
+    def _birth_date(self, min_age, max_age):
+        year = 2025 - self.rng.randint(min_age, max_age)
+        return f"{year:04d}-{self.rng.randint(1, 12):02d}-{self.rng.randint(1, 28):02d}"
+
+    def _person_rows(self):
+        """Staff first (doctors, nurses, admins), then patients; idperson is 1-based in that order."""
+        rng = self.rng
+        staff = self.n_doctors + self.n_nurses + self.n_admins
+        for idperson in range(1, staff + self.n_patients + 1):
+            ages = (25, 67) if idperson <= staff else (0, 95)
+            yield (idperson, rng.choice(FIRST_NAMES), rng.choice(FAMILY_NAMES), self._birth_date(*ages))
+
+    def _credential_rows(self):
+        ranges = (("doctor", self.n_doctors), ("nurse", self.n_nurses),
+                  ("center_admin", self.n_admins), ("patient", self.n_patients))
+        idperson = 0
+        for user_type, count in ranges:
+            for number in range(1, count + 1):
+                idperson += 1
+                yield (f"{user_type}{number}@example.com", "password123", user_type, idperson)
+
+    def _doctor_patient_rows(self):
+        """Every patient gets a primary doctor (popularity is skewed) and 20% get a second one."""
+        rng = self.rng
+        for idpatient in range(1, self.n_patients + 1):
+            primary = int(self.n_doctors * rng.random() ** 2) + 1 # Squared: a few doctors have many patients
+            self.primary_doctor.append(primary)
+            yield (primary, idpatient)
+            if self.n_doctors > 1 and rng.random() < 0.2:
+                second = rng.randint(1, self.n_doctors)
+                if second != primary:
+                    yield (second, idpatient)
+
+    def _center_rows(self):
+        for idcenter in range(1, self.n_centers + 1):
+            yield (idcenter, f"Vaccination Center {idcenter:04d}", f"{idcenter} Health Street, District {idcenter % 50 + 1}", idcenter)
+
+    def _stock_rows(self):
+        rng = self.rng
+        for idcenter in range(1, self.n_centers + 1):
+            for vaccine_id in range(1, len(VACCINES) + 1):
+                if rng.random() < 0.6:
+                    yield (idcenter, vaccine_id, rng.choice((0, rng.randint(1, 5000))), self.days[-1] + " 08:00:00")
+
+    def _prescription_and_log_rows(self, administration_log):
+        """Yields prescriptions in date order and appends the matching AdministrationLog rows to the given list."""
+        # random() and bisect instead of randint()/choices(): this loop runs tens of millions of times
+        rnd = self.rng.random
+        n_days = len(self.days)
+        n_patients, n_nurses, n_centers = self.n_patients, self.n_nurses, self.n_centers
+        statuses = [status for status, _ in STATUS_WEIGHTS]
+        status_cumulative = list(itertools.accumulate(weight for _, weight in STATUS_WEIGHTS))
+        vaccine_cumulative = list(itertools.accumulate(1.0 / rank for rank in range(1, len(VACCINES) + 1))) # A few vaccines dominate
+        vaccine_total = vaccine_cumulative[-1]
+        recent = n_days - 60
+        for id_prescription in range(1, self.n_prescriptions + 1):
+            idpatient = int(rnd() * n_patients) + 1
+            day_index = id_prescription * n_days // (self.n_prescriptions + 1)
+            # Old prescriptions are almost always settled, recent ones are more often pending
+            if day_index > recent:
+                status = statuses[bisect.bisect(status_cumulative, rnd() * status_cumulative[-1])]
+            else:
+                status = "administered" if rnd() < 0.97 else "cancelled"
+            yield (id_prescription, idpatient, bisect.bisect(vaccine_cumulative, rnd() * vaccine_total) + 1,
+                   self.primary_doctor[idpatient - 1], 1, status, self.days[day_index])
+            if status == "administered":
+                administered_day = self.days[min(n_days - 1, day_index + int(rnd() * 31))]
+                administration_log.append((id_prescription, int(rnd() * n_nurses) + 1, int(rnd() * n_centers) + 1,
+                                           f"{administered_day} {8 + int(rnd() * 11):02d}:{int(rnd() * 60):02d}:00"))
+
+    def _prescription_rows_with_log(self):
+        """Interleaves prescription chunks with the AdministrationLog inserts they produce."""
+        administration_log = []
+        for chunk in _chunks(self._prescription_and_log_rows(administration_log)):
+            yield from chunk
+            if len(administration_log) >= CHUNK_SIZE:
+                self._flush_log(administration_log)
+
+        self._flush_log(administration_log)
+
+    def _flush_log(self, administration_log):
+        self.conn.executemany("INSERT INTO AdministrationLog (prescription_id, nurse_id, center_id, administered_at) VALUES (?, ?, ?, ?)",
+                              administration_log)
+        self.log_rows += len(administration_log)
+        administration_log.clear()
+
+    def generate(self):
+        staff = self.n_doctors + self.n_nurses + self.n_admins
+        first_nurse = self.n_doctors + 1
+        first_admin = self.n_doctors + self.n_nurses + 1
+        self.log_rows = 0
+
+        self._insert("Medicine", "INSERT INTO Medicine (id, Med_name) VALUES (?, ?)", enumerate(VACCINES, start=1))
+        self._insert("Person", "INSERT INTO Person (idperson, firstname, familyname, dateofbirth) VALUES (?, ?, ?, ?)",
+                     self._person_rows())
+        self._insert("Doctor", "INSERT INTO Doctor (iddoctor, idperson) VALUES (?, ?)",
+                     ((n, n) for n in range(1, self.n_doctors + 1)))
+        self._insert("Nurse", "INSERT INTO Nurse (idnurse, idperson) VALUES (?, ?)",
+                     ((n, first_nurse + n - 1) for n in range(1, self.n_nurses + 1)))
+        self._insert("CenterAdmin", "INSERT INTO CenterAdmin (idadmin, idperson) VALUES (?, ?)",
+                     ((n, first_admin + n - 1) for n in range(1, self.n_admins + 1)))
+        self._insert("Patient", "INSERT INTO Patient (idpatient, idperson) VALUES (?, ?)",
+                     ((n, staff + n) for n in range(1, self.n_patients + 1)))
+        self._insert("Credentials", "INSERT INTO Credentials (email, password, user_type, person_id) VALUES (?, ?, ?, ?)",
+                     self._credential_rows())
+        self._insert("DoctorPatient", "INSERT INTO DoctorPatient (iddoctor, idpatient) VALUES (?, ?)",
+                     self._doctor_patient_rows())
+        self._insert("VaccinationCenter", "INSERT INTO VaccinationCenter (idcenter, name, address, admin_id) VALUES (?, ?, ?, ?)",
+                     self._center_rows())
+        self._insert("CenterStock", "INSERT INTO CenterStock (center_id, vaccine_id, quantity, last_updated) VALUES (?, ?, ?, ?)",
+                     self._stock_rows())
+        self._insert("Prescription", "INSERT INTO Prescription (id_prescription, idpatient, id_medicine, iddoctor, quantity, status, prescription_date) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                     self._prescription_rows_with_log())
+        self._log(f"  {'AdministrationLog':<20} {self.log_rows:>11,} rows  (written with the prescriptions)")
+
+
+def build(path, seed=42, verbose=True, **sizes):
+    """
+    Creates a synthetic database at `path` (which must not exist yet).
+    Args:
+        sizes: patients, doctors, nurses, centers, prescriptions, years (see SyntheticDataGenerator).
+    """
+    started = time.perf_counter()
+    database.migrate(path, target_version=1, verbose=verbose) # Base tables only, indexes come after the load
+
+    conn = sqlite3.connect(path, isolation_level=None)
+    try:
+        for name, value in BULK_LOAD_PRAGMAS.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        conn.execute("BEGIN")
+        SyntheticDataGenerator(conn, seed=seed, verbose=verbose, **sizes).generate()
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+
+    database.migrate(path, verbose=verbose) # Indexes and derived tables, built over the loaded data
+
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("ANALYZE") # Statistics for the query planner
+    finally:
+        conn.close()
+    if verbose:
+        print(f"✅ Synthetic database '{path}' built in {time.perf_counter() - started:.1f} s.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a large synthetic vaccination database.")
+    parser.add_argument("--db", default="synthetic_vaccinedatabase.db", help="Output file (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed; the same seed gives the same data")
+    parser.add_argument("--patients", type=int, default=100000)
+    parser.add_argument("--doctors", type=int, default=500)
+    parser.add_argument("--nurses", type=int, default=300)
+    parser.add_argument("--centers", type=int, default=100)
+    parser.add_argument("--prescriptions", type=int, default=1000000)
+    parser.add_argument("--years", type=int, default=10, help="Time span covered by the prescriptions")
+    parser.add_argument("--force", action="store_true", help="Overwrite the output file if it exists")
+    args = parser.parse_args()
+
+    if os.path.exists(args.db):
+        if not args.force:
+            parser.error(f"'{args.db}' already exists (use --force to overwrite it).")
+        os.remove(args.db)
+
+    build(args.db, seed=args.seed, patients=args.patients, doctors=args.doctors, nurses=args.nurses,
+          centers=args.centers, prescriptions=args.prescriptions, years=args.years)
+
+
+if __name__ == "__main__":
+    main()
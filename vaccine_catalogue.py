@@ -0,0 +1,75 @@
+# vaccine_catalogue.py – Vaccination System
+"""
+The vaccine catalogue (Medicine table), loaded once and shared by every page.
+
+Vaccines are looked up by ID or by name in dictionaries instead of querying Medicine or parsing
+list labels. Before it is used, the catalogue reads the Medicine change counter (TableVersion,
+bumped by triggers, see database.py); the table itself is only re-read when that counter moved.
+"""
+import threading
+from collections import namedtuple
+
+import data_access
+
+# Table the catalogue is built from
+SOURCE_TABLES = ("Medicine",)
+
+Vaccine = namedtuple("Vaccine", ["id", "name"])
+
+
+def vaccine_display_name(vaccine):
+    """The label the dashboards have always used for a vaccine."""
+    return f"{vaccine.name} (ID: {vaccine.id})"
+
+
+class VaccineCatalogue:
+    """Thread-safe, version-checked cache of the Medicine table."""
+    def __init__(self, pool):
+        self.pool = pool
+        self._lock = threading.Lock()
+        self._version = None
+        self._vaccines = () # Sorted by name
+        self._by_id = {}
+        self._by_name = {}
+
+    def _refresh(self):
+        """Re-reads Medicine if it changed since it was loaded. Called with the lock held."""
+        version = data_access.read_table_versions(self.pool, SOURCE_TABLES)
+        if version == self._version and None not in version:
+            return
+        rows = self.pool.fetchall("SELECT id, Med_name FROM Medicine ORDER BY Med_name", label="vaccine_catalogue.load")
+        self._vaccines = tuple(Vaccine(vaccine_id, name) for vaccine_id, name in rows)
+        self._by_id = {vaccine.id: vaccine for vaccine in self._vaccines}
+        self._by_name = {vaccine.name: vaccine for vaccine in self._vaccines} # Med_name is UNIQUE
+        self._version = version
+
+    def vaccines(self):
+        """Returns all vaccines as a tuple of Vaccine(id, name), sorted by name."""
+        with self._lock:
+            self._refresh()
+            return self._vaccines
+
+    def get(self, vaccine_id):
+        """Returns the Vaccine with this ID, or None."""
+        with self._lock:
+            self._refresh()
+            return self._by_id.get(vaccine_id)
+
+    def find_by_name(self, name):
+        """Returns the Vaccine with exactly this name, or None."""
+        with self._lock:
+            self._refresh()
+            return self._by_name.get(name)
+
+    def name_of(self, vaccine_id, default=None):
+        vaccine = self.get(vaccine_id)
+        return vaccine.name if vaccine is not None else default
+
+    def invalidate(self):
+        with self._lock:
+            self._version = None
+
+
+def get_vaccine_catalogue(pool=None):
+    """Returns the process-wide VaccineCatalogue for the given pool (default: the shared pool)."""
+    return (pool or data_access.get_pool()).shared("vaccine_catalogue", VaccineCatalogue)
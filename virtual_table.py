@@ -0,0 +1,216 @@
+# virtual_table.py – Vaccination System
+"""
+Paged table views for long result sets (patient histories, stock lists).
+
+A VirtualTable is a ttk.Treeview that only holds the rows read so far. It shows the first page,
+and fetches the next one in the background when the user scrolls near the end of what is
+loaded. Pages are read by a KeysetPager with keyset pagination: each page continues after the
+sort key of the last row shown (WHERE (date, id) < (:after_date, :after_id)), served by an index
+like the first page, where OFFSET would re-read every row before it. Opening a view therefore
+costs one page whatever the length of the history, and memory only grows as far as the user scrolls.
+"""
+import difflib
+
+import tkinter as tk
+from tkinter import ttk, Frame
+
+PAGE_SIZE = 50 # Rows per fetch; a few screens of a table
+LOAD_AHEAD = 0.8 # Fetch the next page once the bottom of the view passes this fraction of the loaded rows
+
+
+class KeysetPager:
+    """
+    Reads a query page by page. The query's first columns are its sort key, which must be unique
+    (e.g. a date and the row ID), in ORDER BY order; the pages are read after a key, never with OFFSET.
+    Args:
+        first_sql (str): The query from the start, limited to :limit rows.
+        next_sql (str): The same query continuing after the key given as `key_names` parameters.
+        params (dict): The query's other named parameters.
+        key_names (tuple): Parameter names of the sort key columns, e.g. ("after_date", "after_id").
+    """
+    def __init__(self, pool, first_sql, next_sql, params, key_names, label):
+        self.pool = pool
+        self.first_sql = first_sql
+        self.next_sql = next_sql
+        self.params = dict(params)
+        self.key_names = tuple(key_names)
+        self.label = label
+
+    def key(self, row):
+        """Sort key of a row, the position the next page continues after."""
+        return tuple(row[:len(self.key_names)])
+
+    def fetch(self, after=None, limit=PAGE_SIZE):
+        """
+        Reads up to `limit` rows after the key `after` (None: from the start).
+        Returns:
+            tuple: (rows, more), `more` telling whether further rows follow.
+        """
+        params = dict(self.params, limit=limit + 1) # One extra row tells whether there are more
+        if after is None:
+            sql = self.first_sql
+        else:
+            sql = self.next_sql
+            params.update(zip(self.key_names, after))
+        rows = self.pool.fetchall(sql, params, label=self.label)
+        return rows[:limit], len(rows) > limit
+
+
+class VirtualTable(Frame):
+    """
+    Treeview showing a KeysetPager's rows, fetched a page at a time as the user scrolls.
+    Args:
+        page (MainPage): Runs the page fetches in the background (run_in_background).
+        columns (tuple): (heading, width) per displayed column.
+        format_row (callable): Turns a row into the displayed values (default: the columns after the key).
+        empty_text (str): Shown when the query has no rows.
+    """
+    def __init__(self, parent, page, columns, format_row=None, height=8, page_size=PAGE_SIZE, empty_text="No rows."):
+        super().__init__(parent)
+        self.page = page
+        self.format_row = format_row
+        self.page_size = page_size
+        self.empty_text = empty_text
+        self.pager = None
+        self.more = False # Rows beyond the loaded ones
+        self.loading = False
+        self._keys = [] # Sort key of each loaded row, in display order
+        self._values = [] # Displayed values of each loaded row
+        self._iids = {} # Sort key -> Treeview item
+        self._next_iid = 0
+        self._task_key = f"virtual_table.{id(self)}" # A newer fetch for this table cancels the previous one
+
+        column_ids = [f"c{index}" for index in range(len(columns))]
+        self.tree = ttk.Treeview(self, columns=column_ids, show="headings", height=height, selectmode="browse")
+        for column_id, (heading, width) in zip(column_ids, columns):
+            self.tree.heading(column_id, text=heading, anchor=tk.W)
+            self.tree.column(column_id, width=width, anchor=tk.W, stretch=True)
+        self.tree.tag_configure("message", foreground="#555555")
+        scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.config(yscrollcommand=lambda first, last: self._on_scroll(scrollbar, first, last))
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+    def _display(self, row):
+        return tuple(self.format_row(row) if self.format_row else row[len(self.pager.key_names):])
+
+    def show(self, pager, rows=None, more=True):
+        """
+        Shows the pager's rows from the start.
+        Args:
+            rows (list): The first page, if it was already read (e.g. with a cached patient file).
+            more (bool): Whether rows follow `rows`.
+        """
+        self.page.cancel_background(self._task_key)
+        self.pager = pager
+        self.loading = False
+        self.clear()
+        if rows is None:
+            self.more = True
+            self._load_more()
+            return
+        self.more = more
+        self._append((list(rows), more))
+
+    def clear(self, text=None):
+        """Removes all rows, showing `text` instead if given."""
+        self.tree.delete(*self.tree.get_children())
+        self._keys, self._values, self._iids = [], [], {}
+        if text:
+            self.tree.insert("", tk.END, values=(text,), tags=("message",))
+
+    def reset(self, text=None):
+        """Empties the table and forgets its pager (e.g. when no patient is selected any more)."""
+        self.page.cancel_background(self._task_key)
+        self.pager = None
+        self.more = False
+        self.loading = False
+        self.clear(text)
+
+    def _on_scroll(self, scrollbar, first, last):
+        scrollbar.set(first, last)
+        self._load_if_near_end()
+
+    def _load_if_near_end(self):
+        if self.more and not self.loading and self.pager is not None and float(self.tree.yview()[1]) >= LOAD_AHEAD:
+            self._load_more()
+
+    def _load_more(self):
+        self.loading = True
+        after = self._keys[-1] if self._keys else None
+        self.page.run_in_background(self.pager.fetch, after, self.page_size, on_success=self._append,
+                                    on_error=self._show_error, key=self._task_key, busy_text="Loading more rows...")
+
+    def _append(self, page):
+        rows, more = page
+        for row in rows:
+            key = self.pager.key(row)
+            if key in self._iids: # Already shown (rows were added since the previous page was read)
+                continue
+            self._insert(len(self._keys), key, self._display(row))
+        self.loading = False
+        self.more = more
+        if not self._keys:
+            self.clear(self.empty_text)
+        elif more: # The rows may not fill the view, then no scrolling would ever ask for more
+            self.after_idle(self._load_if_near_end)
+
+    def _insert(self, index, key, values):
+        iid = f"r{self._next_iid}"
+        self._next_iid += 1
+        self.tree.insert("", index, iid=iid, values=values)
+        self._keys.insert(index, key)
+        self._values.insert(index, values)
+        self._iids[key] = iid
+
+    def _show_error(self, error):
+        self.loading = False
+        self.more = False
+        self.clear(f"Error loading rows: {error}")
+
+    def refresh(self):
+        """
+        Re-reads the rows loaded so far with one query (in the background) and applies only the
+        differences: new rows are inserted, removed ones deleted and changed ones updated in place,
+        so the scroll position and the selection are kept.
+        """
+        if self.pager is None:
+            return
+        self.page.run_in_background(self.pager.fetch, None, max(len(self._keys), self.page_size),
+                                    on_success=self._apply_refresh, on_error=self._show_error,
+                                    key=self._task_key, busy_text="Refreshing...")
+
+    def _apply_refresh(self, page):
+        rows, more = page
+        self.loading = False
+        self.more = more
+        if not self._keys: # Only a message is shown
+            self.clear()
+        keys = [self.pager.key(row) for row in rows]
+        values = [self._display(row) for row in rows]
+        matcher = difflib.SequenceMatcher(None, self._keys, keys, autojunk=False)
+        # From the end, so the positions of the parts not handled yet stay valid
+        for tag, i1, i2, j1, j2 in reversed(matcher.get_opcodes()):
+            if tag == "equal":
+                for old, new in zip(range(i1, i2), range(j1, j2)):
+                    if self._values[old] != values[new]:
+                        self.tree.item(self._iids[self._keys[old]], values=values[new])
+                        self._values[old] = values[new]
+                continue
+            for old in range(i2 - 1, i1 - 1, -1):
+                self.tree.delete(self._iids.pop(self._keys[old]))
+                del self._keys[old], self._values[old]
+            for new in range(j2 - 1, j1 - 1, -1):
+                self._insert(i1, keys[new], values[new])
+        if not self._keys:
+            self.clear(self.empty_text)
+
+    def selected_key(self):
+        """Sort key of the selected row, or None."""
+        selection = self.tree.selection()
+        if not selection:
+            return None
+        return next((key for key, iid in self._iids.items() if iid == selection[0]), None)
+
+    def loaded_rows(self):
+        return len(self._keys)